@@ -0,0 +1,247 @@
+"""
+Benchmark suite for the SensorThings request handling paths.
+
+Generates a synthetic dataset of N Things, M Datastreams per Thing and K Observations per Datastream, serves it with
+an in-memory engine and measures the throughput, latency percentiles and peak memory of common requests. Results
+are written as JSON tagged with the current git commit, and can be compared with the results of a previous run:
+
+    python benchmarks/run.py --things 100 --datastreams 5 --observations 1000 --output results.json
+    python benchmarks/run.py --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / 'example'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'example.settings')
+
+
+def setup_django() -> None:
+    """
+    Configure the example Django project to serve the benchmark API, with DEBUG disabled as in production.
+    """
+
+    import django
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.ROOT_URLCONF = 'benchmarks.urls'
+    django.setup()
+
+
+def get_benchmarks(size: Dict[str, int]) -> Dict[str, Callable[[], object]]:
+    """
+    Build the benchmarked requests for a dataset size.
+
+    Parameters
+    ----------
+    size : Dict[str, int]
+        The number of Things, Datastreams per Thing and Observations per Datastream of the dataset.
+
+    Returns
+    -------
+    Dict[str, Callable[[], object]]
+        Functions making one benchmarked request each, keyed by benchmark name.
+    """
+
+    from django.test import Client
+    from sensorthings.renderer import SensorThingsRenderer
+
+    client = Client()
+    base_url = 'http://testserver/sensorthings/v1.1'
+    thing_id = size['things'] // 2 or 1
+    datastream_id = (thing_id - 1) * size['datastreams_per_thing'] + 1
+
+    def get(path: str, params: Optional[dict] = None) -> Callable[[], object]:
+        def request():
+            response = client.get(f'{base_url}/{path}', params or {})
+            assert response.status_code == 200, response.content
+            return response
+        return request
+
+    def create_observations():
+        response = client.post(f'{base_url}/CreateObservations', [{
+            'Datastream': {'@iot.id': datastream_id},
+            'components': ['phenomenonTime', 'resultTime', 'result'],
+            'dataArray': [
+                ['2030-01-01T00:00:00Z', '2030-01-01T00:00:00Z', float(i)] for i in range(1000)
+            ]
+        }], content_type='application/json')
+        assert response.status_code == 201, response.content
+        return response
+
+    render_data = json.loads(client.get(
+        f'{base_url}/Observations', {'$top': 1000}
+    ).content)
+    renderer = SensorThingsRenderer()
+
+    class RenderRequest:
+        pass
+
+    return {
+        'list_things': get('Things'),
+        'get_thing': get(f'Things({thing_id})'),
+        'nested_path': get(f'Things({thing_id})/Datastreams({datastream_id})/Observations', {'$top': 100}),
+        'deep_expand': get('Things', {
+            '$top': 10,
+            '$expand': 'Locations,Datastreams($expand=Sensor,ObservedProperty,'
+                       'Observations($top=10;$orderby=phenomenonTime desc))'
+        }),
+        'select': get('Observations', {'$top': 1000, '$select': 'id,phenomenonTime,result'}),
+        'data_array': get('Observations', {'$top': 1000, '$resultFormat': 'dataArray'}),
+        'render': lambda: renderer.render(RenderRequest(), render_data, response_status=200),
+        'create_observations': create_observations,
+    }
+
+
+def run_benchmark(function: Callable[[], object], iterations: int, warmup: int) -> Dict[str, float]:
+    """
+    Measure the throughput, latency percentiles and peak memory of a benchmark.
+
+    Parameters
+    ----------
+    function : Callable[[], object]
+        The benchmarked function.
+    iterations : int
+        The number of timed calls.
+    warmup : int
+        The number of untimed calls made first.
+
+    Returns
+    -------
+    Dict[str, float]
+        The benchmark results, with latencies in milliseconds and peak memory in kibibytes.
+    """
+
+    for _ in range(warmup):
+        function()
+
+    latencies = []
+    start = perf_counter()
+
+    for _ in range(iterations):
+        call_start = perf_counter()
+        function()
+        latencies.append((perf_counter() - call_start) * 1000)
+
+    total = perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 \
+        else latencies * 99
+
+    return {
+        'iterations': iterations,
+        'throughput': round(iterations / total, 2),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'peak_memory_kib': round(peak_memory / 1024, 1)
+    }
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compare benchmark results with a baseline, returning the benchmarks whose median latency regressed.
+    """
+
+    regressions = []
+
+    print(f'\nComparison with {baseline.get("commit") or "baseline"} (p50 latency):')
+
+    for name, result in results['results'].items():
+        baseline_result = baseline.get('results', {}).get(name)
+        if not baseline_result:
+            continue
+        ratio = result['p50_ms'] / baseline_result['p50_ms'] if baseline_result['p50_ms'] else 1.0
+        flag = ' REGRESSION' if ratio > threshold else ''
+        print(f'  {name:<22} {baseline_result["p50_ms"]:>10.3f} -> {result["p50_ms"]:>10.3f} ms  x{ratio:.2f}{flag}')
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark SensorThings request handling on a synthetic dataset.')
+    parser.add_argument('--things', type=int, default=50, help='Number of Things.')
+    parser.add_argument('--datastreams', type=int, default=4, help='Number of Datastreams per Thing.')
+    parser.add_argument('--observations', type=int, default=500, help='Number of Observations per Datastream.')
+    parser.add_argument('--iterations', type=int, default=50, help='Number of timed calls per benchmark.')
+    parser.add_argument('--warmup', type=int, default=5, help='Number of untimed calls per benchmark.')
+    parser.add_argument('--only', nargs='*', help='Names of the benchmarks to run.')
+    parser.add_argument('--output', type=Path, help='File to write the results to as JSON.')
+    parser.add_argument('--compare', type=Path, help='Results file of a previous run to compare with.')
+    parser.add_argument(
+        '--threshold', type=float, default=1.2,
+        help='Median latency ratio above which a benchmark is reported as a regression.'
+    )
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from benchmarks.synthetic import configure_dataset
+
+    dataset = configure_dataset(args.things, args.datastreams, args.observations)
+    benchmarks = get_benchmarks(dataset.size)
+
+    results = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'dataset': dataset.size,
+        'results': {}
+    }
+
+    print(f'Dataset: {dataset.size}')
+
+    # Ingest benchmarks run last, since they grow the dataset.
+    for name, function in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        result = results['results'][name] = run_benchmark(function, args.iterations, args.warmup)
+        print(
+            f'  {name:<22} {result["throughput"]:>9.1f} req/s  p50 {result["p50_ms"]:>9.3f} ms  '
+            f'p95 {result["p95_ms"]:>9.3f} ms  p99 {result["p99_ms"]:>9.3f} ms  '
+            f'peak {result["peak_memory_kib"]:>9.1f} KiB'
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = compare_results(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
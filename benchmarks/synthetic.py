@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sensorthings.engines import InMemorySensorThingsEngine, InMemoryStore
+
+
+tables = (
+    'things', 'locations', 'historical_locations', 'datastreams', 'observations', 'sensors', 'observed_properties',
+    'features_of_interest'
+)
+
+
+class SyntheticDataset:
+    """
+    Generated SensorThings entities, keyed by table name and entity ID as the in-memory store expects them.
+
+    Parameters
+    ----------
+    things : int
+        The number of Things.
+    datastreams_per_thing : int
+        The number of Datastreams of each Thing.
+    observations_per_datastream : int
+        The number of Observations of each Datastream.
+    """
+
+    def __init__(self, things: int, datastreams_per_thing: int, observations_per_datastream: int):
+        self.size = {
+            'things': things,
+            'datastreams_per_thing': datastreams_per_thing,
+            'observations_per_datastream': observations_per_datastream
+        }
+        self.tables = {table: {} for table in tables}
+        start_time = datetime(2024, 1, 1)
+
+        for thing_id in range(1, things + 1):
+            self.tables['locations'][thing_id] = {
+                'id': thing_id,
+                'name': f'LOCATION_{thing_id}',
+                'description': f'Location {thing_id}',
+                'encoding_type': 'application/geo+json',
+                'location': {
+                    'type': 'Feature',
+                    'properties': {},
+                    'geometry': {'type': 'Point', 'coordinates': [41.7 + thing_id / 1000, -111.8]}
+                },
+                'properties': {},
+                'thing_ids': [thing_id],
+                'historical_location_ids': [thing_id]
+            }
+            self.tables['historical_locations'][thing_id] = {
+                'id': thing_id,
+                'time': '2024-01-01T00:00:00Z',
+                'thing_id': thing_id,
+                'location_ids': [thing_id]
+            }
+            self.tables['features_of_interest'][thing_id] = {
+                'id': thing_id,
+                'name': f'FEATURE_OF_INTEREST_{thing_id}',
+                'description': f'Feature of Interest {thing_id}',
+                'encoding_type': 'application/geo+json',
+                'feature': self.tables['locations'][thing_id]['location'],
+                'properties': {}
+            }
+            self.tables['things'][thing_id] = {
+                'id': thing_id,
+                'name': f'THING_{thing_id}',
+                'description': f'Thing {thing_id}',
+                'properties': {'code': f'THING_{thing_id}'},
+                'location_ids': [thing_id]
+            }
+
+        for sensor_id in range(1, datastreams_per_thing + 1):
+            self.tables['sensors'][sensor_id] = {
+                'id': sensor_id,
+                'name': f'SENSOR_{sensor_id}',
+                'description': f'Sensor {sensor_id}',
+                'encoding_type': 'text/html',
+                'metadata': 'SYNTHETIC',
+                'properties': {}
+            }
+            self.tables['observed_properties'][sensor_id] = {
+                'id': sensor_id,
+                'name': f'OBSERVED_PROPERTY_{sensor_id}',
+                'definition': f'https://www.example.com/observed-properties/{sensor_id}',
+                'description': f'Observed Property {sensor_id}',
+                'properties': {}
+            }
+
+        end_time = (start_time + timedelta(minutes=15 * max(observations_per_datastream - 1, 0))).isoformat() + 'Z'
+        phenomenon_times = [
+            (start_time + timedelta(minutes=15 * i)).isoformat() + 'Z' for i in range(observations_per_datastream)
+        ]
+        observation_id = 1
+
+        for datastream_id in range(1, things * datastreams_per_thing + 1):
+            thing_id = (datastream_id - 1) // datastreams_per_thing + 1
+            sensor_id = (datastream_id - 1) % datastreams_per_thing + 1
+            self.tables['datastreams'][datastream_id] = {
+                'id': datastream_id,
+                'name': f'DATASTREAM_{datastream_id}',
+                'description': f'Datastream {datastream_id}',
+                'thing_id': thing_id,
+                'sensor_id': sensor_id,
+                'observed_property_id': sensor_id,
+                'unit_of_measurement': {
+                    'name': 'Unit', 'symbol': 'U', 'definition': 'https://www.example.com/units/1'
+                },
+                'observation_type': 'http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_Measurement',
+                'phenomenon_time': f'2024-01-01T00:00:00Z/{end_time}',
+                'result_time': f'2024-01-01T00:00:00Z/{end_time}',
+                'properties': {}
+            }
+            for i, phenomenon_time in enumerate(phenomenon_times):
+                self.tables['observations'][observation_id] = {
+                    'id': observation_id,
+                    'phenomenon_time': phenomenon_time,
+                    'result_time': phenomenon_time,
+                    'result': float((datastream_id * 7 + i * 13) % 100),
+                    'datastream_id': datastream_id,
+                    'feature_of_interest_id': thing_id,
+                    'properties': {}
+                }
+                observation_id += 1
+
+
+dataset: Optional[SyntheticDataset] = None
+
+
+def configure_dataset(things: int, datastreams_per_thing: int, observations_per_datastream: int) -> SyntheticDataset:
+    """
+    Generate the dataset served by the synthetic engine.
+    """
+
+    global dataset
+    dataset = SyntheticDataset(things, datastreams_per_thing, observations_per_datastream)
+    SyntheticSensorThingsEngine.store = InMemoryStore(dataset.tables)
+
+    return dataset
+
+
+class SyntheticSensorThingsEngine(InMemorySensorThingsEngine):
+    """
+    SensorThings engine serving the synthetic dataset with the in-memory reference engine.
+
+    The in-memory engine looks up related entities with its indexes and pushes pagination of expanded entities down
+    to each parent, so benchmarks measure the request handling of the package rather than the engine. The store is
+    set by configure_dataset.
+    """
@@ -0,0 +1,17 @@
+from django.urls import path
+from sensorthings import SensorThingsAPI
+from .synthetic import SyntheticSensorThingsEngine
+
+
+sta_benchmark = SensorThingsAPI(
+    title='SensorThings Benchmark API',
+    version='1.1',
+    urls_namespace='benchmark',
+    description='SensorThings API serving a synthetic dataset for benchmarks.',
+    engine=SyntheticSensorThingsEngine
+)
+
+
+urlpatterns = [
+    path('sensorthings/v1.1/', sta_benchmark.urls),
+]
@@ -21,7 +21,7 @@ class TestSensorThingsEngine(
     ThingEngine,
     SensorThingsBaseEngine
 ):
-    pass
+    supports_partitioned_pagination = True
 
 
 class TestDataArraySensorThingsEngine(
@@ -36,4 +36,4 @@ class TestDataArraySensorThingsEngine(
     SensorThingsBaseEngine,
     DataArrayEngine
 ):
-    pass
+    supports_partitioned_pagination = True
@@ -18,7 +18,10 @@ class DatastreamEngine(DatastreamBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = datastreams
+        response = self.apply_related_ids(datastreams, {
+            'id': datastream_ids, 'observed_property_id': observed_property_ids, 'sensor_id': sensor_ids,
+            'thing_id': thing_ids
+        })
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
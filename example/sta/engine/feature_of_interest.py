@@ -16,7 +16,7 @@ class FeatureOfInterestEngine(FeatureOfInterestBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = features_of_interest
+        response = self.apply_related_ids(features_of_interest, {'id': feature_of_interest_ids})
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
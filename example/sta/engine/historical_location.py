@@ -18,7 +18,9 @@ class HistoricalLocationEngine(HistoricalLocationBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = historical_locations
+        response = self.apply_related_ids(historical_locations, {
+            'id': historical_location_ids, 'thing_id': thing_ids, 'location_ids': location_ids
+        })
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
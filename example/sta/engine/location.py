@@ -17,7 +17,9 @@ class LocationEngine(LocationBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = locations
+        response = self.apply_related_ids(locations, {
+            'id': location_ids, 'thing_ids': thing_ids, 'historical_location_ids': historical_location_ids
+        })
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
@@ -1,5 +1,6 @@
 from sensorthings.components.observations.engine import ObservationBaseEngine
 from sensorthings.components.observations.schemas import ObservationPostBody, ObservationPatchBody
+from sensorthings.entities import EntityTable
 from .utils import SensorThingsUtils
 from ..data import observations
 
@@ -17,7 +18,9 @@ class ObservationEngine(ObservationBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = observations
+        response = self.apply_related_ids(observations, {
+            'id': observation_ids, 'datastream_id': datastream_ids, 'feature_of_interest_id': feature_of_interest_ids
+        })
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
@@ -29,7 +32,27 @@ class ObservationEngine(ObservationBaseEngine, SensorThingsUtils):
         if pagination is not None:
             response = self.apply_pagination(response, pagination)
 
-        return response, count
+        return EntityTable.from_entities(response), count
+
+    def get_latest_observations(
+            self,
+            datastream_ids: list[int],
+            top: int = 1
+    ) -> dict[int, dict]:
+
+        response = {}
+
+        for datastream_id in datastream_ids:
+            response.update({
+                observation['id']: observation for observation in sorted(
+                    [observation for observation in observations.values()
+                     if observation['datastream_id'] == datastream_id],
+                    key=lambda observation: observation['phenomenon_time'],
+                    reverse=True
+                )[:top]
+            })
+
+        return EntityTable.from_entities(response)
 
     def create_observation(
             self,
@@ -15,7 +15,7 @@ class ObservedPropertyEngine(ObservedPropertyBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = observed_properties
+        response = self.apply_related_ids(observed_properties, {'id': observed_property_ids})
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
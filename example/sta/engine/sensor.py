@@ -15,7 +15,7 @@ class SensorEngine(SensorBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = sensors
+        response = self.apply_related_ids(sensors, {'id': sensor_ids})
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
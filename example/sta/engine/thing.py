@@ -16,7 +16,7 @@ class ThingEngine(ThingBaseEngine, SensorThingsUtils):
             get_count: bool = False
     ) -> (list[int, dict], int):
 
-        response = things
+        response = self.apply_related_ids(things, {'id': thing_ids, 'location_ids': location_ids})
         response = self.apply_filters(response, filters)
         response = self.apply_order(response, ordering)
 
@@ -1,10 +1,29 @@
+from sensorthings.engine import SensorThingsBaseEngine
+
+
 class SensorThingsUtils:
     @staticmethod
     def apply_pagination(response, pagination):
+        if pagination.get('partition_by'):
+            return SensorThingsBaseEngine.paginate_partitions(
+                entities=response, partition_by=pagination['partition_by'], pagination=pagination
+            )
+
         return {
             i['id']: i for i in list(response.values())[pagination['skip']: pagination['skip'] + pagination['top']]
         } if pagination['top'] > 0 else {}
 
+    @staticmethod
+    def apply_related_ids(response, related_ids):
+        for field, ids in related_ids.items():
+            if ids is not None:
+                ids = {str(entity_id) for entity_id in ids}
+                response = {
+                    k: v for k, v in response.items()
+                    if any(str(value) in ids for value in (v[field] if isinstance(v[field], list) else [v[field]]))
+                }
+        return response
+
     @staticmethod
     def apply_filters(response, filters):
         if filters:
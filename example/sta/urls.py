@@ -1,5 +1,7 @@
 from django.urls import path
 from sensorthings import SensorThingsAPI
+from sensorthings.engines import InMemorySensorThingsEngine, InMemoryStore
+from . import data
 from .engine import TestSensorThingsEngine, TestDataArraySensorThingsEngine
 
 
@@ -19,8 +21,41 @@ sta_data_array = SensorThingsAPI(
     engine=TestDataArraySensorThingsEngine
 )
 
+sta_trusted = SensorThingsAPI(
+    title='Test SensorThings Trusted Output API',
+    version='1.1',
+    urls_namespace='trusted',
+    description='This is a test SensorThings API.',
+    engine=TestDataArraySensorThingsEngine,
+    trusted_engine_output=True
+)
+
+
+class ExampleInMemorySensorThingsEngine(InMemorySensorThingsEngine):
+    store = InMemoryStore({
+        'things': data.things,
+        'locations': data.locations,
+        'historical_locations': data.historical_locations,
+        'sensors': data.sensors,
+        'observed_properties': data.observed_properties,
+        'features_of_interest': data.features_of_interest,
+        'datastreams': data.datastreams,
+        'observations': data.observations
+    })
+
+
+sta_memory = SensorThingsAPI(
+    title='Test SensorThings In-Memory API',
+    version='1.1',
+    urls_namespace='memory',
+    description='This is a test SensorThings API.',
+    engine=ExampleInMemorySensorThingsEngine
+)
+
 
 urlpatterns = [
     path('core/v1.1/', sta_core.urls),
     path('data-array/v1.1/', sta_data_array.urls),
+    path('trusted/v1.1/', sta_trusted.urls),
+    path('memory/v1.1/', sta_memory.urls),
 ]
@@ -0,0 +1,112 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache with optional time-to-live expiry.
+
+    The cache is shared by all requests handled by a process, so it is safe to use from multiple threads.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The maximum number of entries kept. The least recently used entry is evicted when the cache is full.
+        Default is 1024.
+    ttl : float, optional
+        The number of seconds after which an entry expires. Entries never expire if None. Default is None.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Parameters
+        ----------
+        key : Hashable
+            The cache key.
+        default : Any, optional
+            The value returned if the key is not cached or has expired. Default is None.
+
+        Returns
+        -------
+        Any
+            The cached value, or the default.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Cache a value.
+
+        Parameters
+        ----------
+        key : Hashable
+            The cache key.
+        value : Any
+            The value to cache.
+        """
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove a value from the cache if it is cached.
+
+        Parameters
+        ----------
+        key : Hashable
+            The cache key.
+        """
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Remove the values of all cached keys matching a predicate.
+
+        Parameters
+        ----------
+        predicate : Callable[[Hashable], bool]
+            A function returning True for the keys to remove.
+        """
+
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Remove all values from the cache.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -6,9 +6,9 @@ from sensorthings.schemas import (BaseComponent, BaseListResponse, BaseGetRespon
 from sensorthings.types import ISOTimeString, ISOIntervalString, AnyHttpUrlString
 
 if TYPE_CHECKING:
-    from sensorthings.components.things.schemas import Thing
-    from sensorthings.components.sensors.schemas import Sensor
-    from sensorthings.components.observedproperties.schemas import ObservedProperty
+    from sensorthings.components.things.schemas import Thing, ThingPostBody
+    from sensorthings.components.sensors.schemas import Sensor, SensorPostBody
+    from sensorthings.components.observedproperties.schemas import ObservedProperty, ObservedPropertyPostBody
     from sensorthings.components.observations.schemas import Observation
 
 observationTypes = Literal[
@@ -118,25 +118,44 @@ class DatastreamPostBody(BasePostBody, DatastreamFields):
 
     Attributes
     ----------
-    thing : Union[EntityId]
-        The thing associated with the datastream.
-    sensor : Union[EntityId]
-        The sensor associated with the datastream.
-    observed_property : Union[EntityId]
-        The observed property associated with the datastream.
+    thing : Union[EntityId, ThingPostBody]
+        The thing associated with the datastream, given by ID or created with the datastream.
+    sensor : Union[EntityId, SensorPostBody]
+        The sensor associated with the datastream, given by ID or created with the datastream.
+    observed_property : Union[EntityId, ObservedPropertyPostBody]
+        The observed property associated with the datastream, given by ID or created with the datastream.
     """
 
-    thing: Union[EntityId] = Field(
+    thing: Union[EntityId, 'ThingPostBody'] = Field(
         ..., alias='Thing', nested_class='ThingPostBody'
     )
-    sensor: Union[EntityId] = Field(
+    sensor: Union[EntityId, 'SensorPostBody'] = Field(
         ..., alias='Sensor', nested_class='SensorPostBody'
     )
-    observed_property: Union[EntityId] = Field(
+    observed_property: Union[EntityId, 'ObservedPropertyPostBody'] = Field(
         ..., alias='ObservedProperty', nested_class='ObservedPropertyPostBody'
     )
 
 
+class DatastreamNestedPostBody(DatastreamPostBody):
+    """
+    A schema for a datastream created in the POST request body of its thing, sensor or observed property.
+
+    The thing, sensor and observed property are optional, since the one the datastream is nested in is linked to it
+    when it is created, but the other two must still be given.
+    """
+
+    thing: Union[EntityId, 'ThingPostBody', None] = Field(
+        None, alias='Thing', nested_class='ThingPostBody'
+    )
+    sensor: Union[EntityId, 'SensorPostBody', None] = Field(
+        None, alias='Sensor', nested_class='SensorPostBody'
+    )
+    observed_property: Union[EntityId, 'ObservedPropertyPostBody', None] = Field(
+        None, alias='ObservedProperty', nested_class='ObservedPropertyPostBody'
+    )
+
+
 class DatastreamPatchBody(BasePatchBody, DatastreamFields):
     """
     A schema for the body of a PATCH request to update an existing datastream.
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Literal, List, Optional
+from typing import TYPE_CHECKING, Literal, List, Union, Optional
 from pydantic import Field
 from geojson_pydantic import Feature
 from ninja import Schema
@@ -6,7 +6,7 @@ from sensorthings.schemas import EntityId, BaseComponent, BaseListResponse, Base
 from sensorthings.types import AnyHttpUrlString
 
 if TYPE_CHECKING:
-    from sensorthings.components.observations.schemas import Observation
+    from sensorthings.components.observations.schemas import Observation, ObservationPostBody
 
 
 featureEncodingTypes = Literal['application/geo+json']
@@ -71,11 +71,11 @@ class FeatureOfInterestPostBody(BasePostBody, FeatureOfInterestFields):
 
     Attributes
     ----------
-    observations : List[EntityId]
-        The list of observation IDs related to the feature of interest.
+    observations : List[Union[EntityId, ObservationPostBody]]
+        The observations of the feature of interest, given by ID or created with the feature of interest.
     """
 
-    observations: List[EntityId] = Field(
+    observations: List[Union[EntityId, 'ObservationPostBody']] = Field(
         [], alias='Observations', nested_class='ObservationPostBody'
     )
 
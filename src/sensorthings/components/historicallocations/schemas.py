@@ -7,8 +7,8 @@ from sensorthings.schemas import (BaseComponent, BaseListResponse, BaseGetRespon
 from sensorthings.types import AnyHttpUrlString
 
 if TYPE_CHECKING:
-    from sensorthings.components.things.schemas import Thing
-    from sensorthings.components.locations.schemas import Location
+    from sensorthings.components.things.schemas import Thing, ThingPostBody
+    from sensorthings.components.locations.schemas import Location, LocationPostBody
 
 
 class HistoricalLocationFields(Schema):
@@ -61,20 +61,37 @@ class HistoricalLocationPostBody(BasePostBody, HistoricalLocationFields):
 
     Attributes
     ----------
-    thing : Union[EntityId]
-        The thing associated with the historical location.
-    locations : List[Union[EntityId]]
-        The list of location IDs associated with the historical location.
+    thing : Union[EntityId, ThingPostBody]
+        The thing associated with the historical location, given by ID or created with the historical location.
+    locations : List[Union[EntityId, LocationPostBody]]
+        The locations associated with the historical location, given by ID or created with the historical
+        location.
     """
 
-    thing: Union[EntityId] = Field(
+    thing: Union[EntityId, 'ThingPostBody'] = Field(
         ..., alias='Thing', nested_class='ThingPostBody'
     )
-    locations: List[Union[EntityId]] = Field(
+    locations: List[Union[EntityId, 'LocationPostBody']] = Field(
         ..., alias='Locations', nested_class='LocationPostBody'
     )
 
 
+class HistoricalLocationNestedPostBody(HistoricalLocationPostBody):
+    """
+    A schema for a historical location created in the POST request body of its thing or of one of its locations.
+
+    The thing and locations are optional, since the entity the historical location is nested in is linked to it
+    when it is created, but a historical location nested in a location must still be given its thing.
+    """
+
+    thing: Union[EntityId, 'ThingPostBody', None] = Field(
+        None, alias='Thing', nested_class='ThingPostBody'
+    )
+    locations: List[Union[EntityId, 'LocationPostBody']] = Field(
+        [], alias='Locations', nested_class='LocationPostBody'
+    )
+
+
 class HistoricalLocationPatchBody(HistoricalLocationFields, BasePatchBody):
     """
     A schema for the body of a PATCH request to update an existing historical location.
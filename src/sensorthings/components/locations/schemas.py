@@ -7,8 +7,9 @@ from sensorthings.schemas import (BaseComponent, BaseListResponse, BaseGetRespon
 from sensorthings.types import AnyHttpUrlString
 
 if TYPE_CHECKING:
-    from sensorthings.components.things.schemas import Thing
-    from sensorthings.components.historicallocations.schemas import HistoricalLocation
+    from sensorthings.components.things.schemas import Thing, ThingPostBody
+    from sensorthings.components.historicallocations.schemas import (HistoricalLocation,
+                                                                     HistoricalLocationNestedPostBody)
 
 
 locationEncodingTypes = Literal['application/geo+json']
@@ -76,16 +77,16 @@ class LocationPostBody(BasePostBody, LocationFields):
 
     Attributes
     ----------
-    things : List[Union[EntityId]]
-        The list of thing IDs associated with the location.
-    historical_locations : List[Union[EntityId]]
-        The list of historical location IDs associated with the location.
+    things : List[Union[EntityId, ThingPostBody]]
+        The things associated with the location, given by ID or created with the location.
+    historical_locations : List[Union[EntityId, HistoricalLocationNestedPostBody]]
+        The historical locations associated with the location, given by ID or created with the location.
     """
 
-    things: List[Union[EntityId]] = Field(
+    things: List[Union[EntityId, 'ThingPostBody']] = Field(
         [], alias='Things', nested_class='ThingPostBody'
     )
-    historical_locations: List[Union[EntityId]] = Field(
+    historical_locations: List[Union[EntityId, 'HistoricalLocationNestedPostBody']] = Field(
         [], alias='HistoricalLocations', nested_class='HistoricalLocationPostBody'
     )
 
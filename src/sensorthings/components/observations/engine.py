@@ -1,8 +1,17 @@
 from abc import ABCMeta, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Union
+from datetime import datetime, timedelta, timezone
+from dateutil.parser import isoparse
+from ninja.errors import HttpError
 from .schemas import ObservationPostBody, ObservationPatchBody
+from sensorthings.entities import EntityTable
 from sensorthings import settings
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 
 id_type = settings.ST_API_ID_TYPE
 
@@ -49,13 +58,205 @@ class ObservationBaseEngine(metaclass=ABCMeta):
         Returns
         -------
         Dict[id_type, dict]
-            A dictionary of observations, keyed by their IDs.
+            A dictionary of observations, keyed by their IDs. Engines returning large result sets may return an
+            EntityTable instead to store each observation as a compact row.
         int
             The total number of observations matching the query.
         """
 
         pass
 
+    def get_latest_observations(
+            self,
+            datastream_ids: List[id_type],
+            top: int = 1
+    ) -> Dict[id_type, dict]:
+        """
+        Retrieve the most recent observations of each of the given datastreams.
+
+        This method is used to expand the latest observations of datastreams
+        (e.g. Datastreams?$expand=Observations($top=1;$orderby=phenomenonTime desc)). The default implementation
+        makes a single get_observations call paginated per datastream if the engine supports partitioned
+        pagination, and otherwise one ordered get_observations call per datastream. Engines can override it to
+        fetch the latest observations in another way, for example using DISTINCT ON.
+
+        Parameters
+        ----------
+        datastream_ids : List[id_type]
+            List of datastream IDs to get the latest observations of.
+        top : int, optional
+            The number of observations to return per datastream. Default is 1.
+
+        Returns
+        -------
+        Dict[id_type, dict]
+            A dictionary of observations, keyed by their IDs, ordered by descending phenomenon time within each
+            datastream.
+        """
+
+        ordering = [{'field': 'phenomenonTime', 'direction': 'desc'}]
+
+        if getattr(self, 'supports_partitioned_pagination', False) is True:
+            observations, _ = self.get_observations(
+                datastream_ids=datastream_ids,
+                pagination={'skip': 0, 'top': top, 'count': False, 'partition_by': 'datastream_id'},
+                ordering=ordering
+            )
+            return observations
+
+        observations = {}
+
+        for datastream_id in datastream_ids:
+            datastream_observations, _ = self.get_observations(
+                datastream_ids=[datastream_id],
+                pagination={'skip': 0, 'top': top, 'count': False},
+                ordering=ordering
+            )
+            observations.update(datastream_observations)
+
+        return observations
+
+    def get_observation_aggregates(
+            self,
+            datastream_id: id_type,
+            interval: timedelta,
+            functions: List[str],
+            filters: dict = None
+    ) -> List[list]:
+        """
+        Aggregate the observations of a datastream over fixed time intervals.
+
+        Intervals are aligned to the Unix epoch in UTC, and observations are assigned to intervals by the start of
+        their phenomenon time. The default implementation fetches the observations of the datastream and aggregates
+        them with NumPy, which must be installed to use it. The fetch is bounded by ST_MAX_QUERY_COST when it is set.
+        Engines can override this method to aggregate observations in the database instead, for example using
+        date_bin or time_bucket.
+
+        Parameters
+        ----------
+        datastream_id : id_type
+            The ID of the datastream to aggregate observations of.
+        interval : timedelta
+            The length of the aggregation intervals.
+        functions : List[str]
+            The aggregate functions to apply to the results of each interval. Supported functions are 'mean',
+            'min', 'max', 'sum', and 'count'.
+        filters : dict, optional
+            Additional filters to apply to the observations.
+
+        Returns
+        -------
+        List[list]
+            One row per interval containing observations, ordered by time. Each row contains the start time of the
+            interval as a timezone-aware datetime followed by one value per aggregate function.
+
+        Raises
+        ------
+        HttpError
+            If the results of the observations are not numeric, or if the datastream has more observations to
+            aggregate than the maximum query cost allows.
+        """
+
+        if np is None:
+            raise NotImplementedError('Observation aggregation requires NumPy.')
+
+        max_rows = settings.ST_MAX_QUERY_COST
+
+        observations, _ = self.get_observations(
+            datastream_ids=[datastream_id],
+            filters=filters,
+            pagination={'skip': 0, 'top': max_rows + 1, 'count': False} if max_rows is not None else None,
+            ordering=[{'field': 'phenomenonTime', 'direction': 'asc'}]
+        )
+
+        if max_rows is not None and len(observations) > max_rows:
+            raise HttpError(
+                400, f'Aggregating more than {max_rows} Observations exceeds the maximum query cost. Use $filter to '
+                     f'narrow the phenomenon time range.'
+            )
+
+        if isinstance(observations, EntityTable):
+            datastream_ids = observations.column('datastream_id')
+            phenomenon_times = observations.column('phenomenon_time')
+            results = observations.column('result')
+        else:
+            datastream_ids = [observation['datastream_id'] for observation in observations.values()]
+            phenomenon_times = [observation['phenomenon_time'] for observation in observations.values()]
+            results = [observation['result'] for observation in observations.values()]
+
+        selected = np.array([
+            observation_datastream_id == datastream_id for observation_datastream_id in datastream_ids
+        ], dtype=bool)
+
+        if not selected.any():
+            return []
+
+        timestamps = self.get_phenomenon_timestamps(np.array(phenomenon_times, dtype=object)[selected])
+        try:
+            results = np.array(results, dtype=float)[selected]
+        except (TypeError, ValueError):
+            raise HttpError(422, 'Only Datastreams with numeric Observation results can be aggregated.')
+
+        interval_seconds = int(interval.total_seconds())
+        buckets = timestamps // interval_seconds
+        order = np.argsort(buckets, kind='stable')
+        buckets, results = buckets[order], results[order]
+        bucket_starts, starts, counts = np.unique(buckets, return_index=True, return_counts=True)
+
+        sums = np.add.reduceat(results, starts)
+        aggregates = {
+            'mean': sums / counts,
+            'min': np.minimum.reduceat(results, starts),
+            'max': np.maximum.reduceat(results, starts),
+            'sum': sums,
+            'count': counts
+        }
+
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+        return [
+            [
+                epoch + timedelta(seconds=int(bucket_start) * interval_seconds),
+                *[aggregates[function][i].item() for function in functions]
+            ] for i, bucket_start in enumerate(bucket_starts)
+        ]
+
+    @staticmethod
+    def get_phenomenon_timestamps(phenomenon_times: List[Union[str, datetime]]) -> 'np.ndarray':
+        """
+        Convert the phenomenon times of observations to Unix timestamps.
+
+        Time intervals are converted to the timestamp of their start time. UTC times in 'Z' notation are parsed
+        directly by NumPy, and other times are parsed with dateutil and converted to UTC. Datetime values, as
+        returned by database-backed engines, are converted to UTC, and naive datetimes are assumed to be in UTC.
+
+        Parameters
+        ----------
+        phenomenon_times : List[Union[str, datetime]]
+            The ISO 8601 phenomenon times or datetimes of the observations.
+
+        Returns
+        -------
+        np.ndarray
+            The timestamps of the observations in seconds since the Unix epoch.
+        """
+
+        start_times = []
+        for phenomenon_time in phenomenon_times:
+            if isinstance(phenomenon_time, datetime):
+                start_time = phenomenon_time
+            else:
+                start_time = phenomenon_time.split('/')[0]
+                if start_time.endswith('Z'):
+                    start_times.append(start_time[:-1])
+                    continue
+                start_time = isoparse(start_time)
+            start_times.append(
+                start_time.astimezone(timezone.utc).replace(tzinfo=None) if start_time.tzinfo else start_time
+            )
+
+        return np.array(start_times, dtype='datetime64[s]').astype('int64')
+
     @abstractmethod
     def create_observation(
             self,
@@ -6,8 +6,8 @@ from sensorthings.schemas import (BaseComponent, BaseListResponse, BaseGetRespon
 from sensorthings.types import ISOTimeString, ISOIntervalString, AnyHttpUrlString
 
 if TYPE_CHECKING:
-    from sensorthings.components.datastreams.schemas import Datastream
-    from sensorthings.components.featuresofinterest.schemas import FeatureOfInterest
+    from sensorthings.components.datastreams.schemas import Datastream, DatastreamPostBody
+    from sensorthings.components.featuresofinterest.schemas import FeatureOfInterest, FeatureOfInterestPostBody
 
 
 observationTypes = Literal[
@@ -96,16 +96,16 @@ class ObservationPostBody(BasePostBody, ObservationFields):
 
     Attributes
     ----------
-    datastream : Union[EntityId]
-        The ID of the datastream associated with the observation.
-    feature_of_interest : Union[EntityId, None], optional
-        The ID of the feature of interest associated with the observation.
+    datastream : Union[EntityId, DatastreamPostBody]
+        The datastream associated with the observation, given by ID or created with the observation.
+    feature_of_interest : Union[EntityId, FeatureOfInterestPostBody, None], optional
+        The feature of interest associated with the observation, given by ID or created with the observation.
     """
 
-    datastream: Union[EntityId] = Field(
+    datastream: Union[EntityId, 'DatastreamPostBody'] = Field(
         ..., alias='Datastream', nested_class='DatastreamPostBody'
     )
-    feature_of_interest: Union[EntityId, None] = Field(
+    feature_of_interest: Union[EntityId, 'FeatureOfInterestPostBody', None] = Field(
         None, alias='FeatureOfInterest', nested_class='FeatureOfInterestPostBody'
     )
 
@@ -172,3 +172,63 @@ class ObservationListResponse(BaseListResponse):
     """
 
     value: List[ObservationGetResponse]
+
+
+observationAggregateFunctions = Literal['mean', 'min', 'max', 'sum', 'count']
+
+
+class ObservationAggregateQueryParams(Schema):
+    """
+    Schema for query parameters used in observation aggregation requests.
+
+    Attributes
+    ----------
+    filters : str
+        The filter parameter, aliased as '$filter'.
+    interval : str
+        The length of the aggregation intervals (e.g. '30s', '15min', '1h', '1d', '1w').
+    functions : str
+        A comma-separated list of the aggregate functions to apply, aliased as 'fn'.
+    """
+
+    filters: Optional[str] = Field(None, alias='$filter')
+    interval: str = Field(..., alias='interval')
+    functions: str = Field('mean', alias='fn')
+
+    class Config:
+        populate_by_name = True
+
+
+class ObservationAggregateResponse(Schema):
+    """
+    A schema for aggregated observations of a datastream in data array format.
+
+    Attributes
+    ----------
+    datastream : AnyHttpUrlString
+        The navigation link of the datastream of the observations.
+    components : List[str]
+        The components of each data array row: the phenomenon time interval followed by the aggregate functions.
+    data_array : List[list]
+        One row per interval containing observations.
+    """
+
+    datastream: AnyHttpUrlString = Field(None, alias='Datastream@iot.navigationLink')
+    components: List[Union[Literal['phenomenonTime'], observationAggregateFunctions]]
+    data_array: List[List[Union[ISOIntervalString, int, float, None]]] = Field(..., alias='dataArray')
+
+    class Config:
+        populate_by_name = True
+
+
+class ObservationAggregateListResponse(Schema):
+    """
+    A schema for the response of an observation aggregation request.
+
+    Attributes
+    ----------
+    value : List[ObservationAggregateResponse]
+        The aggregated observations.
+    """
+
+    value: List[ObservationAggregateResponse]
@@ -4,9 +4,8 @@ from sensorthings import settings
 from sensorthings.router import SensorThingsRouter
 from sensorthings.http import SensorThingsHttpRequest
 from sensorthings.schemas import GetQueryParams, ListQueryParams
-from sensorthings.components.datastreams.schemas import Datastream
 from .schemas import (Observation, ObservationPostBody, ObservationPatchBody, ObservationListResponse,
-                      ObservationGetResponse)
+                      ObservationGetResponse, ObservationAggregateQueryParams, ObservationAggregateListResponse)
 
 
 router = SensorThingsRouter(tags=['Observations'])
@@ -63,6 +62,30 @@ def get_observation(
     )
 
 
+@router.st_get(
+    f'/Datastreams({id_qualifier}{{datastream_id}}{id_qualifier})/Observations/$aggregate',
+    response_schema=ObservationAggregateListResponse,
+    url_name='aggregate_observation'
+)
+def aggregate_observations(
+        request: SensorThingsHttpRequest,
+        datastream_id: id_type,
+        params: ObservationAggregateQueryParams = Query(...)
+):
+    """
+    Get the Observations of a Datastream aggregated over fixed time intervals.
+
+    The interval parameter sets the length of the intervals (e.g. 15min, 1h, 1d), and the fn parameter lists the
+    aggregate functions to apply to the results of each interval (mean, min, max, sum, count). Results are returned
+    in data array format with one row per interval containing Observations.
+    """
+
+    return request.engine.aggregate_observations(
+        datastream_id=datastream_id,
+        query_params=params.dict()
+    )
+
+
 @router.st_post('/Observations', url_name='create_observation')
 def create_observation(
         request: SensorThingsHttpRequest,
@@ -87,10 +110,6 @@ def create_observation(
         entity_body=observation
     )
 
-    request.engine.update_related_components(
-        component=Datastream, related_entity_id=observation.datastream.id
-    )
-
     return 201, None
 
 
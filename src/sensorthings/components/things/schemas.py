@@ -6,9 +6,10 @@ from sensorthings.schemas import BaseComponent, BaseListResponse, BaseGetRespons
 from sensorthings.types import AnyHttpUrlString
 
 if TYPE_CHECKING:
-    from sensorthings.components.locations.schemas import Location
-    from sensorthings.components.historicallocations.schemas import HistoricalLocation
-    from sensorthings.components.datastreams.schemas import Datastream
+    from sensorthings.components.locations.schemas import Location, LocationPostBody
+    from sensorthings.components.historicallocations.schemas import (HistoricalLocation,
+                                                                     HistoricalLocationNestedPostBody)
+    from sensorthings.components.datastreams.schemas import Datastream, DatastreamNestedPostBody
 
 
 class ThingFields(Schema):
@@ -73,21 +74,21 @@ class ThingPostBody(BasePostBody, ThingFields):
 
     Attributes
     ----------
-    locations : List[Union[EntityId]]
-        The IDs of the locations associated with the thing.
-    historical_locations : List[EntityId]
-        The IDs of the historical locations associated with the thing.
-    datastreams : List[EntityId]
-        The IDs of the datastreams associated with the thing.
+    locations : List[Union[EntityId, LocationPostBody]]
+        The locations associated with the thing, given by ID or created with the thing.
+    historical_locations : List[Union[EntityId, HistoricalLocationNestedPostBody]]
+        The historical locations associated with the thing, given by ID or created with the thing.
+    datastreams : List[Union[EntityId, DatastreamNestedPostBody]]
+        The datastreams associated with the thing, given by ID or created with the thing.
     """
 
-    locations: List[Union[EntityId]] = Field(
+    locations: List[Union[EntityId, 'LocationPostBody']] = Field(
         [], alias='Locations', nested_class='LocationPostBody'
     )
-    historical_locations: List[EntityId] = Field(
+    historical_locations: List[Union[EntityId, 'HistoricalLocationNestedPostBody']] = Field(
         [], alias='HistoricalLocations', nested_class='HistoricalLocationPostBody'
     )
-    datastreams: List[EntityId] = Field(
+    datastreams: List[Union[EntityId, 'DatastreamNestedPostBody']] = Field(
         [], alias='Datastreams', nested_class='DatastreamPostBody'
     )
 
@@ -0,0 +1,174 @@
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from sensorthings.profiling import profile_span
+from sensorthings import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+Compressor = Tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+
+def gzip_compressor() -> Compressor:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+
+def brotli_compressor() -> Compressor:
+    compressor = brotli.Compressor(quality=5)
+    return compressor.process, compressor.finish
+
+
+def zstd_compressor() -> Compressor:
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    return compressor.compress, compressor.flush
+
+
+compressors: Dict[str, Callable[[], Compressor]] = {
+    'gzip': gzip_compressor,
+    **({'br': brotli_compressor} if brotli is not None else {}),
+    **({'zstd': zstd_compressor} if zstandard is not None else {}),
+}
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header to the quality value of each content coding.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        The Accept-Encoding header (e.g. 'gzip;q=0.8, br').
+
+    Returns
+    -------
+    Dict[str, float]
+        The quality value of each content coding, keyed by lowercase coding name.
+    """
+
+    content_codings = {}
+
+    for content_coding in accept_encoding.split(','):
+        name, _, parameters = content_coding.partition(';')
+        quality = 1.0
+        for parameter in parameters.split(';'):
+            key, _, value = parameter.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            content_codings[name.strip().lower()] = quality
+
+    return content_codings
+
+
+def negotiate_content_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Choose the content coding of a response from the Accept-Encoding header of its request.
+
+    The codings of the ST_COMPRESSION_ENCODINGS setting whose compression library is installed are considered in the
+    order of the setting, and the first coding with the highest quality value accepted by the client is chosen.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        The Accept-Encoding header of the request.
+
+    Returns
+    -------
+    Optional[str]
+        The chosen content coding, or None if the response should not be compressed.
+    """
+
+    content_codings = parse_accept_encoding(accept_encoding)
+    chosen_coding, chosen_quality = None, 0.0
+
+    for coding in settings.ST_COMPRESSION_ENCODINGS:
+        quality = content_codings.get(coding, content_codings.get('*', 0.0))
+        if coding in compressors and quality > chosen_quality:
+            chosen_coding, chosen_quality = coding, quality
+
+    return chosen_coding
+
+
+def compress_stream(content: Iterable[bytes], coding: str) -> Iterator[bytes]:
+    """
+    Compress the chunks of a streaming response as they are produced.
+    """
+
+    compress, flush = compressors[coding]()
+
+    for chunk in content:
+        compressed_chunk = compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+
+    yield flush()
+
+
+def compress_response(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+    """
+    Compress a SensorThings response with the content coding negotiated with the client.
+
+    Responses are only compressed if the ST_COMPRESSION_ENCODINGS setting enables content codings. Buffered responses
+    smaller than the ST_COMPRESSION_MIN_SIZE setting, or which do not shrink when compressed, are left uncompressed.
+    Streaming responses are compressed chunk by chunk as they are sent. Strong ETags of compressed responses are
+    weakened.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The current HTTP request.
+    response : HttpResponse
+        The response to compress.
+
+    Returns
+    -------
+    HttpResponse
+        The response, compressed if a content coding was negotiated.
+    """
+
+    if not settings.ST_COMPRESSION_ENCODINGS or response.has_header('Content-Encoding'):
+        return response
+
+    if not response.streaming and len(response.content) < settings.ST_COMPRESSION_MIN_SIZE:
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    coding = negotiate_content_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    if coding is None:
+        return response
+
+    with profile_span(request, 'compress'):
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, coding)
+            del response['Content-Length']
+        else:
+            compressed_content = b''.join(compress_stream([response.content], coding))
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(compressed_content))
+
+    response['Content-Encoding'] = coding
+
+    # The compressed content is not byte-for-byte identical to the uncompressed content, so strong ETags are
+    # weakened, as Django's GZipMiddleware does.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+    return response
@@ -1 +1 @@
-import reimport pytzfrom abc import ABCMetafrom typing import TYPE_CHECKING, List, Optional, Type, Dict, Callable, Tuple, ForwardReffrom uuid import UUIDfrom datetime import datetimefrom dateutil.parser import isoparsefrom django.http import HttpResponsefrom ninja.errors import HttpErrorfrom odata_query.grammar import ODataParser, ODataLexerfrom odata_query.exceptions import ParsingExceptionfrom sensorthings.components.things.engine import ThingBaseEnginefrom sensorthings.components.locations.engine import LocationBaseEnginefrom sensorthings.components.historicallocations.engine import HistoricalLocationBaseEnginefrom sensorthings.components.datastreams.engine import DatastreamBaseEnginefrom sensorthings.components.sensors.engine import SensorBaseEnginefrom sensorthings.components.observedproperties.engine import ObservedPropertyBaseEnginefrom sensorthings.components.featuresofinterest.engine import FeatureOfInterestBaseEnginefrom sensorthings.components.observations.engine import ObservationBaseEnginefrom sensorthings.schemas import ListQueryParamsfrom sensorthings.components import field_schemasfrom sensorthings.components.datastreams.schemas import DatastreamPatchBodyfrom sensorthings import settingsif TYPE_CHECKING:    from sensorthings.schemas import BaseComponent, BaseGetResponse, BasePostBody, BasePatchBody    from sensorthings.http import SensorThingsHttpRequestid_qualifier = settings.ST_API_ID_QUALIFIERid_type = settings.ST_API_ID_TYPEclass SensorThingsBaseEngine(    ThingBaseEngine,    LocationBaseEngine,    HistoricalLocationBaseEngine,    DatastreamBaseEngine,    SensorBaseEngine,    ObservedPropertyBaseEngine,    FeatureOfInterestBaseEngine,    ObservationBaseEngine,    metaclass=ABCMeta):    """    Abstract base engine class for handling CRUD operations and querying SensorThings components.    Attributes    ----------    request : SensorThingsHttpRequest        The HTTP request object used for communication.    get_response_schemas : Dict[str, Type[BaseGetResponse]]        Mapping of component names to their corresponding response schemas.    """    def __init__(            self,            request: "SensorThingsHttpRequest",            get_response_schemas: Dict[str, Type["BaseGetResponse"]]    ):        self.request = request        self.get_response_schemas = get_response_schemas    def list_entities(            self,            component: Type['BaseComponent'],            query_params=None    ) -> Dict:        """        Retrieve a list of entities of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to retrieve.        query_params : Optional[dict], optional            Optional query parameters for filtering, pagination, etc.        Returns        -------        Dict            A dictionary containing the retrieved entities and optional metadata.        """        nested_entity_id = self.check_nested_path()        if nested_entity_id:            nested_entity_filter = f"{self.request.nested_path[-1][0].__name__}/id eq '{nested_entity_id}'"            query_params['filters'] = f'{query_params["filters"]} and {nested_entity_filter}' \                if query_params['filters'] else nested_entity_filter        entities, count = self.fetch_entities(component=component, query_params=query_params)        next_link = self.build_next_link(            query_params=query_params,            length=len(entities),            count=count        )        response = {            'value': list(entities.values())        }        if query_params.get('count') is True:            response['count'] = count        if next_link:            response['next_link'] = next_link        return response    def get_entity(self, component: Type['BaseComponent'], entity_id: id_type, query_params) -> Dict:        """        Retrieve a single entity of a specific component type by its ID.        Parameters        ----------        component : Type[BaseComponent]            The type of component to retrieve.        entity_id : id_type            The ID of the entity to retrieve.        query_params : dict            Optional query parameters for filtering, pagination, etc.        Returns        -------        Dict            The retrieved entity.        """        nested_entity_id = self.check_nested_path()        if nested_entity_id and entity_id in [UUID('00000000-0000-0000-0000-000000000000'), '0', 0]:            entity_id = nested_entity_id        filter_wrap = "'" if id_type == int else ''        query_params['filters'] = f"id eq {filter_wrap}{str(entity_id)}{filter_wrap}"        entities, count = self.fetch_entities(            component=component,            query_params=query_params        )        entity = next(iter(entities.values()), None)        if not entity:            raise HttpError(404, f'{component.__name__} not found.')        if self.request.value_response is True:            entity = str(entity.get(query_params['select']))        return entity    def create_entity(            self,            component: Type['BaseComponent'],            entity_body: 'BasePostBody',            response: HttpResponse    ):        """        Create a new entity of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to create.        entity_body : BasePostBody            The body containing the data for creating the entity.        response : HttpResponse            The HTTP response object to populate with the location of the created entity.        """        entity_id = getattr(self, f"create_{component.model_config['json_schema_extra']['name_ref'][1]}")(entity_body)        response['Location'] = self.build_ref_link(component, entity_id)    def create_entities(            self,            component: Type['BaseComponent'],            entity_body: 'BasePostBody',    ) -> List[str]:        """        Create multiple entities of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to create.        entity_body : BasePostBody            The body containing the data for creating the entities.        Returns        -------        List[str]            A list of IDs of the created entities.        """        return getattr(self, f"create_{component.model_config['json_schema_extra']['name_ref'][2]}")(entity_body)    def update_entity(            self,            component: Type['BaseComponent'],            entity_id: id_type,            entity_body: 'BasePatchBody',    ):        """        Update an existing entity of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to update.        entity_id : id_type            The ID of the entity to update.        entity_body : BasePatchBody            The body containing the data for updating the entity.        """        getattr(self, f"update_{component.model_config['json_schema_extra']['name_ref'][1]}")(entity_id, entity_body)    def delete_entity(            self,            component: Type['BaseComponent'],            entity_id: id_type,    ):        """        Delete an entity of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to delete.        entity_id : id_type            The ID of the entity to delete.        """        getattr(self, f"delete_{component.model_config['json_schema_extra']['name_ref'][1]}")(entity_id)    def fetch_entities(            self,            component: Type['BaseComponent'],            query_params=None,            back_ref_ids=None    ) -> Tuple[Dict[str, dict], int]:        """        Fetch entities of a specific component type with optional query parameters.        Parameters        ----------        component : Type[BaseComponent]            The type of component to fetch.        query_params : Optional[dict], optional            Optional query parameters for filtering, pagination, etc.        back_ref_ids : Optional[dict], optional            Optional back reference IDs for fetching related entities.        Returns        -------        Tuple[Dict[str, dict], int]            A tuple containing a dictionary of fetched entities and the total count of entities.        """        query_params = query_params or {}        entities, count = getattr(self, f"get_{component.model_config['json_schema_extra']['name_ref'][2]}")(            filters=self.parse_filters(query_params),            pagination=self.parse_pagination(query_params),            ordering=self.parse_ordering(query_params),            get_count=True if query_params.get('count') is True else False,            **back_ref_ids or {}        )        entities = self.insert_self_links(entities=entities, component=component)        entities = self.insert_related_entities(            entities=entities,            component=component,            query_params=query_params or {},            include_links=True if back_ref_ids is None else False        )        entities = self.remove_unselected_fields(            entities=entities,            component=component,            query_params=query_params or {}        )        return entities, count    def check_nested_path(self):        """        Check if there is a nested path in the request and return the ID of the nested entity.        Returns        -------        Optional[str]            The ID of the nested entity or None if no nested path exists.        """        previous_entity = None        for component, entity_filter_field, entity_id in self.request.nested_path:            try:                if not previous_entity and not entity_id:                    raise HttpError(404, f'{component.__name__} not found.')                if not entity_id:                    entity_id = previous_entity.get(entity_filter_field)                previous_entity = list(getattr(                    self, f"get_{component.model_config['json_schema_extra']['name_ref'][2]}"                )(                    **{f'{entity_filter_field}s': [entity_id]}                )[0].values())[0]            except IndexError:                raise HttpError(404, f'{component.__name__} not found.')        return previous_entity['id'] if previous_entity else None    def remove_unselected_fields(            self,            entities: Dict[str, dict],            component: Type['BaseComponent'],            query_params: dict    ) -> Dict[str, dict]:        """        Removes fields from entities that are not selected in query parameters.        Parameters        ----------        entities : dict            A dictionary of entities with their fields.        component : Type['BaseComponent']            The component type to process.        query_params : dict            The query parameters specifying the selected fields.        Returns        -------        dict            A dictionary of entities with only the selected fields.        """        unselected_fields = self.parse_select(component=component, query_params=query_params)        entities = {            entity_id: {                field_name: field_value for field_name, field_value in entity.items()                if field_name not in unselected_fields            } for entity_id, entity in entities.items()        }        return entities    def insert_related_entities(            self,            entities: Dict[str, dict],            component: Type['BaseComponent'],            query_params: dict,            include_links: bool = True    ) -> Dict[str, dict]:        """        Inserts related entities into the entities based on the expand query parameter.        Parameters        ----------        entities : dict            A dictionary of entities.        component : Type['BaseComponent']            The component type of the entities.        query_params : dict            The query parameters containing expand information.        include_links : bool, optional            Whether to include links to related entities (default is True).        Returns        -------        dict            A dictionary of entities with related entities inserted.        """        expand_properties = self.parse_expand(            component=component,            query_params=query_params        )        for related_component_name, related_component_field in component.get_related_components().items():            if related_component_name not in expand_properties:                if include_links is True:                    entities = {                        entity_id: {                            f'{related_component_name}_link': f'{entity["self_link"]}/{related_component_field.alias}',                            **entity                        } for entity_id, entity in entities.items()                    }            else:                related_component = related_component_field.annotation                back_ref = related_component_field.json_schema_extra['back_ref']                component_relationship = related_component_field.json_schema_extra['relationship']                if component_relationship in ['one_to_many', 'many_to_many']:                    related_component = related_component.__args__[0]                    back_ref_ids = {f'{back_ref}s': entities.keys()}                else:                    back_ref_ids = {f'{back_ref}s': [entity[back_ref] for entity in entities.values()]}                if isinstance(related_component, ForwardRef):                    related_component = getattr(field_schemas, related_component.__forward_arg__)                related_entities, _ = self.fetch_entities(                    component=related_component,                    query_params=expand_properties[related_component_name]['query_params'],                    back_ref_ids=back_ref_ids                )                related_response_schema = self.get_response_schemas[f'{related_component.__name__}GetResponse']                if component_relationship == 'many_to_many':                    entities = self.insert_entity_field(                        entities=entities,                        entity_field_name=f'{related_component_name}_rel',                        entity_function=lambda entity_id, entity: [                            related_response_schema(**related_entity).dict(by_alias=True, exclude_unset=True)                            for related_entity_id, related_entity in related_entities.items()                            if entity_id in related_entity[f'{back_ref}s']                        ]                    )                elif component_relationship == 'one_to_many':                    entities = self.insert_entity_field(                        entities=entities,                        entity_field_name=f'{related_component_name}_rel',                        entity_function=lambda entity_id, entity: [                            related_response_schema(**related_entity).dict(by_alias=True, exclude_unset=True)                            for related_entity_id, related_entity in related_entities.items()                            if related_entity[back_ref] == entity_id                        ]                    )                else:                    entities = self.insert_entity_field(                        entities=entities,                        entity_field_name=f'{related_component_name}_rel',                        entity_function=lambda entity_id, entity: related_response_schema(                            **related_entities.get(entity[back_ref])                        ).dict(by_alias=True, exclude_unset=True)                    )        return entities    def insert_self_links(self, entities: Dict[str, dict], component: Type['BaseComponent']) -> Dict[str, dict]:        """        Inserts self-links into the entities.        Parameters        ----------        entities : dict            A dictionary of entities.        component : Type['BaseComponent']            The component type of the entities.        Returns        -------        dict            A dictionary of entities with self-links inserted.        """        return self.insert_entity_field(            entities=entities,            entity_field_name='self_link',            entity_function=lambda entity_id, entity: self.build_ref_link(component, entity_id),        )    @staticmethod    def insert_entity_field(            entities: Dict[str, dict], entity_field_name: str, entity_function: Callable    ) -> Dict[str, dict]:        """        Inserts a field into each entity based on a provided function.        Parameters        ----------        entities : dict            A dictionary of entities.        entity_field_name : str            The name of the field to insert.        entity_function : Callable            A function to generate the field value.        Returns        -------        dict            A dictionary of entities with the new field inserted.        """        return {            entity_id: {                entity_field_name: entity_function(entity_id, entity),                **entity            } for entity_id, entity in entities.items()        }    def parse_select(self, component: Type['BaseComponent'], query_params: dict):        """        Parses the select query parameter to determine unselected fields.        Parameters        ----------        component : Type['BaseComponent']            The component type for which to parse the select parameter.        query_params : dict            The query parameters containing the select parameter.        Returns        -------        list            A list of unselected field names.        """        select_parameter = query_params.get('select')        if self.request.ref_response is True:            select_parameter = ['@iot.selfLink']        elif not select_parameter:            return []        else:            select_parameter = select_parameter.split(',')            if 'id' in select_parameter:                select_parameter.append('@iot.id')        unselect_components = [            field[0] for field in self.get_response_schemas[f'{component.__name__}GetResponse'].model_fields.items()            if field[1].alias not in select_parameter        ]        return unselect_components    @staticmethod    def parse_filters(query_params: dict):        """        Parses the filters query parameter into a filter object.        Parameters        ----------        query_params : dict            The query parameters containing the filters.        Returns        -------        object            The parsed filter object, or None if no filters are specified.        """        filter_string = query_params.get('filters')        if not filter_string:            return None        lexer = ODataLexer()        parser = ODataParser()        try:            return parser.parse(lexer.tokenize(filter_string))        except ParsingException:            raise HttpError(422, 'Failed to parse filter parameter.')    @staticmethod    def parse_pagination(query_params: dict) -> dict:        """        Parses pagination parameters from query parameters.        Parameters        ----------        query_params : dict            The query parameters containing pagination information.        Returns        -------        dict            A dictionary containing pagination parameters.        """        return {            'skip': query_params.get('skip') or 0,            'top': query_params.get('top') or 100,            'count': query_params.get('count') or False        }    @staticmethod    def parse_ordering(query_params: dict) -> List[dict]:        """        Parses ordering parameters from query parameters.        Parameters        ----------        query_params : dict            The query parameters containing ordering information.        Returns        -------        list of dict            A list of dictionaries specifying field names and directions for ordering.        """        order_by_string = query_params.get('order_by') or ''        ordering = [            {                'field': order_field.strip().split(' ')[0],                'direction': 'desc' if order_field.strip().endswith('desc') else 'asc'            } for order_field in order_by_string.split(',')        ] if order_by_string != '' else []        return ordering    @staticmethod    def parse_expand(component: Type['BaseComponent'], query_params: dict):        """        Parses the expand query parameter for related entities and their nested properties.        Parameters        ----------        component : Type['BaseComponent']            The component type for which to parse expand parameters.        query_params : dict            The query parameters containing the expand parameter.        Returns        -------        dict            A dictionary mapping related component names to their respective query parameters.        """        expand = query_params.get('expand') or ''        expand_properties = {}        expand_components = re.split(r',(?![^(]*\))', expand)        related_components = component.get_related_components()        for expand_component in expand_components:            component_name = re.sub(r'(?<!^)(?=[A-Z])', '_', expand_component.split('/')[0].split('(')[0]).lower()            if component_name not in related_components:                continue            nested_query_params = re.search(r'\(.*?\)', expand_component.split('/')[0])            nested_query_params = nested_query_params.group(0)[1:-1] if nested_query_params else ''            nested_query_params = {                nested_query_param.split('=')[0]: nested_query_param.split('=')[1]                for nested_query_param in nested_query_params.split('&') if nested_query_param            }            if component_name not in expand_properties:                expand_properties[component_name] = {                    'component': related_components[component_name],                    'query_params': nested_query_params,                    'join_ids': []                }            if len(expand_component.split('/')) > 1:                expand_properties[component_name]['query_params']['$expand'] = ','.join(                    (                        *expand_properties[component_name]['query_params']['$expand'].split(','),                        '/'.join(expand_component.split('/')[1:]),                    )                ) if '$expand' in expand_properties[component_name]['query_params'] else (                    '/'.join(expand_component.split('/')[1:])                )        for expand_property in expand_properties.values():            expand_property['query_params'] = ListQueryParams(**expand_property['query_params']).dict()        return expand_properties    @staticmethod    def iso_time_interval(start_time: Optional[datetime], end_time: Optional[datetime]):        """        Formats a time interval in ISO 8601 format.        Parameters        ----------        start_time : datetime, optional            The start time of the interval.        end_time : datetime, optional            The end time of the interval.        Returns        -------        Optional[str]            The formatted ISO 8601 time interval string, or None if both times are None.        """        if start_time and end_time and start_time != end_time:            return start_time.isoformat(timespec='seconds') + '/' + end_time.isoformat(timespec='seconds')        elif start_time and not end_time:            return start_time.isoformat(timespec='seconds')        elif end_time and not start_time:            return end_time.isoformat(timespec='seconds')        else:            return None    def build_ref_link(self, component: Type['BaseComponent'], entity_id: id_type):        """        Builds a reference link for an entity.        Parameters        ----------        component : Type['BaseComponent']            The component type of the entity for which to build the reference link.        entity_id : id_type            The ID of the entity.        Returns        -------        str            The constructed reference link.        """        return (            f'{self.request.sensorthings_url}/'            f'{component.model_config["json_schema_extra"]["name_ref"][0]}('            f'{id_qualifier}{str(entity_id)}{id_qualifier})'        )    def build_next_link(            self,            query_params: dict,            length: int,            count: Optional[int] = None    ):        """        Builds the next link for pagination.        Parameters        ----------        query_params : dict            The current query parameters for pagination.        length : int            The length of the current result set.        count : int, optional            The total count of entities available.        Returns        -------        Optional[str]            The constructed next link for pagination, or None if there are no more pages.        """        top = query_params.pop('top', None)        skip = query_params.pop('skip', None)        if top is None:            top = 100        if skip is None:            skip = 0        if count is not None and top + skip < count or count is None and top == length:            query_string = ListQueryParams(                top=top,                skip=top + skip,                **query_params            ).get_query_string()            return f'{self.request.sensorthings_url}/{self.request.sensorthings_path}{query_string}'        else:            return None    def update_related_components(self, component: Type['BaseComponent'], related_entity_id: id_type):        """        Updates the related components of an entity.        Parameters        ----------        component : Type['BaseComponent']            The component type of the related entity.        related_entity_id : id_type            The ID of the related entity.        Returns        -------        None        """        if component.__name__ == 'Datastream':            first_observation = next(iter(self.list_entities(                component=field_schemas.Observation,                query_params=ListQueryParams(                    select='',                    filters=f'Datastream/id eq \'{str(related_entity_id)}\'',                    expand='Datastream',                    order_by='phenomenonTime asc',                    top=1,                    count=False                ).dict()            )['value']), {})            last_observation = next(iter(self.list_entities(                component=field_schemas.Observation,                query_params=ListQueryParams(                    select='',                    filters=f'Datastream/id eq \'{str(related_entity_id)}\'',                    expand='Datastream',                    order_by='phenomenonTime desc',                    top=1,                    count=False                ).dict()            )['value']), {})            phenomenon_time_range = []            result_time_range = []            for observation in [first_observation, last_observation]:                if observation.get('phenomenon_time') is not None:                    phenomenon_time_range.append(isoparse(observation['phenomenon_time']).replace(tzinfo=pytz.UTC))                else:                    phenomenon_time_range.append(None)                if observation.get('result_time') is not None:                    result_time_range.append(isoparse(observation['result_time']).replace(tzinfo=pytz.UTC))                else:                    result_time_range.append(None)            phenomenon_time = self.iso_time_interval(phenomenon_time_range[0], phenomenon_time_range[1])            result_time = self.iso_time_interval(result_time_range[0], result_time_range[1])            phenomenon_time = phenomenon_time.replace('+00:00', 'Z') if phenomenon_time else None  # noqa            result_time = result_time.replace('+00:00', 'Z') if result_time else None  # noqa            self.update_entity(                component=field_schemas.Datastream,                entity_id=related_entity_id,                entity_body=DatastreamPatchBody(  # noqa                    phenomenon_time=phenomenon_time,                    result_time=result_time                )  # noqa            )
\ No newline at end of file
+import reimport jsonimport pytzfrom concurrent.futures import ThreadPoolExecutorfrom contextlib import nullcontextfrom urllib.parse import quotefrom abc import ABCMetafrom typing import (TYPE_CHECKING, Any, ContextManager, Hashable, Iterable, List, Optional, Type, Dict, Callable,                    Tuple, ForwardRef, Union, get_args)from uuid import UUIDfrom datetime import datetime, timedeltafrom dateutil.parser import isoparsefrom django.db import connectionsfrom django.http import HttpResponsefrom ninja.errors import HttpErrorfrom ninja.responses import NinjaJSONEncoderfrom sensorthings.components.things.engine import ThingBaseEnginefrom sensorthings.components.locations.engine import LocationBaseEnginefrom sensorthings.components.historicallocations.engine import HistoricalLocationBaseEnginefrom sensorthings.components.datastreams.engine import DatastreamBaseEnginefrom sensorthings.components.sensors.engine import SensorBaseEnginefrom sensorthings.components.observedproperties.engine import ObservedPropertyBaseEnginefrom sensorthings.components.featuresofinterest.engine import FeatureOfInterestBaseEnginefrom sensorthings.components.observations.engine import ObservationBaseEnginefrom sensorthings.query import QueryPlan, get_query_planfrom sensorthings.components import field_schemasfrom sensorthings.components.datastreams.schemas import DatastreamPatchBodyfrom sensorthings.components.observations.schemas import observationAggregateFunctionsfrom sensorthings.entities import EntityTablefrom sensorthings.cache import TTLCachefrom sensorthings.deep_insert import DeepInsertPlanfrom sensorthings.serializers import serialize_engine_outputfrom sensorthings.profiling import profile_count, profile_spanfrom sensorthings.types import ValidatedUrlStringfrom sensorthings import settingsif TYPE_CHECKING:    from sensorthings.schemas import BaseComponent, BaseGetResponse, BasePostBody, BasePatchBody    from sensorthings.http import SensorThingsHttpRequestid_qualifier = settings.ST_API_ID_QUALIFIERid_type = settings.ST_API_ID_TYPE# Characters left unescaped in entity IDs, matching the URL path encoding applied by link validation.url_path_safe_characters = "!$%&'()*+,-./:;=@[\\]^_|~"def quote_entity_id(entity_id: id_type) -> str:    """    Format an entity ID for use in an entity link.    Parameters    ----------    entity_id : id_type        The ID of the entity.    Returns    -------    str        The entity ID, percent-encoded if it may contain characters that are not allowed in a URL path.    """    if isinstance(entity_id, (int, UUID)):        return str(entity_id)    return quote(str(entity_id), safe=url_path_safe_characters)def call_in_thread(function: Callable, *args):    """    Call a function in a worker thread, closing the database connections the thread opened when it returns.    """    try:        return function(*args)    finally:        connections.close_all()latest_observation_cache = TTLCache(    max_size=settings.ST_LATEST_OBSERVATION_CACHE_SIZE,    ttl=settings.ST_LATEST_OBSERVATION_CACHE_TTL) if settings.ST_LATEST_OBSERVATION_CACHE_TTL is not None else Noneentity_caches = {    component_name: TTLCache(max_size=settings.ST_ENTITY_CACHE_SIZE, ttl=settings.ST_ENTITY_CACHE_TTL)    for component_name in settings.ST_ENTITY_CACHE_COMPONENTS} if settings.ST_ENTITY_CACHE_TTL is not None else {}class SensorThingsBaseEngine(    ThingBaseEngine,    LocationBaseEngine,    HistoricalLocationBaseEngine,    DatastreamBaseEngine,    SensorBaseEngine,    ObservedPropertyBaseEngine,    FeatureOfInterestBaseEngine,    ObservationBaseEngine,    metaclass=ABCMeta):    """    Abstract base engine class for handling CRUD operations and querying SensorThings components.    Attributes    ----------    request : SensorThingsHttpRequest        The HTTP request object used for communication.    get_response_schemas : Dict[str, Type[BaseGetResponse]]        Mapping of component names to their corresponding response schemas.    identity_map : Dict[Type[BaseComponent], Dict[str, dict]]        The entities fetched by ID during the request, keyed by component and by the string form of their IDs.        Nested path entities and many-to-one expanded entities are looked up in the identity map, and only missing        entities are fetched from the engine.    id_batch_size : Optional[int]        The maximum number of IDs the engine's get methods should receive in a single ID list argument (e.g.        datastream_ids). Longer lists of parent IDs of expanded entities are split into batches fetched with        separate calls, which run concurrently if the ST_ID_BATCH_WORKERS setting is greater than 1. Defaults to the        ST_ID_BATCH_SIZE setting, or no batching if neither is set.    supports_partitioned_pagination : bool        Whether the engine's get methods can paginate expanded related entities per parent entity. If True, the        pagination of expanded to-many relationships includes a 'partition_by' key naming the entity field that        references the parent entities (e.g. 'datastream_id'), and 'skip' and 'top' must be applied to the entities        of each parent separately, for example using ROW_NUMBER() OVER (PARTITION BY ...). For many-to-many        relationships the field holds a list of parent IDs, which the engine must reduce to the parents whose page        each returned entity falls within. If False, the engine is asked for at most ($skip + $top) related        entities per parent entity in total, and pagination is applied per parent in memory.    """    supports_partitioned_pagination = False    id_batch_size: Optional[int] = None    def __init__(            self,            request: "SensorThingsHttpRequest",            get_response_schemas: Dict[str, Type["BaseGetResponse"]]    ):        self.request = request        self.get_response_schemas = get_response_schemas        self.estimated_query_cost = None        self.actual_query_cost = 0        self.identity_map: Dict[Type['BaseComponent'], Dict[str, dict]] = {}    def list_entities(            self,            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict, None] = None    ) -> Dict:        """        Retrieve a list of entities of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to retrieve.        query_params : Union[QueryPlan, dict, None], optional            Optional query parameters for filtering, pagination, etc.        Returns        -------        Dict            A dictionary containing the retrieved entities and optional metadata.        """        query_plan = get_query_plan(query_params)        self.check_query_cost(component=component, query_params=query_plan)        query_plan = self.apply_nested_path_filter(query_plan)        if self.request.ref_response is True:            entities, count = self.fetch_entity_refs(component=component, query_params=query_plan)        else:            entities, count = self.fetch_entities(component=component, query_params=query_plan)        next_link = self.build_next_link(            query_params=query_plan,            length=len(entities),            count=count        )        response = {            'value': list(entities.values())        }        if query_plan.count is True:            response['count'] = count        if next_link:            response['next_link'] = next_link        return response    def get_entity(            self,            component: Type['BaseComponent'],            entity_id: id_type,            query_params: Union[QueryPlan, dict, None]    ) -> Union[Dict, HttpResponse]:        """        Retrieve a single entity of a specific component type by its ID.        The entity is looked up by primary key through the identity map, calling the get method of the component with        a single ID (e.g. thing_ids=[entity_id]), without parsing a filter, counting or paginating.        Parameters        ----------        component : Type[BaseComponent]            The type of component to retrieve.        entity_id : id_type            The ID of the entity to retrieve.        query_params : Union[QueryPlan, dict, None]            Optional query parameters for filtering, pagination, etc.        Returns        -------        Union[Dict, HttpResponse]            The retrieved entity, or the raw value response of a property for $value requests.        """        nested_entity_id = self.check_nested_path()        if nested_entity_id and entity_id in [UUID('00000000-0000-0000-0000-000000000000'), '0', 0]:            entity_id = nested_entity_id        query_plan = get_query_plan(query_params)        self.check_query_cost(component=component, query_params=query_plan, rows=1)        if self.request.value_response is True:            return self.fetch_entity_value(component=component, entity_id=entity_id, query_params=query_plan)        entities, count = self.fetch_entities(            component=component,            query_params=query_plan,            entity_ids=[entity_id]        )        entity = next(iter(entities.values()), None)        if not entity:            raise HttpError(404, f'{component.__name__} not found.')        return entity    def create_entity(            self,            component: Type['BaseComponent'],            entity_body: 'BasePostBody',            response: HttpResponse    ):        """        Create a new entity of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to create.        entity_body : BasePostBody            The body containing the data for creating the entity.        response : HttpResponse            The HTTP response object to populate with the location of the created entity.        Notes        -----        Entities nested in the body are created by a deep insert plan, which creates the entities of each component        with batched bulk_create_entities calls in a single atomic block. The datastreams of created observations        are updated with the time ranges of their observations.        """        plan = DeepInsertPlan(self, component, entity_body)        if len(plan.entities) == 1:            entity_id = getattr(                self, f"create_{component.model_config['json_schema_extra']['name_ref'][1]}"            )(entity_body)        else:            with self.atomic():                entity_id = plan.execute()        response['Location'] = self.build_ref_link(component, entity_id)        for created_component in dict.fromkeys(entity.component for entity in plan.entities):            self.invalidate_entity_caches(created_component)        datastream_ids = dict.fromkeys(            entity.body.datastream.id for entity in plan.entities if entity.component.__name__ == 'Observation'        )        for datastream_id in datastream_ids:            self.update_related_components(component=field_schemas.Datastream, related_entity_id=datastream_id)    def bulk_create_entities(            self,            component: Type['BaseComponent'],            entity_bodies: List['BasePostBody']    ) -> List[id_type]:        """        Create several entities of a specific component type, e.g. the entities of a deep insert.        The default implementation calls the engine's create method of the component for each entity. Engines able        to insert several rows in one statement should override it.        Parameters        ----------        component : Type[BaseComponent]            The type of component to create.        entity_bodies : List[BasePostBody]            The bodies of the entities, in which related entities are given by ID.        Returns        -------        List[id_type]            The IDs of the created entities, in the order of their bodies.        """        create_entity = getattr(self, f"create_{component.model_config['json_schema_extra']['name_ref'][1]}")        return [create_entity(entity_body) for entity_body in entity_bodies]    def atomic(self) -> ContextManager:        """        Get a context manager running the writes of a deep insert as a single unit of work.        The default implementation does nothing. Engines backed by a transactional data store should override it to        open a transaction.        Returns        -------        ContextManager            The context manager.        """        return nullcontext()    def invalidate_entity_caches(self, component: Type['BaseComponent']):        """        Clear the entity caches affected by a write to a component.        Cached entities hold the IDs of their many-to-many related entities (e.g. the location_ids of a Thing), so        the caches of the component's many-to-many related components are cleared along with its own.        Parameters        ----------        component : Type[BaseComponent]            The type of component written to.        """        if not entity_caches:            return        affected_components = [component, *(            related_component for related_component, component_relationship in (                self.get_related_component(related_component_field)                for related_component_field in component.get_related_components().values()            ) if component_relationship == 'many_to_many'        )]        for affected_component in affected_components:            entity_cache = entity_caches.get(affected_component.__name__)            if entity_cache is not None:                entity_cache.clear()    def get_entity_cache_scope(self) -> Optional[Hashable]:        """        Get the scope of the entities the engine serves to the current request.        Cached entities are keyed by engine class, scope and entity ID, so requests of different scopes never share        cached entities. Engines whose entities are the same for every request can return a constant, and engines        that serve different entities to different users or tenants should return what identifies them. The default        implementation returns None, which disables the entity caches and the latest observation cache for the        engine.        Returns        -------        Optional[Hashable]            The cache scope of the request, or None if entities must not be cached.        """        return None    def warm_entity_caches(self):        """        Fill the entity caches with the entities of the cached components, up to the cache size.        The caches are filled for the cache scope of the engine, and are not warmed if the engine does not cache        entities. Warming is not done per request; call SensorThingsAPI.warm_entity_caches at startup instead.        """        scope = self.get_entity_cache_scope()        if not entity_caches or scope is None:            return        for component_name, entity_cache in entity_caches.items():            component = getattr(field_schemas, component_name)            with profile_span(self.request, 'backend'):                entities, _ = getattr(self, f"get_{component.model_config['json_schema_extra']['name_ref'][2]}")(                    pagination={'skip': 0, 'top': entity_cache.max_size}                )            profile_count(self.request, 'backend_calls')            profile_count(self.request, 'rows', len(entities))            for entity_id, entity in entities.items():                entity_cache.set((type(self), scope, str(entity_id)), entity)    def create_entities(            self,            component: Type['BaseComponent'],            entity_body: 'BasePostBody',    ) -> List[str]:        """        Create multiple entities of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to create.        entity_body : BasePostBody            The body containing the data for creating the entities.        Returns        -------        List[str]            A list of IDs of the created entities.        """        return getattr(self, f"create_{component.model_config['json_schema_extra']['name_ref'][2]}")(entity_body)    def update_entity(            self,            component: Type['BaseComponent'],            entity_id: id_type,            entity_body: 'BasePatchBody',    ):        """        Update an existing entity of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to update.        entity_id : id_type            The ID of the entity to update.        entity_body : BasePatchBody            The body containing the data for updating the entity.        """        getattr(self, f"update_{component.model_config['json_schema_extra']['name_ref'][1]}")(entity_id, entity_body)        self.invalidate_entity_caches(component)        if component.__name__ == 'Observation' and latest_observation_cache is not None:            latest_observation_cache.clear()    def delete_entity(            self,            component: Type['BaseComponent'],            entity_id: id_type,    ):        """        Delete an entity of a specific component type.        Parameters        ----------        component : Type[BaseComponent]            The type of component to delete.        entity_id : id_type            The ID of the entity to delete.        """        getattr(self, f"delete_{component.model_config['json_schema_extra']['name_ref'][1]}")(entity_id)        self.invalidate_entity_caches(component)        if component.__name__ == 'Observation' and latest_observation_cache is not None:            latest_observation_cache.clear()    def aggregate_observations(self, datastream_id: id_type, query_params: dict) -> Dict:        """        Aggregate the observations of a datastream over fixed time intervals.        The query cost is checked as the number of intervals spanned by the phenomenon time of the datastream.        Parameters        ----------        datastream_id : id_type            The ID of the datastream to aggregate observations of.        query_params : dict            The query parameters containing the aggregation interval, functions, and filters.        Returns        -------        Dict            A dictionary containing the aggregated observations in data array format.        """        interval = self.parse_interval(query_params)        functions = self.parse_aggregate_functions(query_params)        datastreams, _ = self.get_datastreams(datastream_ids=[datastream_id])        if not datastreams:            raise HttpError(404, 'Datastream not found.')        phenomenon_time = next(iter(datastreams.values())).get('phenomenon_time')        if isinstance(phenomenon_time, str) and '/' in phenomenon_time:            start_time, end_time = (isoparse(time) for time in phenomenon_time.split('/'))            interval_count = int((end_time - start_time) / interval) + 1        else:            interval_count = 1 if phenomenon_time else 0        self.check_query_cost(component=field_schemas.Observation, query_params=query_params, rows=interval_count)        try:            aggregates = self.get_observation_aggregates(                datastream_id=datastream_id,                interval=interval,                functions=functions,                filters=self.parse_filters(query_params)            )        except NotImplementedError as e:            raise HttpError(501, str(e))        return {            'value': [{                'datastream': self.build_ref_link(field_schemas.Datastream, datastream_id),                'components': ['phenomenonTime', *functions],                'data_array': [                    [                        self.iso_time_interval(aggregate[0], aggregate[0] + interval).replace('+00:00', 'Z'),                        *aggregate[1:]                    ] for aggregate in aggregates                ]            }]        }    def fetch_entity_value(            self,            component: Type['BaseComponent'],            entity_id: id_type,            query_params: Union[QueryPlan, dict]    ) -> HttpResponse:        """        Fetch a single property of an entity and return its raw value for a $value request.        The selected property is fetched alone from the engine and written directly to the response, bypassing        response validation and JSON rendering. Strings, numbers and times are returned as text/plain, structured        values (e.g. properties or location) as application/json, and null values as 204 No Content.        Parameters        ----------        component : Type[BaseComponent]            The type of component of the entity.        entity_id : id_type            The ID of the entity.        query_params : Union[QueryPlan, dict]            The query parameters, selecting the alias of the property.        Returns        -------        HttpResponse            The raw value response.        """        select_alias = get_query_plan(query_params).select        field_name = next((            field_name for field_name, field in component.model_fields.items()            if (field.alias or field_name) == select_alias        ), None)        if field_name is None:            raise HttpError(404, f'{component.__name__} property not found.')        with profile_span(self.request, 'backend'):            value = self.get_entity_value(component=component, entity_id=entity_id, field_name=field_name)        profile_count(self.request, 'backend_calls')        profile_count(self.request, 'rows')        self.actual_query_cost += 1        if value is None:            return HttpResponse(status=204)        elif isinstance(value, (dict, list)):            return HttpResponse(json.dumps(value, cls=NinjaJSONEncoder), content_type='application/json')        elif isinstance(value, bool):            value = 'true' if value is True else 'false'        elif isinstance(value, datetime):            value = value.isoformat().replace('+00:00', 'Z')        return HttpResponse(str(value), content_type='text/plain; charset=utf-8')    def get_entity_value(self, component: Type['BaseComponent'], entity_id: id_type, field_name: str) -> Any:        """        Retrieve the value of a single property of an entity.        This method is used for $value requests. The default implementation fetches the entity by primary key through        the identity map and returns the requested field. Engines can override it to fetch only the requested        column, for example using SELECT <column> ... WHERE id = <entity_id>.        Parameters        ----------        component : Type[BaseComponent]            The type of component of the entity.        entity_id : id_type            The ID of the entity.        field_name : str            The name of the entity field to retrieve (e.g. 'properties').        Returns        -------        Any            The value of the field.        Raises        ------        HttpError            If the entity does not exist.        """        entity = self.get_identity_mapped_entities(component=component, entity_ids=[entity_id]).get(entity_id)        if not entity:            raise HttpError(404, f'{component.__name__} not found.')        return entity.get(field_name)    def fetch_entities(            self,            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict, None] = None,            back_ref_ids=None,            partition_by=None,            entity_ids=None    ) -> Tuple[Dict[str, dict], int]:        """        Fetch entities of a specific component type with optional query parameters.        Parameters        ----------        component : Type[BaseComponent]            The type of component to fetch.        query_params : Union[QueryPlan, dict, None], optional            Optional query parameters for filtering, pagination, etc.        back_ref_ids : Optional[dict], optional            Optional back reference IDs for fetching related entities.        partition_by : Optional[str], optional            Optional entity field referencing the parent entities of expanded related entities. If given,            pagination is applied separately to the entities of each parent, and no count is returned.        entity_ids : Optional[list], optional            Optional IDs of the entities to fetch through the identity map. If given, the filters and pagination of            the query parameters are not applied, and no count is returned.        Returns        -------        Tuple[Dict[str, dict], int]            A tuple containing a dictionary of fetched entities and the total count of entities.        """        query_plan = get_query_plan(query_params)        with profile_span(self.request, 'backend'):            if entity_ids is not None:                entities, count = self.get_identity_mapped_entities(component=component, entity_ids=entity_ids), None            elif partition_by is None:                entities, count = getattr(self, f"get_{component.model_config['json_schema_extra']['name_ref'][2]}")(                    filters=query_plan.filter_ast,                    pagination=query_plan.pagination,                    ordering=query_plan.ordering,                    get_count=True if query_plan.count is True else False,                    **back_ref_ids or {}                )            else:                entities, count = self.fetch_partitioned_entities(                    component=component,                    query_params=query_plan,                    back_ref_ids=back_ref_ids,                    partition_by=partition_by                ), None        if entity_ids is None:            profile_count(self.request, 'backend_calls')            profile_count(self.request, 'rows', len(entities))        self.actual_query_cost += len(entities)        entities = self.insert_self_links(entities=entities, component=component)        with profile_span(self.request, 'expand'):            entities = self.insert_related_entities(                entities=entities,                component=component,                query_params=query_plan,                include_links=True if back_ref_ids is None else False            )        entities = self.remove_unselected_fields(            entities=entities,            component=component,            query_params=query_plan        )        return entities, count    def fetch_entity_refs(            self,            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict, None] = None    ) -> Tuple[Dict[str, dict], Optional[int]]:        """        Fetch the self links of entities of a specific component type for a $ref response.        Only the IDs of the matching entities are fetched from the engine, and their self links are built directly        from the entity link prefix of the request, skipping expansion and field selection.        Parameters        ----------        component : Type[BaseComponent]            The type of component to fetch.        query_params : Union[QueryPlan, dict, None], optional            Optional query parameters for filtering, pagination, etc.        Returns        -------        Tuple[Dict[str, dict], Optional[int]]            A tuple containing a dictionary of entity self links and the total count of entities.        """        query_plan = get_query_plan(query_params)        with profile_span(self.request, 'backend'):            entity_ids, count = self.get_entity_ids(                component=component,                filters=query_plan.filter_ast,                pagination=query_plan.pagination,                ordering=query_plan.ordering,                get_count=True if query_plan.count is True else False            )        profile_count(self.request, 'backend_calls')        profile_count(self.request, 'rows', len(entity_ids))        self.actual_query_cost += len(entity_ids)        return {            entity_id: {'self_link': self.build_ref_link(component, entity_id)} for entity_id in entity_ids        }, count    def get_entity_ids(            self,            component: Type['BaseComponent'],            filters=None,            pagination: Optional[dict] = None,            ordering: Optional[List[dict]] = None,            get_count: bool = False,            **back_ref_ids    ) -> Tuple[List[id_type], Optional[int]]:        """        Retrieve the IDs of the entities of a component matching a query.        This method is used for $ref responses, which only return entity self links. The default implementation        calls the get method of the component and discards the entity fields. Engines can override it to read the        IDs from an index without fetching the entities, for example using SELECT id or an index-only scan.        Parameters        ----------        component : Type[BaseComponent]            The type of component to retrieve the IDs of.        filters : optional            The parsed filter of the query.        pagination : dict, optional            Pagination information to limit the number of results.        ordering : List[dict], optional            Ordering information to sort the results.        get_count : bool, optional            Whether to return the total number of matching entities.        **back_ref_ids            IDs of related entities to filter the results by (e.g. thing_ids).        Returns        -------        List[id_type]            The ordered IDs of the matching entities.        Optional[int]            The total number of matching entities, if requested.        """        entities, count = getattr(self, f"get_{component.model_config['json_schema_extra']['name_ref'][2]}")(            filters=filters,            pagination=pagination,            ordering=ordering,            get_count=get_count,            **back_ref_ids        )        return list(entities.keys()), count    def get_identity_mapped_entities(            self,            component: Type['BaseComponent'],            entity_ids: Iterable[id_type]    ) -> Dict[id_type, dict]:        """        Get entities by ID through the identity map of the request.        Requested IDs are deduplicated, entities fetched earlier in the request are served from the identity map,        entities of components with an entity cache (see the ST_ENTITY_CACHE_* settings and get_entity_cache_scope)        are served from the cache if they are cached, and the remaining entities are fetched from the engine in a        single call and added to the identity map and the cache.        Parameters        ----------        component : Type[BaseComponent]            The type of component to get.        entity_ids : Iterable[id_type]            The IDs of the entities, which may contain duplicates and None values.        Returns        -------        Dict[id_type, dict]            A dictionary of the found entities, keyed by their requested IDs in order of first occurrence.        """        component_entities = self.identity_map.setdefault(component, {})        requested_ids = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id is not None]        missing_ids = [entity_id for entity_id in requested_ids if str(entity_id) not in component_entities]        cache_scope = self.get_entity_cache_scope() if entity_caches else None        entity_cache = entity_caches.get(component.__name__) if cache_scope is not None else None        if missing_ids and entity_cache is not None:            for entity_id in missing_ids:                entity = entity_cache.get((type(self), cache_scope, str(entity_id)))                if entity is not None:                    component_entities[str(entity_id)] = entity                    profile_count(self.request, 'cache_hits')            missing_ids = [entity_id for entity_id in missing_ids if str(entity_id) not in component_entities]        if missing_ids:            name_ref = component.model_config['json_schema_extra']['name_ref']            get_method = getattr(self, f'get_{name_ref[2]}')            entities = self.fetch_in_batches(                fetch_batch=lambda batch_ids: get_method(**{f'{name_ref[1]}_ids': batch_ids})[0],                entity_ids=missing_ids            )            profile_count(self.request, 'backend_calls')            profile_count(self.request, 'rows', len(entities))            for entity_id, entity in entities.items():                component_entities[str(entity_id)] = entity                if entity_cache is not None:                    entity_cache.set((type(self), cache_scope, str(entity_id)), entity)        return {            entity_id: component_entities[str(entity_id)] for entity_id in requested_ids            if str(entity_id) in component_entities        }    def fetch_partitioned_entities(            self,            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict],            back_ref_ids: dict,            partition_by: str    ) -> Dict[str, dict]:        """        Fetch related entities of multiple parent entities, paginating the entities of each parent separately.        Pagination is pushed down to the engine if it supports partitioned pagination. Otherwise the page of each        parent entity is fetched with a separate call, so that every parent gets its full page.        Parameters        ----------        component : Type[BaseComponent]            The type of component to fetch.        query_params : Union[QueryPlan, dict]            The query parameters of the expanded component.        back_ref_ids : dict            The back reference IDs of the parent entities.        partition_by : str            The entity field referencing the parent entities.        Returns        -------        Dict[str, dict]            A dictionary of the fetched entities.        """        query_plan = get_query_plan(query_params)        filters = query_plan.filter_ast        pagination = query_plan.pagination        ordering = query_plan.ordering        if component.__name__ == 'Observation' and partition_by == 'datastream_id' and filters is None \                and pagination['skip'] == 0 and ordering == [{'field': 'phenomenonTime', 'direction': 'desc'}]:            return self.fetch_latest_observations(                datastream_ids=list(back_ref_ids['datastream_ids']),                top=pagination['top']            )        get_method = getattr(self, f"get_{component.model_config['json_schema_extra']['name_ref'][2]}")        back_ref_field, parent_ids = next(iter(back_ref_ids.items()))        def fetch_parent_page(parent_id):            entities, _ = get_method(                filters=filters,                pagination={**pagination, 'count': False},                ordering=ordering,                get_count=False,                **{**back_ref_ids, back_ref_field: [parent_id]}            )            # Reduce the parent references of many-to-many related entities to the parent whose page they are in.            return {                entity_id: {**entity, partition_by: [parent_id]}                if isinstance(entity.get(partition_by), (list, tuple, set)) else entity                for entity_id, entity in entities.items()            }        def fetch_batch(batch_parent_ids):            if self.supports_partitioned_pagination is not True:                return self.merge_batches(                    [fetch_parent_page(parent_id) for parent_id in batch_parent_ids], partition_by=partition_by                )            entities, _ = get_method(                filters=filters,                pagination={**pagination, 'partition_by': partition_by},                ordering=ordering,                get_count=False,                **{**back_ref_ids, back_ref_field: batch_parent_ids}            )            return entities        return self.fetch_in_batches(fetch_batch=fetch_batch, entity_ids=parent_ids, partition_by=partition_by)    def fetch_in_batches(            self,            fetch_batch: Callable[[List[id_type]], Dict[str, dict]],            entity_ids: Iterable[id_type],            partition_by: Optional[str] = None    ) -> Dict[str, dict]:        """        Fetch entities for a list of IDs in batches of at most id_batch_size IDs, and merge the results.        Batches are fetched concurrently in a thread pool if the ST_ID_BATCH_WORKERS setting is greater than 1.        Parameters        ----------        fetch_batch : Callable[[List[id_type]], Dict[str, dict]]            Called with each batch of IDs, and returning the entities fetched for the batch.        entity_ids : Iterable[id_type]            The IDs to fetch entities for.        partition_by : str, optional            The entity field referencing the parent entities of expanded related entities. Lists of parent IDs of            entities returned for several batches are merged.        Returns        -------        Dict[str, dict]            The entities of all batches, in batch order.        """        entity_ids = list(entity_ids)        batch_size = self.id_batch_size or settings.ST_ID_BATCH_SIZE        if not batch_size or len(entity_ids) <= batch_size:            return fetch_batch(entity_ids)        batches = [entity_ids[i:i + batch_size] for i in range(0, len(entity_ids), batch_size)]        workers = min(settings.ST_ID_BATCH_WORKERS or 1, len(batches))        if workers > 1:            with ThreadPoolExecutor(max_workers=workers) as executor:                results = list(executor.map(lambda batch: call_in_thread(fetch_batch, batch), batches))        else:            results = [fetch_batch(batch) for batch in batches]        return self.merge_batches(results, partition_by)    @staticmethod    def merge_batches(batches: List[Dict[str, dict]], partition_by: Optional[str] = None) -> Dict[str, dict]:        """        Merge the entities fetched for batches of IDs.        Parameters        ----------        batches : List[Dict[str, dict]]            The entities of each batch.        partition_by : str, optional            The entity field referencing the parent entities. If an entity is returned for several batches, its            lists of parent IDs are combined.        Returns        -------        Dict[str, dict]            The merged entities.        """        if all(isinstance(batch, EntityTable) for batch in batches) and len({            batch.columns for batch in batches        }) == 1:            entities = EntityTable.concat(batches)            if len(entities) == sum(len(batch) for batch in batches):                return entities        entities = {}        for batch in batches:            for entity_id, entity in batch.items():                merged_entity = entities.get(entity_id)                if merged_entity is None:                    entities[entity_id] = entity                elif partition_by is not None and isinstance(merged_entity.get(partition_by), list):                    entities[entity_id] = {                        **merged_entity,                        partition_by: list(dict.fromkeys([*merged_entity[partition_by], *entity[partition_by]]))                    }        return entities    def fetch_latest_observations(self, datastream_ids: List[id_type], top: int) -> Dict[str, dict]:        """        Fetch the most recent observations of each datastream, using the latest observation cache if it is enabled.        Cached observations are keyed by engine class, cache scope and datastream ID, and the cache is skipped if the        engine returns no cache scope for the request (see get_entity_cache_scope).        Parameters        ----------        datastream_ids : List[id_type]            The IDs of the datastreams.        top : int            The number of observations to fetch per datastream.        Returns        -------        Dict[str, dict]            A dictionary of the latest observations.        """        cache_scope = self.get_entity_cache_scope() if latest_observation_cache is not None else None        if cache_scope is None:            return self.fetch_in_batches(                fetch_batch=lambda batch_ids: self.get_latest_observations(datastream_ids=batch_ids, top=top),                entity_ids=datastream_ids            )        observations = {}        uncached_datastream_ids = []        for datastream_id in datastream_ids:            cached_observations = latest_observation_cache.get((type(self), cache_scope, datastream_id))            if cached_observations is not None and cached_observations[0] >= top:                observations.update(list(cached_observations[1].items())[:top])            else:                uncached_datastream_ids.append(datastream_id)        if uncached_datastream_ids:            fetched_observations = {datastream_id: {} for datastream_id in uncached_datastream_ids}            for observation_id, observation in self.fetch_in_batches(                fetch_batch=lambda batch_ids: self.get_latest_observations(datastream_ids=batch_ids, top=top),                entity_ids=uncached_datastream_ids            ).items():                fetched_observations.get(observation['datastream_id'], {})[observation_id] = observation            for datastream_id, datastream_observations in fetched_observations.items():                latest_observation_cache.set((type(self), cache_scope, datastream_id), (top, datastream_observations))                observations.update(datastream_observations)        return observations    @staticmethod    def paginate_partitions(entities: Dict[str, dict], partition_by: str, pagination: dict) -> Dict[str, dict]:        """        Applies pagination separately to the entities of each parent entity.        Entities referencing multiple parents are kept if they fall within the page of any parent, and their parent        references are reduced to the parents whose page they fall within.        Parameters        ----------        entities : dict            A dictionary of ordered entities.        partition_by : str            The entity field referencing the parent entities.        pagination : dict            The pagination parameters applied to each parent.        Returns        -------        dict            A dictionary of the entities within the page of their parents.        """        skip, top = pagination['skip'], pagination['top']        parent_positions = {}        paged_parent_ids = {}        for entity_id, entity in entities.items():            parent_ids = entity[partition_by]            entity_parent_ids = []            for parent_id in (parent_ids if isinstance(parent_ids, (list, tuple, set)) else [parent_ids]):                position = parent_positions.get(parent_id, 0)                parent_positions[parent_id] = position + 1                if skip <= position < skip + top:                    entity_parent_ids.append(parent_id)            if entity_parent_ids:                paged_parent_ids[entity_id] = entity_parent_ids \                    if isinstance(parent_ids, (list, tuple, set)) else parent_ids        if isinstance(entities, EntityTable):            return entities.take(paged_parent_ids).with_column(partition_by, paged_parent_ids.values())        return {            entity_id: {**entities[entity_id], partition_by: parent_ids}            for entity_id, parent_ids in paged_parent_ids.items()        }    def estimate_row_count(self, component: Type['BaseComponent']) -> Optional[int]:        """        Estimate the total number of entities of a component.        Engines can override this method to return row estimates (e.g. from table statistics), which bound the        estimated number of entities returned by a request when checking its cost. The default returns None, meaning        that no estimate is available and requested page sizes are used as they are.        Parameters        ----------        component : Type[BaseComponent]            The type of component.        Returns        -------        Optional[int]            The estimated number of entities, or None if no estimate is available.        """        return None    def estimate_query_cost(            self,            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict, None],            rows: Optional[int] = None    ) -> int:        """        Estimate the cost of a query as the number of entities it can return, including expanded entities.        Each expanded to-many relationship multiplies the number of entities of its parent by its page size, and each        expanded to-one relationship returns one entity per parent. Estimates are bounded by the row estimates of        the engine, if available.        Parameters        ----------        component : Type[BaseComponent]            The type of component being queried.        query_params : Union[QueryPlan, dict, None]            The query parameters of the component.        rows : Optional[int], optional            The estimated number of entities of the component before applying row estimates. Defaults to the page            size of the query.        Returns        -------        int            The estimated query cost.        """        query_plan = get_query_plan(query_params)        row_estimate = self.estimate_row_count(component)        if rows is None:            rows = query_plan.pagination['top']        if row_estimate is not None:            rows = min(rows, row_estimate)        cost = rows        for related_component_name, expand_property in self.parse_expand(component, query_plan).items():            related_component, component_relationship = self.get_related_component(expand_property['component'])            related_query_plan = expand_property['query_params']            cost += self.estimate_query_cost(                component=related_component,                query_params=related_query_plan,                rows=rows * related_query_plan.pagination['top']                if component_relationship in ['one_to_many', 'many_to_many'] else rows            )        return cost    def check_query_cost(            self,            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict, None],            rows: Optional[int] = None    ) -> None:        """        Check the complexity of a query against the configured limits and record its estimated cost.        The maximum $top is only checked against page sizes given explicitly in the query, and not against the $top        of the requested component if the number of entities it returns is given (e.g. for single entities).        Parameters        ----------        component : Type[BaseComponent]            The type of component being queried.        query_params : Union[QueryPlan, dict, None]            The query parameters of the request.        rows : Optional[int], optional            The number of entities requested, if it does not depend on the page size (e.g. 1 for a single entity).        Raises        ------        HttpError            If the query exceeds any of the configured limits.        """        query_plan = get_query_plan(query_params)        query_plans = [query_plan]        for level_query_plan in query_plans:            query_plans.extend(level_query_plan.expand_tree.values())        if settings.ST_MAX_EXPAND_DEPTH is not None and query_plan.expand_depth > settings.ST_MAX_EXPAND_DEPTH:            raise HttpError(400, f'Query exceeds the maximum expand depth of {settings.ST_MAX_EXPAND_DEPTH}.')        if settings.ST_MAX_TOP is not None and any(            level_query_plan.top is not None and level_query_plan.top > settings.ST_MAX_TOP            for level_query_plan in (query_plans if rows is None else query_plans[1:])        ):            raise HttpError(400, f'Query exceeds the maximum $top of {settings.ST_MAX_TOP}.')        if settings.ST_MAX_FILTER_NODES is not None and sum(            level_query_plan.filter_node_count for level_query_plan in query_plans        ) > settings.ST_MAX_FILTER_NODES:            raise HttpError(400, f'Query exceeds the maximum filter complexity of {settings.ST_MAX_FILTER_NODES}.')        self.estimated_query_cost = self.estimate_query_cost(component=component, query_params=query_plan, rows=rows)        if settings.ST_MAX_QUERY_COST is not None and self.estimated_query_cost > settings.ST_MAX_QUERY_COST:            raise HttpError(                400,                f'Query estimated cost of {self.estimated_query_cost} exceeds the maximum of '                f'{settings.ST_MAX_QUERY_COST}. Reduce $top or $expand.'            )    def check_nested_path(self):        """        Check if there is a nested path in the request and return the ID of the nested entity.        Returns        -------        Optional[str]            The ID of the nested entity or None if no nested path exists.        """        previous_entity = None        for component, entity_filter_field, entity_id in self.request.nested_path:            if not previous_entity and not entity_id:                raise HttpError(404, f'{component.__name__} not found.')            if not entity_id:                entity_id = previous_entity.get(entity_filter_field)            elif not isinstance(entity_id, id_type):                try:                    entity_id = id_type(entity_id)                except (TypeError, ValueError):                    raise HttpError(404, f'{component.__name__} not found.')            previous_entity = self.get_identity_mapped_entities(                component=component,                entity_ids=[entity_id]            ).get(entity_id)            if previous_entity is None:                raise HttpError(404, f'{component.__name__} not found.')        return previous_entity['id'] if previous_entity else None    def apply_nested_path_filter(self, query_params: Union[QueryPlan, dict]) -> Union[QueryPlan, dict]:        """        Add a filter on the nested entity of the request path to the filters query parameter.        Parameters        ----------        query_params : Union[QueryPlan, dict]            The query parameters of the request. Dictionaries are updated in place.        Returns        -------        Union[QueryPlan, dict]            The updated query parameters.        """        nested_entity_id = self.check_nested_path()        if nested_entity_id:            nested_entity_filter = f"{self.request.nested_path[-1][0].__name__}/id eq '{nested_entity_id}'"            filters = f'{query_params.get("filters")} and {nested_entity_filter}' \                if query_params.get('filters') else nested_entity_filter            if isinstance(query_params, QueryPlan):                return query_params.replace(filters=filters)            query_params['filters'] = filters        return query_params    def remove_unselected_fields(            self,            entities: Dict[str, dict],            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict]    ) -> Dict[str, dict]:        """        Removes fields from entities that are not selected in query parameters.        Parameters        ----------        entities : dict            A dictionary of entities with their fields.        component : Type['BaseComponent']            The component type to process.        query_params : Union[QueryPlan, dict]            The query parameters specifying the selected fields.        Returns        -------        dict            A dictionary of entities with only the selected fields.        """        unselected_fields = self.parse_select(component=component, query_params=query_params)        if isinstance(entities, EntityTable):            return entities.without_columns(unselected_fields)        entities = {            entity_id: {                field_name: field_value for field_name, field_value in entity.items()                if field_name not in unselected_fields            } for entity_id, entity in entities.items()        }        return entities    def insert_related_entities(            self,            entities: Dict[str, dict],            component: Type['BaseComponent'],            query_params: Union[QueryPlan, dict],            include_links: bool = True    ) -> Dict[str, dict]:        """        Inserts related entities into the entities based on the expand query parameter.        Parameters        ----------        entities : dict            A dictionary of entities.        component : Type['BaseComponent']            The component type of the entities.        query_params : Union[QueryPlan, dict]            The query parameters containing expand information.        include_links : bool, optional            Whether to include links to related entities (default is True).        Returns        -------        dict            A dictionary of entities with related entities inserted.        """        expand_properties = self.parse_expand(            component=component,            query_params=query_params        )        if include_links is True:            entities = self.insert_navigation_links(                entities=entities,                component=component,                navigation_links=[                    navigation_link for related_component_name, navigation_link                    in component.get_navigation_link_suffixes().items()                    if related_component_name not in expand_properties                ]            )        for related_component_name, related_component_field in component.get_related_components().items():            if related_component_name not in expand_properties:                continue            related_component, component_relationship = self.get_related_component(related_component_field)            back_ref = related_component_field.json_schema_extra['back_ref']            related_query_plan = get_query_plan(expand_properties[related_component_name]['query_params'])            entity_ids = None            if component_relationship in ['one_to_many', 'many_to_many']:                back_ref_ids = {f'{back_ref}s': entities.keys()}                partition_by = f'{back_ref}s' if component_relationship == 'many_to_many' else back_ref            else:                parent_ids = list(dict.fromkeys(entity[back_ref] for entity in entities.values()))                back_ref_ids = {f'{back_ref}s': parent_ids}                partition_by = None                if related_query_plan.filters is None:                    entity_ids = parent_ids            related_entities, _ = self.fetch_entities(                component=related_component,                query_params=related_query_plan,                back_ref_ids=back_ref_ids,                partition_by=partition_by,                entity_ids=entity_ids            )            related_response_schema = self.get_response_schemas[f'{related_component.__name__}GetResponse']            if component_relationship in ['one_to_many', 'many_to_many']:                related_entities_by_parent = {}                for related_entity in related_entities.values():                    related_entity_response = self.serialize_related_entity(related_response_schema, related_entity)                    parent_ids = related_entity[partition_by]                    for parent_id in (parent_ids if component_relationship == 'many_to_many' else [parent_ids]):                        related_entities_by_parent.setdefault(parent_id, []).append(related_entity_response)                entities = self.insert_entity_field(                    entities=entities,                    entity_field_name=f'{related_component_name}_rel',                    entity_function=lambda entity_id, entity: related_entities_by_parent.get(entity_id, [])                )            else:                entities = self.insert_entity_field(                    entities=entities,                    entity_field_name=f'{related_component_name}_rel',                    entity_function=lambda entity_id, entity: self.serialize_related_entity(                        related_response_schema, related_entities.get(entity[back_ref])                    )                )        return entities    @staticmethod    def get_related_component(related_component_field) -> Tuple[Type['BaseComponent'], str]:        """        Get the component type and relationship of a related component field.        Parameters        ----------        related_component_field : FieldInfo            The field of the related component.        Returns        -------        Tuple[Type[BaseComponent], str]            The related component type and the relationship to it (e.g. 'one_to_many').        """        related_component = related_component_field.annotation        component_relationship = related_component_field.json_schema_extra['relationship']        if component_relationship in ['one_to_many', 'many_to_many']:            related_component = related_component.__args__[0]        if isinstance(related_component, ForwardRef):            related_component = getattr(field_schemas, related_component.__forward_arg__)        return related_component, component_relationship    def serialize_related_entity(self, response_schema: Type['BaseGetResponse'], entity: dict) -> dict:        """        Serializes an expanded related entity using its response schema.        The entity is validated against the response schema unless the request trusts the engine output, in which        case its fields are only mapped to their aliases.        Parameters        ----------        response_schema : Type['BaseGetResponse']            The response schema of the related entity.        entity : dict            The related entity.        Returns        -------        dict            The serialized related entity.        """        if getattr(self.request, 'trusted_engine_output', False) is True:            return serialize_engine_output(response_schema, entity)        return response_schema(**entity).dict(by_alias=True, exclude_unset=True)    def insert_navigation_links(            self,            entities: Dict[str, dict],            component: Type['BaseComponent'],            navigation_links: List[Tuple[str, str]]    ) -> Dict[str, dict]:        """        Inserts navigation links to related components into the entities.        Parameters        ----------        entities : dict            A dictionary of entities with self-links.        component : Type['BaseComponent']            The component type of the entities.        navigation_links : List[Tuple[str, str]]            The field name and path suffix of each navigation link to insert.        Returns        -------        dict            A dictionary of entities with navigation links inserted.        """        if not navigation_links:            return entities        link_type = ValidatedUrlString if component in getattr(self.request, 'entity_link_prefixes', {}) else str        if isinstance(entities, EntityTable):            self_links = entities.column('self_link')            return entities.with_columns({                field_name: [link_type(self_link + suffix) for self_link in self_links]                for field_name, suffix in navigation_links            })        return {            entity_id: {                **{field_name: link_type(entity['self_link'] + suffix) for field_name, suffix in navigation_links},                **entity            } for entity_id, entity in entities.items()        }    def insert_self_links(self, entities: Dict[str, dict], component: Type['BaseComponent']) -> Dict[str, dict]:        """        Inserts self-links into the entities.        Parameters        ----------        entities : dict            A dictionary of entities.        component : Type['BaseComponent']            The component type of the entities.        Returns        -------        dict            A dictionary of entities with self-links inserted.        """        return self.insert_entity_field(            entities=entities,            entity_field_name='self_link',            entity_function=lambda entity_id, entity: self.build_ref_link(component, entity_id),        )    @staticmethod    def insert_entity_field(            entities: Dict[str, dict], entity_field_name: str, entity_function: Callable    ) -> Dict[str, dict]:        """        Inserts a field into each entity based on a provided function.        Parameters        ----------        entities : dict            A dictionary of entities.        entity_field_name : str            The name of the field to insert.        entity_function : Callable            A function to generate the field value.        Returns        -------        dict            A dictionary of entities with the new field inserted.        """        if isinstance(entities, EntityTable):            return entities.with_column(                entity_field_name,                [entity_function(entity_id, entity) for entity_id, entity in entities.items()]            )        return {            entity_id: {                entity_field_name: entity_function(entity_id, entity),                **entity            } for entity_id, entity in entities.items()        }    def parse_select(self, component: Type['BaseComponent'], query_params: Union[QueryPlan, dict]):        """        Parses the select query parameter to determine unselected fields.        Parameters        ----------        component : Type['BaseComponent']            The component type for which to parse the select parameter.        query_params : Union[QueryPlan, dict]            The query parameters containing the select parameter.        Returns        -------        list            A list of unselected field names.        """        select_parameter = get_query_plan(query_params).select_fields        if self.request.ref_response is True:            select_parameter = ('@iot.selfLink',)        elif not select_parameter:            return []        elif 'id' in select_parameter:            select_parameter = (*select_parameter, '@iot.id')        unselect_components = [            field[0] for field in self.get_response_schemas[f'{component.__name__}GetResponse'].model_fields.items()            if field[1].alias not in select_parameter        ]        return unselect_components    @staticmethod    def parse_filters(query_params: Union[QueryPlan, dict]):        """        Parses the filters query parameter into a filter object.        Parameters        ----------        query_params : Union[QueryPlan, dict]            The query parameters containing the filters.        Returns        -------        object            The parsed filter object, or None if no filters are specified.        """        return get_query_plan(query_params).filter_ast    @staticmethod    def parse_pagination(query_params: Union[QueryPlan, dict]) -> dict:        """        Parses pagination parameters from query parameters.        Parameters        ----------        query_params : Union[QueryPlan, dict]            The query parameters containing pagination information.        Returns        -------        dict            A dictionary containing pagination parameters.        """        return get_query_plan(query_params).pagination    @staticmethod    def parse_ordering(query_params: Union[QueryPlan, dict]) -> List[dict]:        """        Parses ordering parameters from query parameters.        Parameters        ----------        query_params : Union[QueryPlan, dict]            The query parameters containing ordering information.        Returns        -------        list of dict            A list of dictionaries specifying field names and directions for ordering.        """        return get_query_plan(query_params).ordering    @staticmethod    def parse_expand(component: Type['BaseComponent'], query_params: Union[QueryPlan, dict]):        """        Parses the expand query parameter for related entities and their nested properties.        Parameters        ----------        component : Type['BaseComponent']            The component type for which to parse expand parameters.        query_params : Union[QueryPlan, dict]            The query parameters containing the expand parameter.        Returns        -------        dict            A dictionary mapping related component names to their respective query plans.        """        related_components = component.get_related_components()        return {            component_name: {                'component': related_components[component_name],                'query_params': expand_query_plan,                'join_ids': []            } for component_name, expand_query_plan in get_query_plan(query_params).expand_tree.items()            if component_name in related_components        }    @staticmethod    def parse_interval(query_params: dict) -> timedelta:        """        Parses the aggregation interval query parameter.        Parameters        ----------        query_params : dict            The query parameters containing the interval (e.g. '30s', '15min', '1h', '1d', '1w').        Returns        -------        timedelta            The length of the aggregation intervals.        Raises        ------        HttpError            If the interval can not be parsed, or is longer than 100 years.        """        interval = re.fullmatch(r'(\d{1,12})(s|min|h|d|w)', query_params.get('interval') or '')        if not interval or int(interval.group(1)) == 0:            raise HttpError(422, 'Failed to parse interval parameter.')        try:            interval = timedelta(**{                {'s': 'seconds', 'min': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}[interval.group(2)]:                int(interval.group(1))            })        except OverflowError:            interval = None        if interval is None or interval > timedelta(days=36525):            raise HttpError(422, 'The interval parameter must not be longer than 100 years.')        return interval    @staticmethod    def parse_aggregate_functions(query_params: dict) -> List[str]:        """        Parses the aggregate functions query parameter.        Parameters        ----------        query_params : dict            The query parameters containing a comma-separated list of aggregate functions.        Returns        -------        list of str            The aggregate functions to apply.        """        functions = [function.strip() for function in (query_params.get('functions') or 'mean').split(',')]        if any(function not in get_args(observationAggregateFunctions) for function in functions):            raise HttpError(422, 'Failed to parse fn parameter.')        return functions    @staticmethod    def iso_time_interval(start_time: Optional[datetime], end_time: Optional[datetime]):        """        Formats a time interval in ISO 8601 format.        Parameters        ----------        start_time : datetime, optional            The start time of the interval.        end_time : datetime, optional            The end time of the interval.        Returns        -------        Optional[str]            The formatted ISO 8601 time interval string, or None if both times are None.        """        if start_time and end_time and start_time != end_time:            return start_time.isoformat(timespec='seconds') + '/' + end_time.isoformat(timespec='seconds')        elif start_time and not end_time:            return start_time.isoformat(timespec='seconds')        elif end_time and not start_time:            return end_time.isoformat(timespec='seconds')        else:            return None    def build_ref_link(self, component: Type['BaseComponent'], entity_id: id_type):        """        Builds a reference link for an entity.        Links are built from the entity link prefixes computed for the request, and are marked as validated so that        response validation does not parse them again.        Parameters        ----------        component : Type['BaseComponent']            The component type of the entity for which to build the reference link.        entity_id : id_type            The ID of the entity.        Returns        -------        str            The constructed reference link.        """        entity_link_prefix = getattr(self.request, 'entity_link_prefixes', {}).get(component)        if entity_link_prefix is not None:            return ValidatedUrlString(f'{entity_link_prefix}{quote_entity_id(entity_id)}{id_qualifier})')        return (            f'{self.request.sensorthings_url}/'            f'{component.model_config["json_schema_extra"]["name_ref"][0]}('            f'{id_qualifier}{quote_entity_id(entity_id)}{id_qualifier})'        )    def build_next_link(            self,            query_params: Union[QueryPlan, dict],            length: int,            count: Optional[int] = None    ):        """        Builds the next link for pagination.        Parameters        ----------        query_params : Union[QueryPlan, dict]            The current query parameters for pagination.        length : int            The length of the current result set.        count : int, optional            The total count of entities available.        Returns        -------        Optional[str]            The constructed next link for pagination, or None if there are no more pages.        """        query_plan = get_query_plan(query_params)        top = query_plan.top        skip = query_plan.skip        if top is None:            top = 100        if skip is None:            skip = 0        if count is not None and top + skip < count or count is None and top == length:            query_string = query_plan.get_query_string(top=top, skip=top + skip)            return f'{self.request.sensorthings_url}/{self.request.sensorthings_path}{query_string}'        else:            return None    def update_related_components(self, component: Type['BaseComponent'], related_entity_id: id_type):        """        Updates the related components of an entity.        Parameters        ----------        component : Type['BaseComponent']            The component type of the related entity.        related_entity_id : id_type            The ID of the related entity.        Returns        -------        None        """        if component.__name__ == 'Datastream':            if latest_observation_cache is not None:                latest_observation_cache.delete_where(                    lambda key: key[0] is type(self) and key[2] == related_entity_id                )            first_observation = next(iter(self.fetch_entities(                component=field_schemas.Observation,                query_params=QueryPlan(                    select='',                    filters=f'Datastream/id eq \'{str(related_entity_id)}\'',                    expand='Datastream',                    order_by='phenomenonTime asc',                    top=1,                    count=False                )            )[0].values()), {})            last_observation = next(iter(self.fetch_entities(                component=field_schemas.Observation,                query_params=QueryPlan(                    select='',                    filters=f'Datastream/id eq \'{str(related_entity_id)}\'',                    expand='Datastream',                    order_by='phenomenonTime desc',                    top=1,                    count=False                )            )[0].values()), {})            phenomenon_time_range = []            result_time_range = []            for observation in [first_observation, last_observation]:                if observation.get('phenomenon_time') is not None:                    phenomenon_time_range.append(isoparse(observation['phenomenon_time']).replace(tzinfo=pytz.UTC))                else:                    phenomenon_time_range.append(None)                if observation.get('result_time') is not None:                    result_time_range.append(isoparse(observation['result_time']).replace(tzinfo=pytz.UTC))                else:                    result_time_range.append(None)            phenomenon_time = self.iso_time_interval(phenomenon_time_range[0], phenomenon_time_range[1])            result_time = self.iso_time_interval(result_time_range[0], result_time_range[1])            phenomenon_time = phenomenon_time.replace('+00:00', 'Z') if phenomenon_time else None  # noqa            result_time = result_time.replace('+00:00', 'Z') if result_time else None  # noqa            self.update_entity(                component=field_schemas.Datastream,                entity_id=related_entity_id,                entity_body=DatastreamPatchBody(  # noqa                    phenomenon_time=phenomenon_time,                    result_time=result_time                )  # noqa            )
\ No newline at end of file
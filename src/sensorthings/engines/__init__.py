@@ -0,0 +1,8 @@
+from sensorthings.engines.memory import InMemorySensorThingsEngine, InMemoryStore
+from sensorthings.engines.orm import DjangoORMEngine
+
+__all__ = [
+    "DjangoORMEngine",
+    "InMemorySensorThingsEngine",
+    "InMemoryStore"
+]
@@ -0,0 +1,377 @@
+from abc import abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+from ninja.errors import HttpError
+from sensorthings.components import field_schemas
+from sensorthings.engine import SensorThingsBaseEngine
+from sensorthings.extensions.dataarray.engine import DataArrayBaseEngine
+
+
+if TYPE_CHECKING:
+    from sensorthings.schemas import BaseComponent, BasePostBody, BasePatchBody
+
+
+@dataclass(frozen=True)
+class Relation:
+    """
+    A relationship between two components, as stored in the entities of an in-memory table.
+
+    Attributes
+    ----------
+    name : str
+        The field name of the relationship (e.g. 'datastreams').
+    alias : str
+        The navigation property of the relationship (e.g. 'Datastreams').
+    component : Type[BaseComponent]
+        The related component.
+    relationship : str
+        The type of relationship ('many_to_one', 'one_to_many' or 'many_to_many').
+    local_field : Optional[str]
+        The entity field holding the related entity IDs, for many-to-one and many-to-many relationships.
+    remote_field : Optional[str]
+        The related entity field holding the IDs of the entity, for one-to-many and many-to-many relationships.
+    """
+
+    name: str
+    alias: str
+    component: Type['BaseComponent']
+    relationship: str
+    local_field: Optional[str]
+    remote_field: Optional[str]
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """
+    The fields, relationships and indexed fields of the entities of a component.
+
+    Attributes
+    ----------
+    component : Type[BaseComponent]
+        The component.
+    singular_name : str
+        The singular snake case name of the component (e.g. 'datastream').
+    field_names : Dict[str, str]
+        The entity field name of each property, keyed by property alias and by field name.
+    relations : Dict[str, Relation]
+        The relationships of the component, keyed by navigation property, by field name and by the name of the
+        related component, which the filters of nested request paths use (e.g. Thing/id for Things(1)/Locations).
+    indexed_fields : Tuple[str, ...]
+        The foreign key fields referencing other entities, which are indexed.
+    """
+
+    component: Type['BaseComponent']
+    singular_name: str
+    field_names: Dict[str, str]
+    relations: Dict[str, Relation]
+    indexed_fields: Tuple[str, ...]
+
+
+def get_components() -> List[Type['BaseComponent']]:
+    return [getattr(field_schemas, component_name) for component_name in field_schemas.__all__]
+
+
+@lru_cache(maxsize=None)
+def get_table_schema(component: Type['BaseComponent']) -> TableSchema:
+    """
+    Get the schema of the in-memory table of a component.
+
+    Entities reference the entities of many-to-one relationships with a '<name>_id' field (e.g. a Datastream's
+    'thing_id'), and the entities of many-to-many relationships with a '<name>_ids' field on both sides (e.g. a
+    Thing's 'location_ids' and a Location's 'thing_ids'), matching the arguments of the engine get methods.
+
+    Parameters
+    ----------
+    component : Type[BaseComponent]
+        The component.
+
+    Returns
+    -------
+    TableSchema
+        The table schema.
+    """
+
+    related_components = component.get_related_components()
+    field_names = {'id': 'id', '@iot.id': 'id'}
+
+    for field_name, field in component.model_fields.items():
+        if field_name not in related_components:
+            field_names[field.alias or field_name] = field_name
+            field_names[field_name] = field_name
+
+    relations = {}
+
+    for field_name, field in related_components.items():
+        related_component, relationship = SensorThingsBaseEngine.get_related_component(field)
+        back_ref = field.json_schema_extra['back_ref']
+
+        if relationship == 'many_to_one':
+            local_field, remote_field = back_ref, None
+        elif relationship == 'one_to_many':
+            local_field, remote_field = None, back_ref
+        else:
+            reverse_field = next(
+                reverse_field for reverse_field in related_component.get_related_components().values()
+                if SensorThingsBaseEngine.get_related_component(reverse_field) == (component, 'many_to_many')
+            )
+            local_field, remote_field = f"{reverse_field.json_schema_extra['back_ref']}s", f'{back_ref}s'
+
+        relation = Relation(field_name, field.alias, related_component, relationship, local_field, remote_field)
+        relations[field.alias] = relations[field_name] = relation
+        relations.setdefault(related_component.__name__, relation)
+
+    return TableSchema(
+        component=component,
+        singular_name=component.model_config['json_schema_extra']['name_ref'][1],
+        field_names=field_names,
+        relations=relations,
+        indexed_fields=tuple(dict.fromkeys(
+            relation.local_field for relation in relations.values() if relation.local_field is not None
+        ))
+    )
+
+
+class GenericSensorThingsEngine(SensorThingsBaseEngine, DataArrayBaseEngine):
+    """
+    Base class of engines that handle every component with the same generic query and write methods.
+
+    The component get, create, update and delete methods of the SensorThings engine interface are dispatched to
+    query_entities, create_component_entity, update_component_entity and delete_component_entity, which subclasses
+    implement for their storage.
+    """
+
+    @abstractmethod
+    def query_entities(
+            self,
+            component: Type['BaseComponent'],
+            related_ids: Dict[str, Optional[Iterable[Any]]],
+            pagination: Optional[dict] = None,
+            ordering: Optional[List[dict]] = None,
+            filters: Any = None,
+            get_count: bool = False
+    ) -> Tuple[Dict[Any, dict], Optional[int]]:
+        """
+        Query the entities of a component.
+
+        Parameters
+        ----------
+        component : Type[BaseComponent]
+            The component to query.
+        related_ids : Dict[str, Optional[Iterable[Any]]]
+            The ID arguments of the get method (e.g. {'thing_ids': [1], 'location_ids': None}).
+        pagination : dict, optional
+            The pagination of the query, optionally partitioned by a field.
+        ordering : List[dict], optional
+            The fields and directions to order the entities by.
+        filters : Any, optional
+            The parsed filter of the query.
+        get_count : bool, optional
+            Whether to count the matching entities. Default is False.
+
+        Returns
+        -------
+        Tuple[Dict[Any, dict], Optional[int]]
+            The entities keyed by ID, and their total count if requested.
+        """
+
+        pass
+
+    @abstractmethod
+    def create_component_entity(self, component: Type['BaseComponent'], entity_body: 'BasePostBody') -> Any:
+        """
+        Create an entity of a component, returning its ID.
+        """
+
+        pass
+
+    def create_component_entities(self, component: Type['BaseComponent'], entity_bodies: List['BasePostBody']) -> List:
+        """
+        Create several entities of a component, returning their IDs.
+
+        The entities are created one at a time, unless a subclass overrides this method to insert them together.
+        """
+
+        return [self.create_component_entity(component, entity_body) for entity_body in entity_bodies]
+
+    def bulk_create_entities(self, component, entity_bodies):
+        return self.create_component_entities(component, entity_bodies)
+
+    @abstractmethod
+    def update_component_entity(
+            self,
+            component: Type['BaseComponent'],
+            entity_id: Any,
+            entity_body: 'BasePatchBody'
+    ) -> None:
+        """
+        Update an entity of a component.
+        """
+
+        pass
+
+    @abstractmethod
+    def delete_component_entity(self, component: Type['BaseComponent'], entity_id: Any) -> None:
+        """
+        Delete an entity of a component.
+        """
+
+        pass
+
+    @staticmethod
+    def get_field_name(schema: TableSchema, alias: str) -> str:
+        try:
+            return schema.field_names[alias]
+        except KeyError:
+            raise HttpError(400, f"Unknown property '{alias}' of {schema.component.__name__}.")
+
+    def get_entity_fields(
+            self,
+            component: Type['BaseComponent'],
+            entity_body: Union['BasePostBody', 'BasePatchBody'],
+            exclude_unset: bool = False
+    ) -> Tuple[dict, dict]:
+        """
+        Split a request body into the fields of an entity and the IDs of its related entities.
+        """
+
+        schema = get_table_schema(component)
+        fields, relations = {}, {}
+
+        for field_name, value in entity_body.model_dump(by_alias=False, exclude_unset=exclude_unset).items():
+            if field_name not in schema.relations:
+                fields[field_name] = value
+            elif isinstance(value, list):
+                relations[field_name] = [related_entity['id'] for related_entity in value]
+            elif value is not None:
+                relations[field_name] = value['id']
+
+        return fields, relations
+
+    def get_things(self, thing_ids=None, location_ids=None, pagination=None, ordering=None, filters=None,
+                   expanded=False, get_count=False):
+        return self.query_entities(field_schemas.Thing, {
+            'thing_ids': thing_ids, 'location_ids': location_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_locations(self, location_ids=None, thing_ids=None, historical_location_ids=None, pagination=None,
+                      ordering=None, filters=None, expanded=False, get_count=False):
+        return self.query_entities(field_schemas.Location, {
+            'location_ids': location_ids, 'thing_ids': thing_ids, 'historical_location_ids': historical_location_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_historical_locations(self, historical_location_ids=None, thing_ids=None, location_ids=None,
+                                 pagination=None, ordering=None, filters=None, expanded=False, get_count=False):
+        return self.query_entities(field_schemas.HistoricalLocation, {
+            'historical_location_ids': historical_location_ids, 'thing_ids': thing_ids, 'location_ids': location_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_sensors(self, sensor_ids=None, pagination=None, ordering=None, filters=None, expanded=False,
+                    get_count=False):
+        return self.query_entities(field_schemas.Sensor, {
+            'sensor_ids': sensor_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_observed_properties(self, observed_property_ids=None, pagination=None, ordering=None, filters=None,
+                                expanded=False, get_count=False):
+        return self.query_entities(field_schemas.ObservedProperty, {
+            'observed_property_ids': observed_property_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_features_of_interest(self, feature_of_interest_ids=None, observation_ids=None, pagination=None,
+                                 ordering=None, filters=None, expanded=False, get_count=False):
+        return self.query_entities(field_schemas.FeatureOfInterest, {
+            'feature_of_interest_ids': feature_of_interest_ids, 'observation_ids': observation_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_datastreams(self, datastream_ids=None, observed_property_ids=None, sensor_ids=None, thing_ids=None,
+                        pagination=None, ordering=None, filters=None, expanded=False, get_count=False):
+        return self.query_entities(field_schemas.Datastream, {
+            'datastream_ids': datastream_ids, 'observed_property_ids': observed_property_ids,
+            'sensor_ids': sensor_ids, 'thing_ids': thing_ids
+        }, pagination, ordering, filters, get_count)
+
+    def get_observations(self, observation_ids=None, datastream_ids=None, feature_of_interest_ids=None,
+                         pagination=None, ordering=None, filters=None, expanded=False, get_count=False):
+        return self.query_entities(field_schemas.Observation, {
+            'observation_ids': observation_ids, 'datastream_ids': datastream_ids,
+            'feature_of_interest_ids': feature_of_interest_ids
+        }, pagination, ordering, filters, get_count)
+
+    def create_observations(self, observations):
+        return [
+            self.create_observation(observation)
+            for datastream_observations in observations.values() for observation in datastream_observations
+        ]
+
+    def create_thing(self, thing):
+        return self.create_component_entity(field_schemas.Thing, thing)
+
+    def create_location(self, location):
+        return self.create_component_entity(field_schemas.Location, location)
+
+    def create_historical_location(self, historical_location):
+        return self.create_component_entity(field_schemas.HistoricalLocation, historical_location)
+
+    def create_sensor(self, sensor):
+        return self.create_component_entity(field_schemas.Sensor, sensor)
+
+    def create_observed_property(self, observed_property):
+        return self.create_component_entity(field_schemas.ObservedProperty, observed_property)
+
+    def create_feature_of_interest(self, feature_of_interest):
+        return self.create_component_entity(field_schemas.FeatureOfInterest, feature_of_interest)
+
+    def create_datastream(self, datastream):
+        return self.create_component_entity(field_schemas.Datastream, datastream)
+
+    def create_observation(self, observation):
+        return self.create_component_entity(field_schemas.Observation, observation)
+
+    def update_thing(self, thing_id, thing):
+        self.update_component_entity(field_schemas.Thing, thing_id, thing)
+
+    def update_location(self, location_id, location):
+        self.update_component_entity(field_schemas.Location, location_id, location)
+
+    def update_historical_location(self, historical_location_id, historical_location):
+        self.update_component_entity(field_schemas.HistoricalLocation, historical_location_id, historical_location)
+
+    def update_sensor(self, sensor_id, sensor):
+        self.update_component_entity(field_schemas.Sensor, sensor_id, sensor)
+
+    def update_observed_property(self, observed_property_id, observed_property):
+        self.update_component_entity(field_schemas.ObservedProperty, observed_property_id, observed_property)
+
+    def update_feature_of_interest(self, feature_of_interest_id, feature_of_interest):
+        self.update_component_entity(field_schemas.FeatureOfInterest, feature_of_interest_id, feature_of_interest)
+
+    def update_datastream(self, datastream_id, datastream):
+        self.update_component_entity(field_schemas.Datastream, datastream_id, datastream)
+
+    def update_observation(self, observation_id, observation):
+        self.update_component_entity(field_schemas.Observation, observation_id, observation)
+
+    def delete_thing(self, thing_id):
+        self.delete_component_entity(field_schemas.Thing, thing_id)
+
+    def delete_location(self, location_id):
+        self.delete_component_entity(field_schemas.Location, location_id)
+
+    def delete_historical_location(self, historical_location_id):
+        self.delete_component_entity(field_schemas.HistoricalLocation, historical_location_id)
+
+    def delete_sensor(self, sensor_id):
+        self.delete_component_entity(field_schemas.Sensor, sensor_id)
+
+    def delete_observed_property(self, observed_property_id):
+        self.delete_component_entity(field_schemas.ObservedProperty, observed_property_id)
+
+    def delete_feature_of_interest(self, feature_of_interest_id):
+        self.delete_component_entity(field_schemas.FeatureOfInterest, feature_of_interest_id)
+
+    def delete_datastream(self, datastream_id):
+        self.delete_component_entity(field_schemas.Datastream, datastream_id)
+
+    def delete_observation(self, observation_id):
+        self.delete_component_entity(field_schemas.Observation, observation_id)
@@ -0,0 +1,859 @@
+import math
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import islice
+from threading import RLock
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Type
+from datetime import datetime
+from ninja.errors import HttpError
+from odata_query import ast
+from sensorthings.components import field_schemas
+from sensorthings.engines.generic import GenericSensorThingsEngine, TableSchema, get_components, get_table_schema
+from sensorthings.engines.predicates import Getter, ValueSet, compile_filter, get_literal_value, get_path, \
+    parse_datetime
+from sensorthings import settings
+
+
+if TYPE_CHECKING:
+    from sensorthings.schemas import BaseComponent, BasePostBody, BasePatchBody
+
+
+id_type = settings.ST_API_ID_TYPE
+
+# The partition and time fields of the sorted time indexes kept for each component.
+time_indexes = {
+    'Observation': ('datastream_id', 'phenomenon_time'),
+    'HistoricalLocation': ('thing_id', 'time'),
+}
+
+
+def normalize_id(value: Any) -> Any:
+    """
+    Convert an entity ID given as a string (e.g. from a URL or a quoted filter value) to the configured ID type.
+    """
+
+    if isinstance(value, id_type) or value is None:
+        return value
+
+    try:
+        return id_type(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def get_time_key(value: Any) -> float:
+    """
+    Get the sort key of a time value in a sorted time index. Missing and invalid times sort first.
+    """
+
+    if isinstance(value, str):
+        value = parse_datetime(value)
+
+    if isinstance(value, datetime):
+        return value.timestamp()
+
+    return -math.inf
+
+
+def get_sort_key(value: Any) -> tuple:
+    """
+    Get the sort key of a field value, ordering numbers before strings and other values.
+    """
+
+    if isinstance(value, (int, float)):
+        return 0, value
+
+    if isinstance(value, str):
+        return 1, value
+
+    return 2, str(value)
+
+
+def get_order_key(value: Any, descending: bool = False) -> tuple:
+    """
+    Get the sort key of a field value ordering entities without a value last in either direction.
+    """
+
+    if value is None:
+        return (not descending,)
+
+    return descending, *get_sort_key(value)
+
+
+class InMemoryTable:
+    """
+    The entities of a component with their primary key, foreign key and sorted indexes.
+
+    Parameters
+    ----------
+    component : Type[BaseComponent]
+        The component of the entities.
+    entities : Dict[id_type, dict], optional
+        The initial entities keyed by ID.
+    """
+
+    def __init__(self, component: Type['BaseComponent'], entities: Optional[Dict[Any, dict]] = None):
+        self.schema = get_table_schema(component)
+        self.entities: Dict[Any, dict] = {}
+        self.indexes: Dict[str, Dict[Any, Dict[Any, None]]] = {field: {} for field in self.schema.indexed_fields}
+        self.sorted_indexes: Dict[str, Tuple[List[Any], List[Any]]] = {}
+        self.time_index = time_indexes.get(component.__name__)
+        self.partitions: Dict[Any, List[Tuple[float, Any]]] = {}
+        self.next_id = 1
+
+        for entity in (entities or {}).values():
+            self.add(entity)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def add(self, entity: dict) -> Any:
+        """
+        Add an entity to the table, assigning it the next integer ID if it has none.
+
+        Parameters
+        ----------
+        entity : dict
+            The entity.
+
+        Returns
+        -------
+        Any
+            The ID of the entity.
+        """
+
+        if entity.get('id') is None:
+            while self.next_id in self.entities:
+                self.next_id += 1
+            entity = {**entity, 'id': normalize_id(self.next_id)}
+        else:
+            entity = {**entity, 'id': normalize_id(entity['id'])}
+
+        if isinstance(entity['id'], int):
+            self.next_id = max(self.next_id, entity['id'] + 1)
+
+        self.entities[entity['id']] = entity
+        self.index(entity)
+
+        return entity['id']
+
+    def update(self, entity_id: Any, changes: dict) -> None:
+        """
+        Update fields of an entity and its indexes.
+        """
+
+        entity = self.entities[entity_id]
+        self.unindex(entity)
+        entity = self.entities[entity_id] = {**entity, **changes}
+        self.index(entity)
+
+    def remove(self, entity_id: Any) -> dict:
+        """
+        Remove an entity from the table and its indexes, returning the removed entity.
+        """
+
+        entity = self.entities.pop(entity_id)
+        self.unindex(entity)
+
+        return entity
+
+    def index(self, entity: dict) -> None:
+        for field, index in self.indexes.items():
+            for value in as_list(entity.get(field)):
+                index.setdefault(value, {})[entity['id']] = None
+
+        if self.time_index is not None:
+            partition_field, time_field = self.time_index
+            insort(
+                self.partitions.setdefault(entity.get(partition_field), []),
+                (get_time_key(entity.get(time_field)), entity['id'])
+            )
+
+        self.sorted_indexes.clear()
+
+    def unindex(self, entity: dict) -> None:
+        for field, index in self.indexes.items():
+            for value in as_list(entity.get(field)):
+                index.get(value, {}).pop(entity['id'], None)
+
+        if self.time_index is not None:
+            partition_field, time_field = self.time_index
+            partition = self.partitions.get(entity.get(partition_field), [])
+            key = (get_time_key(entity.get(time_field)), entity['id'])
+            position = bisect_left(partition, key)
+            if position < len(partition) and partition[position] == key:
+                del partition[position]
+
+        self.sorted_indexes.clear()
+
+    def lookup(self, field: str, values: Iterable[Any]) -> List[Any]:
+        """
+        Get the IDs of the entities whose field matches any of the given values, using the table indexes.
+
+        Parameters
+        ----------
+        field : str
+            The entity field, either 'id' or an indexed foreign key field.
+        values : Iterable[Any]
+            The field values.
+
+        Returns
+        -------
+        List[Any]
+            The matching entity IDs, without duplicates.
+        """
+
+        if field == 'id':
+            return list(dict.fromkeys(
+                entity_id for entity_id in map(normalize_id, values) if entity_id in self.entities
+            ))
+
+        index = self.indexes[field]
+        entity_ids = {}
+
+        for value in values:
+            entity_ids.update(index.get(normalize_id(value), {}))
+
+        return list(entity_ids)
+
+    def get_sorted_index(self, field: str) -> Tuple[List[Any], List[Any]]:
+        """
+        Get the IDs of the entities sorted by a field, built on first use and after each change to the table.
+
+        Returns
+        -------
+        Tuple[List[Any], List[Any]]
+            The IDs of the entities with a value, in ascending order, and the IDs of the entities without a value.
+        """
+
+        if field not in self.sorted_indexes:
+            values = [(entity_id, entity.get(field)) for entity_id, entity in self.entities.items()]
+            self.sorted_indexes[field] = (
+                [entity_id for entity_id, value in sorted(
+                    ((entity_id, value) for entity_id, value in values if value is not None),
+                    key=lambda item: get_sort_key(item[1])
+                )],
+                [entity_id for entity_id, value in values if value is None]
+            )
+
+        return self.sorted_indexes[field]
+
+    def iterate_partition(
+            self,
+            partition: Any,
+            descending: bool = False,
+            bounds: Tuple[float, float] = (-math.inf, math.inf)
+    ) -> Iterator[Any]:
+        """
+        Iterate over the IDs of the entities of a partition of the time index in time order.
+
+        Parameters
+        ----------
+        partition : Any
+            The value of the partition field (e.g. a Datastream ID).
+        descending : bool, optional
+            Whether to iterate from the latest time. Default is False.
+        bounds : Tuple[float, float], optional
+            The inclusive range of time keys to iterate over. Default is all times.
+
+        Returns
+        -------
+        Iterator[Any]
+            The entity IDs.
+        """
+
+        entries = self.partitions.get(normalize_id(partition), [])
+        start = bisect_left(entries, (bounds[0],))
+        end = bisect_left(entries, (math.nextafter(bounds[1], math.inf),))
+
+        if descending:
+            return (entries[position][1] for position in range(end - 1, start - 1, -1))
+
+        return (entries[position][1] for position in range(start, end))
+
+
+class InMemoryStore:
+    """
+    In-memory storage of SensorThings entities, maintaining the relationships between them.
+
+    Parameters
+    ----------
+    data : Dict[str, Dict[id_type, dict]], optional
+        The initial entities, keyed by table name (e.g. 'things' or 'observed_properties') and entity ID. Entities
+        use the field names of the component schemas, and reference related entities with '<name>_id' and
+        '<name>_ids' fields (e.g. a Datastream's 'thing_id' and a Thing's 'location_ids').
+    """
+
+    def __init__(self, data: Optional[Dict[str, Dict[Any, dict]]] = None):
+        self.lock = RLock()
+        self.tables: Dict[Type['BaseComponent'], InMemoryTable] = {
+            component: InMemoryTable(
+                component, (data or {}).get(component.model_config['json_schema_extra']['name_ref'][2])
+            ) for component in get_components()
+        }
+
+    def get_table(self, component: Type['BaseComponent']) -> InMemoryTable:
+        return self.tables[component]
+
+    def insert(self, component: Type['BaseComponent'], fields: dict, relations: Optional[dict] = None) -> Any:
+        """
+        Insert an entity and link it to its related entities.
+
+        Parameters
+        ----------
+        component : Type[BaseComponent]
+            The component of the entity.
+        fields : dict
+            The fields of the entity.
+        relations : dict, optional
+            The IDs of the related entities, keyed by relationship field name (e.g. {'thing': 1}).
+
+        Returns
+        -------
+        Any
+            The ID of the inserted entity.
+        """
+
+        with self.lock:
+            table = self.tables[component]
+            entity_id = table.add({
+                **{
+                    relation.local_field: [] if relation.relationship == 'many_to_many' else None
+                    for relation in table.schema.relations.values() if relation.local_field is not None
+                },
+                **fields
+            })
+            self.set_relations(component, entity_id, relations or {})
+
+        return entity_id
+
+    def update(
+            self,
+            component: Type['BaseComponent'],
+            entity_id: Any,
+            fields: dict,
+            relations: Optional[dict] = None
+    ) -> None:
+        """
+        Update the fields and relationships of an entity.
+
+        Raises
+        ------
+        HttpError
+            If the entity does not exist.
+        """
+
+        with self.lock:
+            table = self.tables[component]
+            entity_id = normalize_id(entity_id)
+            if entity_id not in table.entities:
+                raise HttpError(404, f'{component.__name__} not found.')
+            if fields:
+                table.update(entity_id, fields)
+            self.set_relations(component, entity_id, relations or {})
+
+    def delete(self, component: Type['BaseComponent'], entity_id: Any) -> None:
+        """
+        Delete an entity, unlink it from its many-to-many relationships and delete the entities of its one-to-many
+        relationships, which can not exist without it.
+
+        Raises
+        ------
+        HttpError
+            If the entity does not exist.
+        """
+
+        with self.lock:
+            table = self.tables[component]
+            entity_id = normalize_id(entity_id)
+            if entity_id not in table.entities:
+                raise HttpError(404, f'{component.__name__} not found.')
+            entity = table.remove(entity_id)
+            for relation in set(table.schema.relations.values()):
+                related_table = self.tables[relation.component]
+                if relation.relationship == 'many_to_many':
+                    for related_id in related_table.lookup(relation.remote_field, [entity_id]):
+                        related_table.update(related_id, {relation.remote_field: [
+                            linked_id for linked_id in related_table.entities[related_id][relation.remote_field]
+                            if linked_id != entity_id
+                        ]})
+                elif relation.relationship == 'one_to_many':
+                    for related_id in related_table.lookup(relation.remote_field, [entity['id']]):
+                        self.delete(relation.component, related_id)
+
+    def set_relations(self, component: Type['BaseComponent'], entity_id: Any, relations: dict) -> None:
+        """
+        Link an entity to related entities, replacing its existing links of the given relationships.
+        """
+
+        table = self.tables[component]
+
+        for relation_name, related_ids in relations.items():
+            relation = table.schema.relations[relation_name]
+            related_table = self.tables[relation.component]
+
+            for related_id in as_list(related_ids):
+                if normalize_id(related_id) not in related_table.entities:
+                    raise HttpError(404, f'{relation.component.__name__} not found.')
+
+            if relation.relationship == 'many_to_one':
+                table.update(entity_id, {relation.local_field: normalize_id(related_ids)})
+            elif relation.relationship == 'one_to_many':
+                for related_id in as_list(related_ids):
+                    related_table.update(normalize_id(related_id), {relation.remote_field: entity_id})
+            else:
+                related_ids = list(dict.fromkeys(map(normalize_id, as_list(related_ids))))
+                previous_ids = table.entities[entity_id][relation.local_field] or []
+                table.update(entity_id, {relation.local_field: related_ids})
+                for related_id in set(previous_ids) | set(related_ids):
+                    linked_ids = [
+                        linked_id for linked_id in related_table.entities[related_id][relation.remote_field] or []
+                        if linked_id != entity_id
+                    ]
+                    if related_id in related_ids:
+                        linked_ids.append(entity_id)
+                    related_table.update(related_id, {relation.remote_field: linked_ids})
+
+
+class InMemorySensorThingsEngine(GenericSensorThingsEngine):
+    """
+    Reference SensorThings engine serving entities from an in-memory store.
+
+    Entities are looked up with primary and foreign key indexes, Observations and HistoricalLocations are kept in
+    sorted time indexes per Datastream and Thing, filters are compiled to Python predicates supporting the OData
+    comparison, logical and arithmetic operators and the string, date and math functions, and ordering uses sorted
+    indexes. Conjunctive ID and time range conditions of filters are answered from the indexes before the compiled
+    filter is applied.
+
+    Subclasses set the store they serve, which is shared by all requests::
+
+        class MyEngine(InMemorySensorThingsEngine):
+            store = InMemoryStore(data)
+
+    Attributes
+    ----------
+    store : InMemoryStore
+        The store of the engine. An empty store is created on first use if none is set.
+    """
+
+    supports_partitioned_pagination = True
+    store: Optional[InMemoryStore] = None
+
+    def get_store(self) -> InMemoryStore:
+        if type(self).store is None:
+            type(self).store = InMemoryStore()
+        return type(self).store
+
+    def get_entity_cache_scope(self) -> Optional[Hashable]:
+        """
+        Scope cached entities to the store, since every request of the engine is served the same entities.
+        """
+
+        return self.get_store()
+
+    def estimate_row_count(self, component: Type['BaseComponent']) -> Optional[int]:
+        return len(self.get_store().get_table(component))
+
+    def query_entities(
+            self,
+            component: Type['BaseComponent'],
+            related_ids: Dict[str, Optional[Iterable[Any]]],
+            pagination: Optional[dict] = None,
+            ordering: Optional[List[dict]] = None,
+            filters: Any = None,
+            get_count: bool = False
+    ) -> Tuple[Dict[Any, dict], Optional[int]]:
+        """
+        Query the entities of a component.
+
+        Parameters
+        ----------
+        component : Type[BaseComponent]
+            The component to query.
+        related_ids : Dict[str, Optional[Iterable[Any]]]
+            The ID arguments of the get method (e.g. {'thing_ids': [1], 'location_ids': None}).
+        pagination : dict, optional
+            The pagination of the query, optionally partitioned by a field.
+        ordering : List[dict], optional
+            The fields and directions to order the entities by.
+        filters : Any, optional
+            The parsed filter of the query.
+        get_count : bool, optional
+            Whether to count the matching entities. Default is False.
+
+        Returns
+        -------
+        Tuple[Dict[Any, dict], Optional[int]]
+            The entities keyed by ID, and their total count if requested.
+        """
+
+        store = self.get_store()
+
+        # Hold the store lock while reading, so that concurrent writes do not change the indexes being iterated.
+        with store.lock:
+            table = store.get_table(component)
+            schema = table.schema
+            candidates = None
+            partitions = None
+
+            # Narrow down the entities with the primary and foreign key indexes.
+            for argument, values in [
+                *((argument, values) for argument, values in related_ids.items() if values is not None),
+                *self.get_index_conditions(schema, filters)
+            ]:
+                field, entity_ids = self.lookup_argument(store, component, argument, list(values))
+                if table.time_index is not None and field == table.time_index[0]:
+                    partition_values = [normalize_id(value) for value in values]
+                    partitions = partition_values if partitions is None else [
+                        partition for partition in partitions if partition in partition_values
+                    ]
+                if candidates is not None:
+                    candidate_ids = set(candidates)
+                    entity_ids = [entity_id for entity_id in entity_ids if entity_id in candidate_ids]
+                candidates = entity_ids
+
+            predicate = compile_filter(filters, self.get_path_resolver(component)) if filters is not None else None
+            order_fields = [
+                (self.get_field_name(schema, order['field']), order.get('direction') == 'desc')
+                for order in ordering or []
+            ]
+            partition_by = (pagination or {}).get('partition_by')
+
+            if table.time_index is not None and partitions is not None and (
+                order_fields == [] or (len(order_fields) == 1 and order_fields[0][0] == table.time_index[1])
+            ) and (order_fields or partition_by == table.time_index[0]):
+                descending = order_fields[0][1] if order_fields else False
+                bounds = self.get_time_bounds(schema, filters, table.time_index[1])
+                candidate_ids = set(candidates)
+                partition_ids = [
+                    (entity_id for entity_id in table.iterate_partition(partition, descending, bounds)
+                     if entity_id in candidate_ids) for partition in dict.fromkeys(map(normalize_id, partitions))
+                ]
+                if partition_by == table.time_index[0] and pagination is not None:
+                    return self.paginate_partition_iterators(table, partition_ids, predicate, pagination), None
+                entity_ids = partition_ids[0] if len(partition_ids) == 1 else (
+                    entity_id for _, entity_id in merge(
+                        *[((get_time_key(table.entities[entity_id].get(table.time_index[1])), entity_id)
+                           for entity_id in ids) for ids in partition_ids],
+                        reverse=descending
+                    )
+                )
+            else:
+                entity_ids = self.order_entity_ids(table, candidates, order_fields)
+
+            entities = (table.entities[entity_id] for entity_id in entity_ids)
+
+            if predicate is not None:
+                entities = filter(predicate, entities)
+
+            count = None
+
+            if get_count:
+                entities = list(entities)
+                count = len(entities)
+
+            if pagination is None:
+                return {entity['id']: entity for entity in entities}, count
+
+            if partition_by:
+                return self.paginate_partitions(
+                    entities={entity['id']: entity for entity in entities},
+                    partition_by=partition_by,
+                    pagination=pagination
+                ), count
+
+            return {
+                entity['id']: entity for entity in islice(
+                    entities, pagination['skip'], pagination['skip'] + pagination['top']
+                )
+            } if pagination['top'] > 0 else {}, count
+
+    @staticmethod
+    def paginate_partition_iterators(
+            table: InMemoryTable,
+            partition_ids: List[Iterator[Any]],
+            predicate: Any,
+            pagination: dict
+    ) -> Dict[Any, dict]:
+        """
+        Paginate the ordered entities of each partition of a time index separately.
+        """
+
+        entities = {}
+
+        for entity_ids in partition_ids:
+            partition_entities = (table.entities[entity_id] for entity_id in entity_ids)
+            if predicate is not None:
+                partition_entities = filter(predicate, partition_entities)
+            for entity in islice(partition_entities, pagination['skip'], pagination['skip'] + pagination['top']):
+                entities[entity['id']] = entity
+
+        return entities
+
+    @staticmethod
+    def order_entity_ids(
+            table: InMemoryTable,
+            candidates: Optional[List[Any]],
+            order_fields: List[Tuple[str, bool]]
+    ) -> Iterable[Any]:
+        """
+        Order entity IDs by the given fields, using the sorted index of the field if most entities are ordered.
+        """
+
+        if not order_fields:
+            return candidates if candidates is not None else list(table.entities)
+
+        if len(order_fields) == 1 and (candidates is None or len(candidates) * 4 > len(table)):
+            field, descending = order_fields[0]
+            sorted_ids, null_ids = table.get_sorted_index(field)
+            entity_ids = [*reversed(sorted_ids), *null_ids] if descending else [*sorted_ids, *null_ids]
+            if candidates is None:
+                return entity_ids
+            candidate_ids = set(candidates)
+            return (entity_id for entity_id in entity_ids if entity_id in candidate_ids)
+
+        entity_ids = list(candidates if candidates is not None else table.entities)
+
+        for field, descending in reversed(order_fields):
+            entity_ids.sort(key=lambda entity_id: get_order_key(table.entities[entity_id].get(field), descending),
+                            reverse=descending)
+
+        return entity_ids
+
+    @staticmethod
+    def lookup_argument(
+            store: InMemoryStore,
+            component: Type['BaseComponent'],
+            argument: str,
+            values: List[Any]
+    ) -> Tuple[Optional[str], List[Any]]:
+        """
+        Get the IDs of the entities matching an ID argument of a get method (e.g. 'thing_ids' of get_datastreams).
+
+        Returns
+        -------
+        Tuple[Optional[str], List[Any]]
+            The entity field matched by the argument, and the IDs of the matching entities.
+        """
+
+        table = store.get_table(component)
+        schema = table.schema
+
+        if argument in (f'{schema.singular_name}_ids', 'id'):
+            return 'id', table.lookup('id', values)
+
+        if argument in table.indexes:
+            return argument, table.lookup(argument, values)
+
+        if argument[:-1] in table.indexes:
+            return argument[:-1], table.lookup(argument[:-1], values)
+
+        # Arguments naming a component without a reference field (e.g. the observation_ids of
+        # get_features_of_interest) match the entities referenced by the given entities of that component.
+        for relation in schema.relations.values():
+            related_schema = get_table_schema(relation.component)
+            if argument == f'{related_schema.singular_name}_ids' and relation.remote_field is not None:
+                related_table = store.get_table(relation.component)
+                referenced_ids = [
+                    referenced_id for related_id in related_table.lookup('id', values)
+                    for referenced_id in as_list(related_table.entities[related_id].get(relation.remote_field))
+                ]
+                return None, table.lookup('id', referenced_ids)
+
+        raise HttpError(400, f"Unsupported argument '{argument}' for {component.__name__}.")
+
+    @staticmethod
+    def get_index_conditions(schema: TableSchema, filters: Any) -> List[Tuple[str, List[Any]]]:
+        """
+        Get the ID conditions of a filter that can be answered from the table indexes.
+
+        Conditions are read from the top-level conjunction of the filter, and include comparisons of the entity ID
+        and of the IDs of many-to-one related entities with literal values (e.g. id eq 1 or Datastream/id in (1, 2)).
+
+        Returns
+        -------
+        List[Tuple[str, List[Any]]]
+            The indexed field and the matching values of each condition.
+        """
+
+        if filters is None:
+            return []
+
+        if isinstance(filters, ast.BoolOp) and isinstance(filters.op, ast.And):
+            return [
+                *InMemorySensorThingsEngine.get_index_conditions(schema, filters.left),
+                *InMemorySensorThingsEngine.get_index_conditions(schema, filters.right)
+            ]
+
+        if not isinstance(filters, ast.Compare) or not isinstance(filters.comparator, (ast.Eq, ast.In)) or \
+                not isinstance(filters.left, (ast.Identifier, ast.Attribute)) or \
+                not isinstance(filters.right, (ast.String, ast.Integer, ast.GUID, ast.List)):
+            return []
+
+        path = get_path(filters.left)
+        values = as_list(get_literal_value(filters.right))
+
+        if path in (['id'], ['@iot.id']):
+            return [('id', values)]
+
+        relation = schema.relations.get(path[0])
+
+        if len(path) == 2 and path[1] in ('id', '@iot.id') and relation is not None and \
+                relation.local_field is not None:
+            return [(relation.local_field, values)]
+
+        return []
+
+    @staticmethod
+    def get_time_bounds(schema: TableSchema, filters: Any, time_field: str) -> Tuple[float, float]:
+        """
+        Get the time range of a time field allowed by the top-level conjunction of a filter.
+
+        Returns
+        -------
+        Tuple[float, float]
+            The inclusive range of time index keys the filter can match.
+        """
+
+        lower, upper = -math.inf, math.inf
+        conditions = [filters] if filters is not None else []
+
+        for condition in conditions:
+            if isinstance(condition, ast.BoolOp) and isinstance(condition.op, ast.And):
+                conditions.extend([condition.left, condition.right])
+                continue
+            if not isinstance(condition, ast.Compare) or not isinstance(condition.right, ast.DateTime) or \
+                    not isinstance(condition.left, ast.Identifier) or \
+                    schema.field_names.get(condition.left.name) != time_field:
+                continue
+            key = get_time_key(get_literal_value(condition.right))
+            if isinstance(condition.comparator, (ast.Gt, ast.GtE, ast.Eq)):
+                lower = max(lower, key if not isinstance(condition.comparator, ast.Gt) else math.nextafter(
+                    key, math.inf
+                ))
+            if isinstance(condition.comparator, (ast.Lt, ast.LtE, ast.Eq)):
+                upper = min(upper, key if not isinstance(condition.comparator, ast.Lt) else math.nextafter(
+                    key, -math.inf
+                ))
+
+        return lower, upper
+
+    def get_path_resolver(self, component: Type['BaseComponent']):
+        """
+        Get the resolver of the property paths of a component used in filters.
+        """
+
+        store = self.get_store()
+
+        def resolve_path(segments: List[str]) -> Getter:
+            return self.compile_path(store, component, segments)
+
+        return resolve_path
+
+    def compile_path(self, store: InMemoryStore, component: Type['BaseComponent'], segments: List[str]) -> Getter:
+        """
+        Compile a property path of a component to a function reading the property value of an entity.
+
+        Paths can navigate relationships (e.g. Thing/Locations/name), returning a ValueSet for to-many relationships,
+        and read keys of object properties (e.g. properties/code).
+
+        Raises
+        ------
+        HttpError
+            If the path does not name a property of the component.
+        """
+
+        schema = get_table_schema(component)
+        head, rest = segments[0], segments[1:]
+        relation = schema.relations.get(head)
+
+        if relation is None:
+            field_name = self.get_field_name(schema, head)
+
+            def get_value(entity):
+                value = entity.get(field_name) if entity is not None else None
+                for key in rest:
+                    value = value.get(key) if isinstance(value, dict) else None
+                return value
+
+            return get_value
+
+        if not rest:
+            raise HttpError(400, f"Navigation property '{head}' can not be compared in a filter.")
+
+        related_table = store.get_table(relation.component)
+
+        if rest in (['id'], ['@iot.id']) and relation.relationship == 'many_to_one':
+            return lambda entity: entity.get(relation.local_field)
+
+        if rest in (['id'], ['@iot.id']) and relation.relationship == 'many_to_many':
+            return lambda entity: ValueSet(entity.get(relation.local_field) or [])
+
+        if relation.relationship == 'many_to_one':
+            get_related_value = self.compile_path(store, relation.component, rest)
+            return lambda entity: get_related_value(related_table.entities.get(entity.get(relation.local_field)))
+
+        get_related_value = self.compile_path(store, relation.component, rest)
+
+        def get_values(entity):
+            values = []
+            for related_id in related_table.lookup(relation.remote_field, [entity['id']]):
+                value = get_related_value(related_table.entities[related_id])
+                values.extend(value if isinstance(value, ValueSet) else [value])
+            return ValueSet(values)
+
+        return get_values
+
+    def create_component_entity(self, component: Type['BaseComponent'], entity_body: 'BasePostBody') -> Any:
+        fields, relations = self.get_entity_fields(component, entity_body)
+        return self.get_store().insert(component, fields, relations)
+
+    def atomic(self):
+        """
+        Hold the store lock while a deep insert runs, so that the writes of other requests do not interleave with
+        it. Entities created before a failing insert are not removed.
+        """
+
+        return self.get_store().lock
+
+    def update_component_entity(
+            self,
+            component: Type['BaseComponent'],
+            entity_id: Any,
+            entity_body: 'BasePatchBody'
+    ) -> None:
+        fields, relations = self.get_entity_fields(component, entity_body, exclude_unset=True)
+        self.get_store().update(component, entity_id, fields, relations)
+
+    def delete_component_entity(self, component: Type['BaseComponent'], entity_id: Any) -> None:
+        self.get_store().delete(component, entity_id)
+
+    def get_entity_value(self, component, entity_id, field_name):
+        store = self.get_store()
+
+        with store.lock:
+            entity = store.get_table(component).entities.get(normalize_id(entity_id))
+
+            if entity is None:
+                raise HttpError(404, f'{component.__name__} not found.')
+
+            return entity.get(field_name)
+
+    def get_latest_observations(self, datastream_ids, top=1):
+        store = self.get_store()
+
+        # Hold the store lock while reading, so that concurrent writes do not change the partition being iterated.
+        with store.lock:
+            table = store.get_table(field_schemas.Observation)
+
+            return {
+                observation_id: table.entities[observation_id]
+                for datastream_id in datastream_ids
+                for observation_id in islice(table.iterate_partition(datastream_id, descending=True), top)
+            }
@@ -0,0 +1,742 @@
+import operator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Type
+from django import VERSION as DJANGO_VERSION
+from django.db import connections, router, transaction
+from django.db.models import F, Model, Q, QuerySet, Value, Window
+from django.db.models import functions, lookups
+from ninja.errors import HttpError
+from odata_query import ast
+from sensorthings.components import field_schemas
+from sensorthings.engines.generic import GenericSensorThingsEngine, TableSchema, get_table_schema
+from sensorthings.engines.predicates import get_literal_value, get_path
+
+
+if TYPE_CHECKING:
+    from sensorthings.schemas import BaseComponent, BasePostBody, BasePatchBody
+
+
+@dataclass(frozen=True)
+class ModelRelation:
+    """
+    A relationship of a component mapped to a relation of its Django model.
+
+    Attributes
+    ----------
+    component : Type[BaseComponent]
+        The related component.
+    relationship : str
+        The type of relationship ('many_to_one', 'one_to_many' or 'many_to_many').
+    path : str
+        The lookup path of the relation in the model (e.g. 'thing' or 'datastreams').
+    local_field : Optional[str]
+        The entity field holding the related entity IDs, for many-to-one and many-to-many relationships.
+    """
+
+    component: Type['BaseComponent']
+    relationship: str
+    path: str
+    local_field: Optional[str]
+
+
+@dataclass(frozen=True)
+class ModelSchema:
+    """
+    The mapping of a component to a Django model.
+
+    Attributes
+    ----------
+    table : TableSchema
+        The table schema of the component.
+    model : Type[Model]
+        The Django model of the component.
+    field_paths : Dict[str, str]
+        The model field of each component field, keyed by property alias and by field name.
+    relations : Dict[str, ModelRelation]
+        The relationships of the component, keyed like the relations of the table schema.
+    value_paths : Dict[str, str]
+        The model lookup of each scalar entity field returned by the engine, including the IDs of many-to-one
+        related entities (e.g. {'thing_id': 'thing_id'}).
+    list_paths : Dict[str, str]
+        The model lookup of the related entity IDs of each many-to-many relationship (e.g.
+        {'location_ids': 'locations__pk'}).
+    """
+
+    table: TableSchema
+    model: Type[Model]
+    field_paths: Dict[str, str]
+    relations: Dict[str, ModelRelation]
+    value_paths: Dict[str, str]
+    list_paths: Dict[str, str]
+
+
+# Comparison lookups of the OData comparison operators, with the operator to use when the operands are swapped.
+comparison_lookups = {
+    ast.Eq: ('exact', lookups.Exact, ast.Eq),
+    ast.NotEq: ('exact', lookups.Exact, ast.NotEq),
+    ast.Lt: ('lt', lookups.LessThan, ast.Gt),
+    ast.LtE: ('lte', lookups.LessThanOrEqual, ast.GtE),
+    ast.Gt: ('gt', lookups.GreaterThan, ast.Lt),
+    ast.GtE: ('gte', lookups.GreaterThanOrEqual, ast.LtE),
+}
+
+# String lookups of the OData functions returning a boolean.
+function_lookups = {
+    'contains': ('contains', lookups.Contains),
+    'startswith': ('startswith', lookups.StartsWith),
+    'endswith': ('endswith', lookups.EndsWith),
+    'matchesPattern': ('regex', lookups.Regex),
+}
+
+# Database functions of the other supported OData functions.
+database_functions = {
+    'length': functions.Length,
+    'indexof': lambda value, search: functions.StrIndex(value, search) - 1,
+    'substring': lambda value, start, length=None: functions.Substr(value, start + 1, length),
+    'tolower': functions.Lower,
+    'toupper': functions.Upper,
+    'trim': functions.Trim,
+    'concat': functions.Concat,
+    'year': functions.ExtractYear,
+    'month': functions.ExtractMonth,
+    'day': functions.ExtractDay,
+    'hour': functions.ExtractHour,
+    'minute': functions.ExtractMinute,
+    'second': functions.ExtractSecond,
+    'date': functions.TruncDate,
+    'time': functions.TruncTime,
+    'now': functions.Now,
+    'round': functions.Round,
+    'floor': functions.Floor,
+    'ceiling': functions.Ceil,
+}
+
+arithmetic_operators = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: functions.Mod,
+}
+
+
+class FilterCompiler:
+    """
+    Compiles a parsed OData filter to a Django Q object.
+
+    Comparisons of a property with a literal value are compiled to field lookups (e.g. Datastream/Thing/name eq 'A'
+    to datastream__thing__name__exact='A'), and other expressions to lookups of database functions.
+
+    Parameters
+    ----------
+    engine : DjangoORMEngine
+        The engine the filter is compiled for.
+    component : Type[BaseComponent]
+        The component the filter applies to.
+
+    Attributes
+    ----------
+    to_many : bool
+        Whether the filter navigates a one-to-many or many-to-many relationship, in which case the filtered queryset
+        can contain duplicate entities.
+    """
+
+    def __init__(self, engine: 'DjangoORMEngine', component: Type['BaseComponent']):
+        self.engine = engine
+        self.component = component
+        self.to_many = False
+
+    def compile(self, node: Any) -> Q:
+        """
+        Compile a boolean filter expression to a Q object.
+
+        Raises
+        ------
+        HttpError
+            If the filter uses an unsupported expression or function.
+        """
+
+        if isinstance(node, ast.BoolOp):
+            left, right = self.compile(node.left), self.compile(node.right)
+            return left & right if isinstance(node.op, ast.And) else left | right
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ~self.compile(node.operand)
+
+        if isinstance(node, ast.Compare):
+            return self.compile_comparison(node.comparator, node.left, node.right)
+
+        if isinstance(node, ast.Call) and node.func.name in function_lookups and not node.func.namespace:
+            lookup_name, lookup = function_lookups[node.func.name]
+            if len(node.args) != 2:
+                raise HttpError(400, f"Invalid number of arguments for filter function '{node.func.name}'.")
+            if self.is_property(node.args[0]) and isinstance(node.args[1], ast._Literal):  # noqa
+                return Q(**{f'{self.resolve(node.args[0])}__{lookup_name}': get_literal_value(node.args[1])})
+            return Q(lookup(self.compile_expression(node.args[0]), self.compile_expression(node.args[1])))
+
+        if isinstance(node, ast.Boolean):
+            return Q(pk__isnull=not node.py_val)
+
+        if self.is_property(node):
+            return Q(**{self.resolve(node): True})
+
+        raise HttpError(400, f'Unsupported filter expression: {type(node).__name__}.')
+
+    def compile_comparison(self, comparator: Any, left: Any, right: Any) -> Q:
+        if isinstance(left, ast._Literal) and self.is_property(right):  # noqa
+            if isinstance(comparator, ast.In):
+                raise HttpError(400, 'The right operand of the in operator must be a list.')
+            left, right, comparator = right, left, comparison_lookups[type(comparator)][2]()
+
+        if isinstance(comparator, ast.In):
+            if not isinstance(right, ast.List):
+                raise HttpError(400, 'The right operand of the in operator must be a list.')
+            if self.is_property(left):
+                return Q(**{f'{self.resolve(left)}__in': get_literal_value(right)})
+            return Q(lookups.In(self.compile_expression(left), get_literal_value(right)))
+
+        lookup_name, lookup, _ = comparison_lookups[type(comparator)]
+
+        if isinstance(right, ast.Null):
+            if not isinstance(comparator, (ast.Eq, ast.NotEq)):
+                return Q(pk__isnull=True)
+            is_null = isinstance(comparator, ast.Eq)
+            if self.is_property(left):
+                return Q(**{f'{self.resolve(left)}__isnull': is_null})
+            return Q(lookups.IsNull(self.compile_expression(left), is_null))
+
+        if self.is_property(left) and isinstance(right, ast._Literal):  # noqa
+            condition = Q(**{f'{self.resolve(left)}__{lookup_name}': get_literal_value(right)})
+        else:
+            condition = Q(lookup(self.compile_expression(left), self.compile_expression(right)))
+
+        return ~condition if isinstance(comparator, ast.NotEq) else condition
+
+    def compile_expression(self, node: Any) -> Any:
+        """
+        Compile a filter expression to a Django expression.
+        """
+
+        if isinstance(node, ast.Null):
+            return Value(None)
+
+        if isinstance(node, ast._Literal):  # noqa
+            return Value(get_literal_value(node))
+
+        if self.is_property(node):
+            return F(self.resolve(node))
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -self.compile_expression(node.operand)
+
+        if isinstance(node, ast.BinOp):
+            return arithmetic_operators[type(node.op)](
+                self.compile_expression(node.left), self.compile_expression(node.right)
+            )
+
+        if isinstance(node, ast.Call):
+            function_name = '.'.join([*node.func.namespace, node.func.name])
+            if function_name in function_lookups:
+                return self.compile(node)
+            function = database_functions.get(function_name)
+            if function is None:
+                raise HttpError(400, f"Unsupported filter function '{function_name}'.")
+            try:
+                return function(*[self.compile_expression(argument) for argument in node.args])
+            except TypeError:
+                raise HttpError(400, f"Invalid number of arguments for filter function '{function_name}'.")
+
+        if isinstance(node, (ast.BoolOp, ast.Compare)) or (
+            isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not)
+        ):
+            return self.compile(node)
+
+        raise HttpError(400, f'Unsupported filter expression: {type(node).__name__}.')
+
+    @staticmethod
+    def is_property(node: Any) -> bool:
+        return isinstance(node, (ast.Identifier, ast.Attribute))
+
+    def resolve(self, node: Any) -> str:
+        path, to_many = self.engine.resolve_path(self.component, get_path(node))
+        self.to_many = self.to_many or to_many
+        return path
+
+
+class DjangoORMEngine(GenericSensorThingsEngine):
+    """
+    SensorThings engine backed by Django models.
+
+    Each component is mapped to a Django model. Filters are compiled to Q objects, including navigation paths such
+    as Datastream/Thing/name, and ordering and pagination are applied to the queryset, so that entities are filtered,
+    sorted and paged by the database. The related entities of expanded components are fetched with one query per
+    relationship for all parent entities, paginated per parent with a ROW_NUMBER() window. Filtering on window
+    functions requires Django 4.2 or later; on older versions, each parent's page is fetched with a separate query.
+
+    Model fields are matched to component fields by name (e.g. a Datastream model's 'unit_of_measurement' and
+    'phenomenon_time' fields), and model relations to component relationships by their related model, which can be
+    overridden with the field_names attribute::
+
+        class MyEngine(DjangoORMEngine):
+            models = {'Thing': Thing, 'Location': Location, 'Datastream': Datastream, ...}
+            field_names = {'Datastream': {'observed_property': 'property'}}
+
+    Attributes
+    ----------
+    models : Dict[str, Type[Model]]
+        The Django model of each component, keyed by component name.
+    field_names : Dict[str, Dict[str, str]]
+        The model field or relation of component fields whose names differ from the model's, keyed by component
+        name and component field name.
+    id_batch_size : int
+        The maximum number of parent IDs in the IN clause of an expansion query, within the limits on query
+        parameters and IN list lengths of the supported databases (e.g. 1000 on Oracle).
+    """
+
+    supports_partitioned_pagination = DJANGO_VERSION >= (4, 2)
+    id_batch_size = 1000
+    models: Dict[str, Type[Model]] = {}
+    field_names: Dict[str, Dict[str, str]] = {}
+
+    def get_model_schema(self, component: Type['BaseComponent']) -> ModelSchema:
+        """
+        Get the mapping of a component to its Django model, which is built once per engine class.
+
+        Raises
+        ------
+        HttpError
+            If no model is configured for the component.
+        """
+
+        model_schemas = type(self).__dict__.get('_model_schemas')
+
+        if model_schemas is None:
+            model_schemas = {}
+            setattr(type(self), '_model_schemas', model_schemas)
+
+        if component not in model_schemas:
+            model_schemas[component] = self.build_model_schema(component)
+
+        return model_schemas[component]
+
+    def build_model_schema(self, component: Type['BaseComponent']) -> ModelSchema:
+        model = self.models.get(component.__name__)
+
+        if model is None:
+            raise HttpError(501, f'{component.__name__} is not supported by this engine.')
+
+        table = get_table_schema(component)
+        field_names = self.field_names.get(component.__name__, {})
+        field_paths = {
+            alias: field_names.get(field_name, field_name if field_name != 'id' else 'pk')
+            for alias, field_name in table.field_names.items()
+        }
+        relations = {}
+        model_relations = {}
+
+        for key, relation in table.relations.items():
+            if relation.name not in model_relations:
+                path = field_names.get(relation.name) or self.get_relation_path(
+                    model, self.models.get(relation.component.__name__), relation.name
+                )
+                model_relations[relation.name] = ModelRelation(
+                    relation.component, relation.relationship, path, relation.local_field
+                )
+            relations[key] = model_relations[relation.name]
+
+        value_paths = {
+            field_name: field_paths[field_name] for field_name in dict.fromkeys(table.field_names.values())
+        }
+        list_paths = {}
+
+        for relation in model_relations.values():
+            if relation.relationship == 'many_to_one':
+                model_field = model._meta.get_field(relation.path)
+                value_paths[relation.local_field] = model_field.attname if model_field.concrete \
+                    else f'{relation.path}__pk'
+            elif relation.relationship == 'many_to_many':
+                list_paths[relation.local_field] = f'{relation.path}__pk'
+
+        return ModelSchema(table, model, field_paths, relations, value_paths, list_paths)
+
+    @staticmethod
+    def get_relation_path(
+            model: Type[Model],
+            related_model: Optional[Type[Model]],
+            relation_name: str
+    ) -> str:
+        """
+        Find the lookup name of the relation of a model to a related model.
+        """
+
+        paths = [
+            field.name for field in model._meta.get_fields()
+            if field.is_relation and related_model is not None and field.related_model is related_model
+        ]
+
+        if len(paths) != 1:
+            raise HttpError(500, f"Failed to map relationship '{relation_name}' of {model.__name__}.")
+
+        return paths[0]
+
+    def resolve_path(self, component: Type['BaseComponent'], segments: List[str]) -> Tuple[str, bool]:
+        """
+        Convert a property path of a component to a model lookup path.
+
+        Parameters
+        ----------
+        component : Type[BaseComponent]
+            The component of the path.
+        segments : List[str]
+            The segments of the property path (e.g. ['Datastream', 'Thing', 'name'] or ['properties', 'code']).
+
+        Returns
+        -------
+        Tuple[str, bool]
+            The lookup path (e.g. 'datastream__thing__name'), and whether it navigates a to-many relationship.
+
+        Raises
+        ------
+        HttpError
+            If the path does not name a property of the component.
+        """
+
+        schema = self.get_model_schema(component)
+        head, rest = segments[0], segments[1:]
+        relation = schema.relations.get(head)
+
+        if relation is None:
+            try:
+                return '__'.join([schema.field_paths[head], *rest]), False
+            except KeyError:
+                raise HttpError(400, f"Unknown property '{head}' of {component.__name__}.")
+
+        if not rest:
+            raise HttpError(400, f"Navigation property '{head}' can not be compared in a filter.")
+
+        related_path, to_many = self.resolve_path(relation.component, rest)
+
+        return f'{relation.path}__{related_path}', to_many or relation.relationship != 'many_to_one'
+
+    def get_argument_path(self, schema: ModelSchema, argument: str) -> Tuple[str, bool]:
+        """
+        Get the model lookup path of an ID argument of a get method (e.g. 'thing__pk' for the thing_ids argument of
+        get_datastreams), and whether it navigates a to-many relationship.
+        """
+
+        if argument == f'{schema.table.singular_name}_ids':
+            return 'pk', False
+
+        for relation in schema.relations.values():
+            if argument == f'{get_table_schema(relation.component).singular_name}_ids':
+                return f'{relation.path}__pk', relation.relationship != 'many_to_one'
+
+        raise HttpError(400, f"Unsupported argument '{argument}' for {schema.table.component.__name__}.")
+
+    def get_order_expressions(self, component: Type['BaseComponent'], ordering: Optional[List[dict]]) -> list:
+        order_expressions = []
+
+        for order in ordering or []:
+            path, to_many = self.resolve_path(component, order['field'].split('/'))
+            if to_many:
+                raise HttpError(400, f"Can not order by to-many property '{order['field']}'.")
+            order_expressions.append(
+                F(path).desc(nulls_last=True) if order.get('direction') == 'desc' else F(path).asc(nulls_last=True)
+            )
+
+        return [*order_expressions, F('pk').asc()]
+
+    def get_queryset(
+            self,
+            component: Type['BaseComponent'],
+            related_ids: Dict[str, Optional[Iterable[Any]]],
+            filters: Any = None,
+            partition_by: Optional[str] = None
+    ) -> QuerySet:
+        """
+        Build the filtered queryset of a query, without ordering or pagination.
+
+        Filters on to-many relationships are applied in a subquery so that each entity is returned once. If the
+        query is partitioned, each entity is annotated with the ID of a parent entity as partition_id, returning
+        many-to-many related entities once per parent.
+
+        Parameters
+        ----------
+        component : Type[BaseComponent]
+            The component to query.
+        related_ids : Dict[str, Optional[Iterable[Any]]]
+            The ID arguments of the get method.
+        filters : Any, optional
+            The parsed filter of the query.
+        partition_by : str, optional
+            The entity field referencing the parent entities of a partitioned query.
+
+        Returns
+        -------
+        QuerySet
+            The queryset.
+        """
+
+        schema = self.get_model_schema(component)
+        queryset = schema.model._default_manager.all()
+        partition_path = next((
+            f'{relation.path}__pk' for relation in schema.relations.values() if relation.local_field == partition_by
+        ), None) if partition_by is not None else None
+        partition_ids = None
+        to_many = False
+
+        for argument, values in related_ids.items():
+            if values is None:
+                continue
+            path, is_to_many = self.get_argument_path(schema, argument)
+            if path == partition_path:
+                partition_ids = list(values)
+                continue
+            queryset = queryset.filter(**{f'{path}__in': list(values)})
+            to_many = to_many or is_to_many
+
+        if filters is not None:
+            compiler = FilterCompiler(self, component)
+            queryset = queryset.filter(compiler.compile(filters))
+            to_many = to_many or compiler.to_many
+
+        if to_many:
+            queryset = schema.model._default_manager.filter(pk__in=queryset.values('pk'))
+
+        if partition_path is not None:
+            queryset = queryset.annotate(partition_id=F(partition_path))
+            if partition_ids is not None:
+                queryset = queryset.filter(partition_id__in=partition_ids)
+
+        return queryset
+
+    def query_entities(
+            self,
+            component: Type['BaseComponent'],
+            related_ids: Dict[str, Optional[Iterable[Any]]],
+            pagination: Optional[dict] = None,
+            ordering: Optional[List[dict]] = None,
+            filters: Any = None,
+            get_count: bool = False
+    ) -> Tuple[Dict[Any, dict], Optional[int]]:
+        schema = self.get_model_schema(component)
+        partition_by = (pagination or {}).get('partition_by')
+        queryset = self.get_queryset(component, related_ids, filters, partition_by)
+        order_expressions = self.get_order_expressions(component, ordering)
+        count = queryset.count() if get_count else None
+
+        value_paths = list(dict.fromkeys(schema.value_paths.values()))
+
+        if partition_by is not None:
+            queryset = queryset.values(*value_paths, 'partition_id').annotate(row_number=Window(
+                functions.RowNumber(), partition_by=[F('partition_id')], order_by=order_expressions
+            )).filter(
+                row_number__gt=pagination['skip'], row_number__lte=pagination['skip'] + pagination['top']
+            ).order_by(*order_expressions)
+        else:
+            queryset = queryset.order_by(*order_expressions).values(*value_paths)
+            if pagination is not None:
+                queryset = queryset[pagination['skip']:pagination['skip'] + pagination['top']]
+
+        entities = {}
+
+        for row in queryset:
+            entity = entities.get(row['pk'])
+            if entity is None:
+                entity = entities[row['pk']] = {
+                    field_name: row[path] for field_name, path in schema.value_paths.items()
+                }
+            if partition_by in schema.list_paths:
+                entity.setdefault(partition_by, []).append(row['partition_id'])
+
+        for field_name, path in schema.list_paths.items():
+            if field_name == partition_by:
+                continue
+            for entity in entities.values():
+                entity[field_name] = []
+            for entity_id, related_id in schema.model._default_manager.filter(
+                pk__in=list(entities)
+            ).values_list('pk', path):
+                if related_id is not None:
+                    entities[entity_id][field_name].append(related_id)
+
+        return entities, count
+
+    def get_entity_ids(self, component, filters=None, pagination=None, ordering=None, get_count=False,
+                       **back_ref_ids):
+        """
+        Query the IDs of the entities of a component, selecting only their primary keys.
+        """
+
+        queryset = self.get_queryset(component, back_ref_ids, filters).order_by(
+            *self.get_order_expressions(component, ordering)
+        )
+        count = queryset.count() if get_count else None
+        queryset = queryset.values_list('pk', flat=True)
+
+        if pagination is not None:
+            queryset = queryset[pagination['skip']:pagination['skip'] + pagination['top']]
+
+        return list(queryset), count
+
+    def get_entity_value(self, component, entity_id, field_name):
+        """
+        Query a single field of an entity, selecting only its column.
+        """
+
+        schema = self.get_model_schema(component)
+        path = schema.value_paths.get(field_name)
+
+        if path is None:
+            return super().get_entity_value(component, entity_id, field_name)
+
+        values = list(schema.model._default_manager.filter(pk=entity_id).values_list(path, flat=True)[:1])
+
+        if not values:
+            raise HttpError(404, f'{component.__name__} not found.')
+
+        return values[0]
+
+    def get_model_values(self, component: Type['BaseComponent'], fields: dict, relations: dict) -> Tuple[dict, dict]:
+        """
+        Convert the fields and related entity IDs of a request body to model field values.
+
+        Returns
+        -------
+        Tuple[dict, dict]
+            The model field values, and the related entity IDs of each to-many relation.
+        """
+
+        schema = self.get_model_schema(component)
+        values = {schema.field_paths[field_name]: value for field_name, value in fields.items()}
+        to_many_values = {}
+
+        for relation_name, related_ids in relations.items():
+            relation = schema.relations[relation_name]
+            if relation.relationship == 'many_to_one':
+                values[schema.value_paths[relation.local_field]] = related_ids
+            else:
+                to_many_values[relation] = related_ids
+
+        return values, to_many_values
+
+    @staticmethod
+    def get_insert_values(schema: ModelSchema, values: dict) -> dict:
+        """
+        Remove the omitted optional fields of a new entity whose columns are not nullable, leaving them to the model
+        defaults.
+        """
+
+        return {
+            field_name: value for field_name, value in values.items()
+            if value is not None or schema.model._meta.get_field(field_name).null
+        }
+
+    def set_related_entities(self, instance: Model, to_many_values: dict) -> None:
+        """
+        Link a model instance to the entities of its one-to-many and many-to-many relationships.
+        """
+
+        for relation, related_ids in to_many_values.items():
+            if relation.relationship == 'many_to_many':
+                getattr(instance, relation.path).set(related_ids)
+            else:
+                related_schema = self.get_model_schema(relation.component)
+                reverse_relation = next(
+                    related_relation for related_relation in related_schema.relations.values()
+                    if related_relation.relationship == 'many_to_one'
+                    and self.models.get(related_relation.component.__name__) is type(instance)
+                )
+                related_schema.model._default_manager.filter(pk__in=related_ids).update(
+                    **{related_schema.value_paths[reverse_relation.local_field]: instance.pk}
+                )
+
+    def create_component_entity(self, component: Type['BaseComponent'], entity_body: 'BasePostBody') -> Any:
+        schema = self.get_model_schema(component)
+        values, to_many_values = self.get_model_values(component, *self.get_entity_fields(component, entity_body))
+
+        with transaction.atomic():
+            instance = schema.model._default_manager.create(**self.get_insert_values(schema, values))
+            self.set_related_entities(instance, to_many_values)
+
+        return instance.pk
+
+    def create_component_entities(self, component: Type['BaseComponent'], entity_bodies: List['BasePostBody']) -> List:
+        """
+        Create several entities of a component with a single bulk insert, then link each to the entities of its
+        to-many relationships.
+        """
+
+        schema = self.get_model_schema(component)
+        entity_values = [
+            self.get_model_values(component, *self.get_entity_fields(component, entity_body))
+            for entity_body in entity_bodies
+        ]
+
+        with transaction.atomic():
+            instances = self.bulk_create_instances(schema.model, [
+                self.get_insert_values(schema, values) for values, _ in entity_values
+            ])
+            for instance, (_, to_many_values) in zip(instances, entity_values):
+                self.set_related_entities(
+                    instance, {relation: related_ids for relation, related_ids in to_many_values.items() if related_ids}
+                )
+
+        return [instance.pk for instance in instances]
+
+    @staticmethod
+    def bulk_create_instances(model: Type[Model], instance_values: List[dict]) -> List[Model]:
+        """
+        Insert model instances with a single bulk insert if the database returns the primary keys of bulk inserted
+        rows, or one at a time otherwise, so that the primary key of every returned instance is set.
+        """
+
+        if connections[router.db_for_write(model)].features.can_return_rows_from_bulk_insert:
+            return model._default_manager.bulk_create([model(**values) for values in instance_values])
+
+        return [model._default_manager.create(**values) for values in instance_values]
+
+    def atomic(self):
+        return transaction.atomic()
+
+    def update_component_entity(
+            self,
+            component: Type['BaseComponent'],
+            entity_id: Any,
+            entity_body: 'BasePatchBody'
+    ) -> None:
+        schema = self.get_model_schema(component)
+        values, to_many_values = self.get_model_values(
+            component, *self.get_entity_fields(component, entity_body, exclude_unset=True)
+        )
+
+        with transaction.atomic():
+            instance = schema.model._default_manager.select_for_update().filter(pk=entity_id).first()
+            if instance is None:
+                raise HttpError(404, f'{component.__name__} not found.')
+            for field_name, value in values.items():
+                setattr(instance, field_name, value)
+            if values:
+                instance.save(update_fields=list(values))
+            self.set_related_entities(instance, to_many_values)
+
+    def delete_component_entity(self, component: Type['BaseComponent'], entity_id: Any) -> None:
+        schema = self.get_model_schema(component)
+        deleted, _ = schema.model._default_manager.filter(pk=entity_id).delete()
+
+        if not deleted:
+            raise HttpError(404, f'{component.__name__} not found.')
+
+    def create_observations(self, observations):
+        schema = self.get_model_schema(field_schemas.Observation)
+        instance_values = [
+            self.get_insert_values(schema, self.get_model_values(
+                field_schemas.Observation, *self.get_entity_fields(field_schemas.Observation, observation)
+            )[0])
+            for datastream_observations in observations.values() for observation in datastream_observations
+        ]
+
+        with transaction.atomic():
+            instances = self.bulk_create_instances(schema.model, instance_values)
+
+        return [instance.pk for instance in instances]
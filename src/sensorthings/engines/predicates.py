@@ -0,0 +1,394 @@
+import math
+import operator
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, List, Optional
+from dateutil.parser import isoparse
+from ninja.errors import HttpError
+from odata_query import ast
+
+
+Getter = Callable[[Any], Any]
+PathResolver = Callable[[List[str]], Getter]
+
+max_pattern_length = 1000
+
+
+class ValueSet(tuple):
+    """
+    The values of a property reached through a to-many relationship.
+
+    Comparisons with a ValueSet are true if they are true for any of its values.
+    """
+
+    __slots__ = ()
+
+
+@lru_cache(maxsize=65536)
+def parse_datetime(value: str) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 time string to a timezone aware datetime, assuming UTC if no offset is given.
+
+    Parameters
+    ----------
+    value : str
+        The ISO 8601 time string.
+
+    Returns
+    -------
+    Optional[datetime]
+        The parsed datetime, or None if the string is not a valid ISO 8601 time.
+    """
+
+    try:
+        try:
+            parsed_value = datetime.fromisoformat(value)
+        except ValueError:
+            parsed_value = isoparse(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+    return parsed_value if parsed_value.tzinfo is not None else parsed_value.replace(tzinfo=timezone.utc)
+
+
+def to_datetime(value: Any) -> Any:
+    """
+    Convert ISO 8601 time strings to datetimes, leaving other values unchanged.
+    """
+
+    if isinstance(value, str):
+        return parse_datetime(value)
+
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+
+    return value
+
+
+def to_number(value: str) -> Any:
+    """
+    Convert a numeric string to a number, leaving other strings unchanged.
+    """
+
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def coerce_operands(left: Any, right: Any):
+    """
+    Convert operands of different types to comparable values.
+
+    Time strings compared with datetimes are parsed, datetimes compared with dates are truncated, and numeric
+    strings compared with numbers are converted, so that quoted IDs (e.g. Datastream/id eq '1') match numeric IDs.
+    """
+
+    if isinstance(left, str) and isinstance(right, (int, float)) and not isinstance(right, bool):
+        return to_number(left), right
+
+    if isinstance(right, str) and isinstance(left, (int, float)) and not isinstance(left, bool):
+        return left, to_number(right)
+
+    if isinstance(left, (datetime, date)) or isinstance(right, (datetime, date)):
+        left, right = to_datetime(left), to_datetime(right)
+        if isinstance(left, datetime) and type(right) is date:
+            left = left.date()
+        elif isinstance(right, datetime) and type(left) is date:
+            right = right.date()
+
+    return left, right
+
+
+def compare(comparator: Callable[[Any, Any], bool], left: Any, right: Any) -> bool:
+    """
+    Compare two values with OData semantics.
+
+    Null values are only equal to null, ordering comparisons with null are false, values of incomparable types are
+    not equal, and comparisons with the values of a to-many relationship are true if any value matches.
+    """
+
+    if isinstance(left, ValueSet):
+        return any(compare(comparator, value, right) for value in left)
+
+    if isinstance(right, ValueSet):
+        return any(compare(comparator, left, value) for value in right)
+
+    if left is None or right is None:
+        if comparator is operator.eq:
+            return left is right
+        if comparator is operator.ne:
+            return left is not right
+        return False
+
+    left, right = coerce_operands(left, right)
+
+    try:
+        return bool(comparator(left, right))
+    except TypeError:
+        return comparator is operator.ne
+
+
+comparators = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+arithmetic_operators = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+}
+
+
+def get_time_part(part: str) -> Callable[[Any], Any]:
+    def time_part(value):
+        value = to_datetime(value)
+        return getattr(value, part) if value is not None else None
+    return time_part
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> 're.Pattern':
+    """
+    Compile the regular expression of a matchesPattern filter function.
+
+    Parameters
+    ----------
+    pattern : str
+        The regular expression.
+
+    Returns
+    -------
+    re.Pattern
+        The compiled regular expression.
+
+    Raises
+    ------
+    HttpError
+        If the regular expression is too long or invalid.
+    """
+
+    if len(pattern) > max_pattern_length:
+        raise HttpError(400, f'The matchesPattern regular expression must not be longer than {max_pattern_length} '
+                             f'characters.')
+
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise HttpError(400, f'Invalid matchesPattern regular expression: {e}.')
+
+
+def substring(value: str, start: int, length: Optional[int] = None) -> Optional[str]:
+    if value is None:
+        return None
+    return value[start:] if length is None else value[start:start + length]
+
+
+def rounding(function: Callable[[float], Any]) -> Callable[[Any], Any]:
+    def rounded(value):
+        return function(value) if isinstance(value, (int, float)) else None
+    return rounded
+
+
+def string_function(function: Callable[..., Any]) -> Callable[..., Any]:
+    def wrapped(*args):
+        if any(not isinstance(arg, str) for arg in args):
+            return None
+        return function(*args)
+    return wrapped
+
+
+filter_functions = {
+    'contains': string_function(lambda value, search: search in value),
+    'startswith': string_function(lambda value, prefix: value.startswith(prefix)),
+    'endswith': string_function(lambda value, suffix: value.endswith(suffix)),
+    'length': lambda value: len(value) if isinstance(value, (str, list)) else None,
+    'indexof': string_function(lambda value, search: value.find(search)),
+    'substring': substring,
+    'matchesPattern': string_function(lambda value, pattern: compile_pattern(pattern).search(value) is not None),
+    'tolower': string_function(str.lower),
+    'toupper': string_function(str.upper),
+    'trim': string_function(str.strip),
+    'concat': string_function(operator.add),
+    'year': get_time_part('year'),
+    'month': get_time_part('month'),
+    'day': get_time_part('day'),
+    'hour': get_time_part('hour'),
+    'minute': get_time_part('minute'),
+    'second': get_time_part('second'),
+    'fractionalseconds': lambda value: to_datetime(value).microsecond / 1e6 if to_datetime(value) else None,
+    'totaloffsetminutes': lambda value: (
+        to_datetime(value).utcoffset().total_seconds() / 60 if to_datetime(value) else None
+    ),
+    'totalseconds': lambda value: value.total_seconds() if isinstance(value, timedelta) else None,
+    'date': lambda value: to_datetime(value).date() if to_datetime(value) else None,
+    'time': lambda value: to_datetime(value).timetz() if to_datetime(value) else None,
+    'now': lambda: datetime.now(timezone.utc),
+    'mindatetime': lambda: datetime.min.replace(tzinfo=timezone.utc),
+    'maxdatetime': lambda: datetime.max.replace(tzinfo=timezone.utc),
+    'round': rounding(round),
+    'floor': rounding(math.floor),
+    'ceiling': rounding(math.ceil),
+}
+
+
+def get_literal_value(node: Any) -> Any:
+    """
+    Get the Python value of a literal node, with times as timezone aware datetimes.
+    """
+
+    if isinstance(node, ast.DateTime):
+        return to_datetime(node.py_val)
+
+    if isinstance(node, ast.List):
+        return [get_literal_value(value) for value in node.val]
+
+    return node.py_val
+
+
+def get_path(node: Any) -> List[str]:
+    """
+    Get the property path of an identifier or attribute node (e.g. ['Thing', 'name'] for Thing/name).
+    """
+
+    if isinstance(node, ast.Identifier):
+        return [*node.namespace, node.name]
+
+    if isinstance(node, ast.Attribute):
+        return [*get_path(node.owner), node.attr]
+
+    raise HttpError(400, 'Invalid property path in filter.')
+
+
+def compile_expression(node: Any, resolve_path: PathResolver) -> Getter:
+    """
+    Compile a node of a parsed OData filter to a function evaluating it for an entity.
+
+    Parameters
+    ----------
+    node : Any
+        The filter AST node.
+    resolve_path : PathResolver
+        Called with the segments of each property path (e.g. ['Datastream', 'id']), and returning a function
+        reading the property value of an entity.
+
+    Returns
+    -------
+    Getter
+        A function evaluating the node for an entity.
+
+    Raises
+    ------
+    HttpError
+        If the filter uses an unsupported expression or function.
+    """
+
+    if isinstance(node, ast._Literal):  # noqa
+        value = get_literal_value(node)
+        return lambda entity: value
+
+    if isinstance(node, (ast.Identifier, ast.Attribute)):
+        return resolve_path(get_path(node))
+
+    if isinstance(node, ast.BoolOp):
+        left = compile_expression(node.left, resolve_path)
+        right = compile_expression(node.right, resolve_path)
+        if isinstance(node.op, ast.And):
+            return lambda entity: bool(left(entity)) and bool(right(entity))
+        return lambda entity: bool(left(entity)) or bool(right(entity))
+
+    if isinstance(node, ast.UnaryOp):
+        operand = compile_expression(node.operand, resolve_path)
+        if isinstance(node.op, ast.Not):
+            return lambda entity: not operand(entity)
+
+        def negate(entity):
+            value = operand(entity)
+            return -value if isinstance(value, (int, float)) else None
+
+        return negate
+
+    if isinstance(node, ast.Compare):
+        left = compile_expression(node.left, resolve_path)
+        if isinstance(node.comparator, ast.In):
+            right = compile_expression(node.right, resolve_path)
+            return lambda entity: any(compare(operator.eq, left(entity), value) for value in right(entity) or [])
+        comparator = comparators[type(node.comparator)]
+        right = compile_expression(node.right, resolve_path)
+        return lambda entity: compare(comparator, left(entity), right(entity))
+
+    if isinstance(node, ast.BinOp):
+        arithmetic_operator = arithmetic_operators[type(node.op)]
+        left = compile_expression(node.left, resolve_path)
+        right = compile_expression(node.right, resolve_path)
+
+        def evaluate_arithmetic(entity):
+            try:
+                return arithmetic_operator(*coerce_operands(left(entity), right(entity)))
+            except (TypeError, ZeroDivisionError):
+                return None
+
+        return evaluate_arithmetic
+
+    if isinstance(node, ast.Call):
+        function_name = '.'.join([*node.func.namespace, node.func.name])
+        function = filter_functions.get(function_name)
+        if function is None:
+            raise HttpError(400, f"Unsupported filter function '{function_name}'.")
+        # Compile literal patterns up front, so that invalid patterns are rejected before any entity is read.
+        if function_name == 'matchesPattern' and len(node.args) == 2 and isinstance(node.args[1], ast.String):
+            compile_pattern(node.args[1].val)
+        arguments = [compile_expression(argument, resolve_path) for argument in node.args]
+
+        def evaluate_call(entity):
+            values = [argument(entity) for argument in arguments]
+            if values and isinstance(values[0], ValueSet):
+                return ValueSet(function(value, *values[1:]) for value in values[0])
+            try:
+                return function(*values)
+            except (TypeError, ValueError, AttributeError):
+                return None
+
+        return evaluate_call
+
+    raise HttpError(400, f'Unsupported filter expression: {type(node).__name__}.')
+
+
+def compile_filter(filters: Any, resolve_path: PathResolver) -> Callable[[Any], bool]:
+    """
+    Compile a parsed OData filter to a predicate.
+
+    Parameters
+    ----------
+    filters : Any
+        The filter AST.
+    resolve_path : PathResolver
+        Called with the segments of each property path, and returning a function reading the property value of an
+        entity.
+
+    Returns
+    -------
+    Callable[[Any], bool]
+        A function returning whether an entity matches the filter.
+    """
+
+    expression = compile_expression(filters, resolve_path)
+
+    def predicate(entity):
+        value = expression(entity)
+        if isinstance(value, ValueSet):
+            return any(value)
+        return value is True
+
+    return predicate
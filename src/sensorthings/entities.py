@@ -0,0 +1,283 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+from sensorthings import settings
+
+
+id_type = settings.ST_API_ID_TYPE
+
+
+class EntityRow(Mapping):
+    """
+    Read-only view of a single entity stored in an EntityTable.
+
+    The row holds a reference to the column index shared by every row of the table and a tuple of values, so it
+    costs two pointers on top of the tuple instead of a full dictionary. Fields can be read by key like a dict or as
+    attributes, which lets response schemas validate rows without converting them first.
+    """
+
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index: Dict[str, int], values: tuple):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._index[key]]
+
+    def __getattr__(self, key: str) -> Any:
+        if key.startswith('_'):
+            raise AttributeError(key)
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f'EntityRow({dict(self)})'
+
+
+class EntityTable(Mapping):
+    """
+    Compact container for entities returned by an engine.
+
+    Engines may return an EntityTable from their get methods in place of a dictionary of entity dictionaries. Each
+    entity is stored as a tuple of values, and a single column index is shared by all rows of the table. The table
+    behaves like a read-only ``Dict[id_type, Mapping]``, and the core engine adds and removes fields column-wise so
+    that rows stay compact through every processing stage.
+
+    Every row must provide a value for every column.
+
+    Parameters
+    ----------
+    columns : Sequence[str]
+        The field names of the entities, in row order.
+    rows : Iterable[Sequence]
+        The entity rows. Each row holds one value per column.
+    id_column : str, optional
+        The column holding the entity ID. Default is 'id'.
+    """
+
+    __slots__ = ('_index', '_rows')
+
+    def __init__(self, columns: Sequence[str], rows: Iterable[Sequence], id_column: str = 'id'):
+        self._index = {column: i for i, column in enumerate(columns)}
+        id_position = self._index[id_column]
+        self._rows = {row[id_position]: tuple(row) for row in rows}
+
+    @classmethod
+    def from_entities(cls, entities: Dict[id_type, Dict[str, Any]]) -> 'EntityTable':
+        """
+        Build an EntityTable from a dictionary of entity dictionaries.
+
+        The columns are the union of the fields of all entities, in the order they first appear. Fields missing
+        from an entity are set to None.
+
+        Parameters
+        ----------
+        entities : Dict[id_type, Dict[str, Any]]
+            The entities keyed by ID.
+
+        Returns
+        -------
+        EntityTable
+            The compact table of entities.
+        """
+
+        columns = tuple(dict.fromkeys(
+            column for entity in entities.values() for column in entity
+        )) if entities else ('id',)
+
+        return cls._from_index(
+            {column: i for i, column in enumerate(columns)},
+            {
+                entity_id: tuple(entity.get(column) for column in columns)
+                for entity_id, entity in entities.items()
+            }
+        )
+
+    @classmethod
+    def _from_index(cls, index: Dict[str, int], rows: Dict[id_type, tuple]) -> 'EntityTable':
+        table = cls.__new__(cls)
+        table._index = index
+        table._rows = rows
+        return table
+
+    @classmethod
+    def concat(cls, tables: Sequence['EntityTable']) -> 'EntityTable':
+        """
+        Concatenate tables with the same columns.
+
+        Rows of later tables replace rows of earlier tables with the same ID.
+
+        Parameters
+        ----------
+        tables : Sequence[EntityTable]
+            The tables to concatenate, which must all have the same columns in the same order.
+
+        Returns
+        -------
+        EntityTable
+            The concatenated table.
+        """
+
+        rows = {}
+
+        for table in tables:
+            rows.update(table._rows)
+
+        return cls._from_index(tables[0]._index if tables else {'id': 0}, rows)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """
+        The field names of the entities in the table.
+        """
+
+        return tuple(self._index)
+
+    def __getitem__(self, entity_id: id_type) -> EntityRow:
+        return EntityRow(self._index, self._rows[entity_id])
+
+    def __iter__(self) -> Iterator[id_type]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return f'EntityTable(columns={self.columns}, rows={len(self._rows)})'
+
+    def column(self, column: str) -> List[Any]:
+        """
+        Get the values of a column.
+
+        Parameters
+        ----------
+        column : str
+            The name of the column.
+
+        Returns
+        -------
+        List[Any]
+            One value per row, in the iteration order of the table.
+        """
+
+        position = self._index[column]
+
+        return [row[position] for row in self._rows.values()]
+
+    def with_column(self, column: str, values: Iterable[Any]) -> 'EntityTable':
+        """
+        Return a new table with a column added, or replaced if it already exists.
+
+        Parameters
+        ----------
+        column : str
+            The name of the column.
+        values : Iterable[Any]
+            One value per row, in the iteration order of the table.
+
+        Returns
+        -------
+        EntityTable
+            The new table.
+        """
+
+        if column in self._index:
+            position = self._index[column]
+            return self._from_index(self._index, {
+                entity_id: row[:position] + (value,) + row[position + 1:]
+                for (entity_id, row), value in zip(self._rows.items(), values)
+            })
+
+        return self._from_index({**self._index, column: len(self._index)}, {
+            entity_id: row + (value,)
+            for (entity_id, row), value in zip(self._rows.items(), values)
+        })
+
+    def with_columns(self, columns: Dict[str, Iterable[Any]]) -> 'EntityTable':
+        """
+        Return a new table with several columns added, or replaced if they already exist.
+
+        New columns are appended to every row in a single pass.
+
+        Parameters
+        ----------
+        columns : Dict[str, Iterable[Any]]
+            The values of each column, one value per row in the iteration order of the table.
+
+        Returns
+        -------
+        EntityTable
+            The new table.
+        """
+
+        table = self
+        new_columns = {}
+
+        for column, values in columns.items():
+            if column in self._index:
+                table = table.with_column(column, values)
+            else:
+                new_columns[column] = values
+
+        if not new_columns:
+            return table
+
+        index = dict(table._index)
+        for column in new_columns:
+            index[column] = len(index)
+
+        return self._from_index(index, {
+            entity_id: row + values
+            for (entity_id, row), values in zip(table._rows.items(), zip(*new_columns.values()))
+        })
+
+    def take(self, entity_ids: Iterable[id_type]) -> 'EntityTable':
+        """
+        Return a new table containing only the given rows.
+
+        Parameters
+        ----------
+        entity_ids : Iterable[id_type]
+            The IDs of the rows to keep, in the order they should appear in the new table.
+
+        Returns
+        -------
+        EntityTable
+            The new table.
+        """
+
+        return self._from_index(self._index, {entity_id: self._rows[entity_id] for entity_id in entity_ids})
+
+    def without_columns(self, columns: Iterable[str]) -> 'EntityTable':
+        """
+        Return a new table with the given columns removed.
+
+        Parameters
+        ----------
+        columns : Iterable[str]
+            The names of the columns to remove. Names that are not in the table are ignored.
+
+        Returns
+        -------
+        EntityTable
+            The new table.
+        """
+
+        columns = set(columns)
+        kept_positions = [position for column, position in self._index.items() if column not in columns]
+
+        if len(kept_positions) == len(self._index):
+            return self
+
+        return self._from_index(
+            {column: i for i, column in enumerate(column for column in self._index if column not in columns)},
+            {entity_id: tuple(row[i] for i in kept_positions) for entity_id, row in self._rows.items()}
+        )
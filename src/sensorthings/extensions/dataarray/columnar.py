@@ -0,0 +1,235 @@
+import io
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+from dateutil.parser import isoparse
+from django.http import StreamingHttpResponse
+from ninja.errors import HttpError
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+
+time_columns = ('phenomenonTime', 'resultTime', 'validTime')
+json_columns = ('resultQuality', 'parameters')
+
+
+def is_numeric(value: Any) -> bool:
+    """
+    Check whether a result value can be stored as a double.
+    """
+
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def build_arrow_array(column: str, values: List[Any], data_type: Optional['pa.DataType'] = None) -> 'pa.Array':
+    """
+    Build a typed Arrow array from the values of an Observation column.
+
+    Results are stored as doubles if they are all numeric, and as JSON strings otherwise. Times are stored as UTC
+    timestamps unless the column holds time intervals, in which case they are kept as ISO 8601 strings. Result
+    quality and parameters are stored as JSON strings, and UUIDs as strings.
+
+    Parameters
+    ----------
+    column : str
+        The name of the column (e.g. 'phenomenonTime').
+    values : List[Any]
+        The values of the column.
+    data_type : pa.DataType, optional
+        The type of the column, if it is already fixed by an earlier batch of the same stream.
+
+    Returns
+    -------
+    pa.Array
+        The Arrow array of the column.
+    """
+
+    if column == 'result':
+        if data_type is None:
+            data_type = pa.float64() if all(is_numeric(value) for value in values) else pa.string()
+        if pa.types.is_floating(data_type):
+            return pa.array(values, type=data_type)
+        return pa.array([json.dumps(value) if value is not None else None for value in values], type=pa.string())
+
+    if column in json_columns:
+        return pa.array([json.dumps(value) if value is not None else None for value in values], type=pa.string())
+
+    if column in time_columns:
+        if (data_type is None and any(isinstance(value, str) and '/' in value for value in values)) or (
+            data_type is not None and pa.types.is_string(data_type)
+        ):
+            return pa.array([
+                value.isoformat() if isinstance(value, datetime) else value for value in values
+            ], type=pa.string())
+        return pa.array([
+            isoparse(value) if isinstance(value, str) else value for value in values
+        ], type=pa.timestamp('us', tz='UTC'))
+
+    return pa.array([str(value) if isinstance(value, UUID) else value for value in values], type=data_type)
+
+
+def build_record_batch(columns: Dict[str, List[Any]], schema: Optional['pa.Schema'] = None) -> 'pa.RecordBatch':
+    """
+    Build an Arrow record batch from Observation columns.
+
+    Parameters
+    ----------
+    columns : Dict[str, List[Any]]
+        The values of each column, keyed by column name.
+    schema : pa.Schema, optional
+        The schema of the stream the batch is written to, if it is already fixed by an earlier batch.
+
+    Returns
+    -------
+    pa.RecordBatch
+        The Arrow record batch.
+    """
+
+    return pa.record_batch([
+        build_arrow_array(column, values, schema.field(column).type if schema is not None else None)
+        for column, values in columns.items()
+    ], names=list(columns.keys()))
+
+
+class ChunkedOutputStream(io.RawIOBase):
+    """
+    A write-only file that holds what has been written to it until it is drained.
+
+    Arrow and Parquet writers track offsets using the position of their file, so the position keeps counting the
+    bytes that have already been drained.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        content = b''.join(self.chunks)
+        self.chunks.clear()
+        return content
+
+
+def write_arrow_stream(column_batches: Iterable[Dict[str, List[Any]]]) -> Iterator[bytes]:
+    """
+    Write batches of Observation columns in the Arrow IPC streaming format, one record batch at a time.
+    """
+
+    sink = ChunkedOutputStream()
+    writer = None
+    schema = None
+
+    for columns in column_batches:
+        batch = build_record_batch(columns, schema)
+        if writer is None:
+            schema = batch.schema
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_batch(batch)
+        yield sink.drain()
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def write_parquet(column_batches: Iterable[Dict[str, List[Any]]]) -> Iterator[bytes]:
+    """
+    Write batches of Observation columns as a Parquet file, one row group at a time.
+    """
+
+    sink = ChunkedOutputStream()
+    writer = None
+    schema = None
+
+    for columns in column_batches:
+        batch = build_record_batch(columns, schema)
+        if writer is None:
+            schema = batch.schema
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_batch(batch)
+        yield sink.drain()
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+result_formats: Dict[str, Tuple[str, Optional[Callable[[Iterable[Dict[str, List[Any]]]], Iterator[bytes]]]]] = {
+    'arrow': ('application/vnd.apache.arrow.stream', write_arrow_stream if pa is not None else None),
+    'parquet': ('application/vnd.apache.parquet', write_parquet if pa is not None else None),
+}
+
+
+def check_result_format(result_format: str) -> None:
+    """
+    Check that a columnar result format can be written, so that Observations are not fetched for nothing.
+
+    Parameters
+    ----------
+    result_format : str
+        The columnar result format, either 'arrow' or 'parquet'.
+
+    Raises
+    ------
+    HttpError
+        If the result format's writer is not available.
+    """
+
+    if result_formats[result_format][1] is None:
+        raise HttpError(501, 'Arrow and Parquet result formats require PyArrow.')
+
+
+def build_columnar_response(
+        column_batches: List[Dict[str, List[Any]]],
+        result_format: str
+) -> StreamingHttpResponse:
+    """
+    Build a streaming Observations response in a columnar result format.
+
+    Each batch of columns is encoded and sent as it is written, so that the encoded result is never held in memory
+    as a whole. Parquet responses are sent as a file download.
+
+    Parameters
+    ----------
+    column_batches : List[Dict[str, List[Any]]]
+        The batches of Observation columns, each holding the values of each column keyed by column name.
+    result_format : str
+        The columnar result format, either 'arrow' or 'parquet'.
+
+    Returns
+    -------
+    StreamingHttpResponse
+        The response containing the Observations in the result format.
+
+    Raises
+    ------
+    HttpError
+        If the result format's writer is not available.
+    """
+
+    check_result_format(result_format)
+    media_type, writer = result_formats[result_format]
+
+    response = StreamingHttpResponse(writer(column_batches), content_type=media_type)
+
+    if result_format == 'parquet':
+        response['Content-Disposition'] = 'attachment; filename="Observations.parquet"'
+
+    return response
@@ -0,0 +1,98 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def largest_triangle_three_buckets(times: 'np.ndarray', values: 'np.ndarray', threshold: int) -> 'np.ndarray':
+    """
+    Select the points of a series to keep using the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. The remaining points are split into threshold - 2 buckets, and the
+    point of each bucket forming the largest triangle with the previously selected point and the average point of
+    the next bucket is kept.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        The x coordinates of the series, in ascending order.
+    values : np.ndarray
+        The y coordinates of the series.
+    threshold : int
+        The maximum number of points to keep.
+
+    Returns
+    -------
+    np.ndarray
+        The ascending indices of the points to keep.
+    """
+
+    length = len(times)
+
+    if threshold >= length or length <= 2:
+        return np.arange(length)
+
+    if threshold < 3:
+        return np.array([0, length - 1])
+
+    times = times.astype(float)
+    values = values.astype(float)
+    bucket_edges = np.append(np.linspace(1, length - 1, threshold - 1).astype(int), length)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, length - 1
+    selected = 0
+
+    for i in range(threshold - 2):
+        start, end, next_end = bucket_edges[i], bucket_edges[i + 1], bucket_edges[i + 2]
+        next_time, next_value = times[end:next_end].mean(), values[end:next_end].mean()
+        areas = np.abs(
+            (times[selected] - next_time) * (values[start:end] - values[selected]) -
+            (times[selected] - times[start:end]) * (next_value - values[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+
+    return indices
+
+
+def min_max(times: 'np.ndarray', values: 'np.ndarray', threshold: int) -> 'np.ndarray':
+    """
+    Select the points of a series to keep using per-bucket minimum and maximum values.
+
+    The series is split into threshold // 2 buckets of equal point counts, and the points with the minimum and
+    maximum value of each bucket are kept, which preserves the peaks of the series.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        The x coordinates of the series, in ascending order.
+    values : np.ndarray
+        The y coordinates of the series.
+    threshold : int
+        The maximum number of points to keep.
+
+    Returns
+    -------
+    np.ndarray
+        The ascending indices of the points to keep.
+    """
+
+    length = len(times)
+
+    if threshold >= length:
+        return np.arange(length)
+
+    bucket_edges = np.linspace(0, length, max(threshold // 2, 1) + 1).astype(int)
+    indices = []
+
+    for start, end in zip(bucket_edges[:-1], bucket_edges[1:]):
+        indices.extend((start + int(np.argmin(values[start:end])), start + int(np.argmax(values[start:end]))))
+
+    return np.unique(indices)
+
+
+downsample_methods = {
+    'lttb': largest_triangle_three_buckets,
+    'minmax': min_max
+}
@@ -1,10 +1,15 @@
 from abc import ABCMeta, abstractmethod
 from typing import List, Union, Dict
 from itertools import groupby
+from ninja.errors import HttpError
 from sensorthings.schemas import EntityId
-from sensorthings.components.observations.schemas import ObservationPostBody
+from sensorthings.components.datastreams.schemas import Datastream
+from sensorthings.components.observations.schemas import Observation, ObservationPostBody
 from sensorthings.extensions.dataarray.schemas import ObservationDataArrayFields
+from sensorthings.entities import EntityTable
 from .schemas import ObservationDataArrayPostBody
+from .downsampling import np, downsample_methods
+from sensorthings.profiling import profile_span
 from sensorthings import settings
 
 
@@ -32,6 +37,151 @@ class DataArrayBaseEngine(metaclass=ABCMeta):
 
         pass
 
+    def get_downsampled_observations(
+            self,
+            threshold: int,
+            method: str,
+            datastream_ids: List[id_type],
+            filters: dict = None
+    ) -> Dict[id_type, dict]:
+        """
+        Get a downsampled subset of the Observations of each of the given Datastreams.
+
+        The default implementation fetches the matching Observations of one Datastream at a time and selects the
+        points of its series with NumPy, which must be installed to use it. Engines can override this method to
+        downsample Observations in the database instead, for example by bucketing rows with NTILE and keeping the
+        minimum and maximum result of each bucket.
+
+        Parameters:
+        - threshold (int): The maximum number of Observations to return per Datastream.
+        - method (str): The downsampling method, either 'lttb' (Largest-Triangle-Three-Buckets) or 'minmax'.
+        - datastream_ids (List[id_type]): The IDs of the Datastreams to downsample the Observations of.
+        - filters (dict): Additional filters to apply to the Observations.
+
+        Returns:
+        - dict: The selected Observations keyed by ID, grouped by Datastream and ordered by phenomenon time.
+        """
+
+        if np is None:
+            raise NotImplementedError('Observation downsampling requires NumPy.')
+
+        batches = []
+
+        for datastream_id in datastream_ids:
+            observations, _ = self.get_observations(  # noqa
+                datastream_ids=[datastream_id],
+                filters=filters,
+                ordering=[{'field': 'phenomenonTime', 'direction': 'asc'}]
+            )
+
+            if not observations:
+                continue
+
+            if isinstance(observations, EntityTable):
+                phenomenon_times = observations.column('phenomenon_time')
+                results = observations.column('result')
+            else:
+                phenomenon_times = [observation['phenomenon_time'] for observation in observations.values()]
+                results = [observation['result'] for observation in observations.values()]
+
+            try:
+                results = np.array(results, dtype=float)
+            except (TypeError, ValueError):
+                raise HttpError(422, 'Only Datastreams with numeric Observation results can be downsampled.')
+
+            observation_ids = np.array(list(observations.keys()), dtype=object)
+            timestamps = self.get_phenomenon_timestamps(phenomenon_times)  # noqa
+            positions = np.argsort(timestamps, kind='stable')
+            selected_ids = observation_ids[positions[downsample_methods[method](
+                timestamps[positions], results[positions], threshold
+            )]]
+
+            if isinstance(observations, EntityTable):
+                batches.append(observations.take(selected_ids))
+            else:
+                batches.append({observation_id: observations[observation_id] for observation_id in selected_ids})
+
+        return self.merge_batches(batches)  # noqa
+
+    def get_downsampled_datastream_ids(self) -> List[id_type]:
+        """
+        Get the IDs of the Datastreams whose Observations a downsampled response contains.
+
+        Downsampling is only supported for the Observations of a Datastream (e.g. Datastreams(1)/Observations). The
+        Datastreams of other Observation collections, such as /Observations or FeaturesOfInterest(1)/Observations,
+        depend on their filters and could only be found by fetching all of their Observations.
+
+        Returns:
+        - list: The IDs of the Datastreams.
+
+        Raises:
+        - HttpError: If the request path is not scoped to a Datastream.
+        """
+
+        nested_entity_id = self.check_nested_path()  # noqa
+
+        if nested_entity_id is None or self.request.nested_path[-1][0].__name__ != 'Datastream':  # noqa
+            raise HttpError(
+                400, '$downsample is only supported for the Observations of a Datastream, e.g. '
+                     'Datastreams(1)/Observations.'
+            )
+
+        return [nested_entity_id]
+
+    def downsample_observations(self, query_params: dict) -> dict:
+        """
+        Get a downsampled Observations response.
+
+        The response contains up to the requested number of Observations of the Datastream of the request path. The
+        query cost is checked as the maximum number of Observations returned, before any Observations are fetched.
+
+        Parameters:
+        - query_params (dict): The query parameters of the request.
+
+        Returns:
+        - dict: The Observations response.
+        """
+
+        datastream_ids = self.get_downsampled_datastream_ids()
+        self.check_query_cost(  # noqa
+            component=Observation,
+            query_params=query_params,
+            rows=len(datastream_ids) * query_params['downsample']
+        )
+        query_params = self.apply_nested_path_filter(query_params)  # noqa
+
+        try:
+            observations = self.get_downsampled_observations(
+                threshold=query_params['downsample'],
+                method=query_params.get('downsample_method') or 'lttb',
+                datastream_ids=datastream_ids,
+                filters=self.parse_filters(query_params)  # noqa
+            )
+        except NotImplementedError as e:
+            raise HttpError(501, str(e))
+
+        self.actual_query_cost += len(observations)  # noqa
+        observations = self.insert_self_links(entities=observations, component=Observation)  # noqa
+        observations = self.insert_related_entities(  # noqa
+            entities=observations,
+            component=Observation,
+            query_params=query_params
+        )
+        observations = self.remove_unselected_fields(  # noqa
+            entities=observations,
+            component=Observation,
+            query_params=query_params
+        )
+
+        response = {
+            'value': list(observations.values())
+        }
+
+        if query_params.get('count') is True:
+            response['count'] = len(observations)
+
+        return response
+
     @ staticmethod
     def convert_from_data_array(
             observations: List[ObservationDataArrayPostBody],
@@ -90,8 +240,7 @@ class DataArrayBaseEngine(metaclass=ABCMeta):
         response['value'] = [
             {
                 'datastream_id': datastream_id,
-                'datastream': f'{self.request.sensorthings_url}/'  # noqa
-                              f'Datastreams({id_qualifier}{datastream_id}{id_qualifier})',
+                'datastream': self.build_ref_link(Datastream, datastream_id),  # noqa
                 'components': [
                     '@iot.id' if field == 'id' else ObservationDataArrayFields.model_fields[field].alias
                     for field in selected_fields
@@ -106,3 +255,70 @@ class DataArrayBaseEngine(metaclass=ABCMeta):
         ]
 
         return response
+
+    def get_observation_column_batches(self, query_params: dict) -> List[Dict[str, list]]:
+        """
+        Get the fields of the requested Observations as batches of columns.
+
+        The columns are read from the engine's Observations without building a response entity for each
+        Observation, using the columns of an EntityTable directly if the engine returns one. The request's
+        pagination and query cost limits apply as they do to other Observation collections. Downsampled Observations
+        are returned as one batch per Datastream, so that each batch can be written to the response on its own.
+
+        Parameters:
+        - query_params (dict): The query parameters of the request.
+
+        Returns:
+        - list: The batches of columns, each holding the values of each selected field keyed by the field's data
+          array component name.
+        """
+
+        datastream_ids = self.get_downsampled_datastream_ids() \
+            if query_params.get('downsample') is not None else None
+        self.check_query_cost(  # noqa
+            component=Observation,
+            query_params=query_params,
+            rows=len(datastream_ids) * query_params['downsample'] if datastream_ids is not None else None
+        )
+        query_params = self.apply_nested_path_filter(query_params)  # noqa
+
+        if datastream_ids is not None:
+            try:
+                batches = [
+                    self.get_downsampled_observations(
+                        threshold=query_params['downsample'],
+                        method=query_params.get('downsample_method') or 'lttb',
+                        datastream_ids=[datastream_id],
+                        filters=self.parse_filters(query_params)  # noqa
+                    ) for datastream_id in datastream_ids
+                ]
+            except NotImplementedError as e:
+                raise HttpError(501, str(e))
+        else:
+            with profile_span(self.request, 'backend'):  # noqa
+                observations, _ = self.get_observations(  # noqa
+                    filters=self.parse_filters(query_params),  # noqa
+                    pagination=self.parse_pagination(query_params),  # noqa
+                    ordering=self.parse_ordering(query_params)  # noqa
+                )
+            batches = [observations]
+
+        select = query_params.get('select')
+
+        if select:
+            selected_fields = [
+                field for field, field_info in ObservationDataArrayFields.model_fields.items()
+                if field_info.alias in select.split(',') or (field == 'id' and 'id' in select.split(','))
+            ]
+        else:
+            selected_fields = ['datastream_id', 'phenomenon_time', 'result']
+
+        return [
+            {
+                ObservationDataArrayFields.model_fields[field].alias: (
+                    observations.column(field) if field in observations.columns else [None] * len(observations)
+                ) if isinstance(observations, EntityTable) else [
+                    observation.get(field) for observation in observations.values()
+                ] for field in selected_fields
+            } for observations in [observations for observations in batches if observations] or [{}]
+        ]
@@ -10,7 +10,8 @@ from sensorthings import settings
 
 
 id_type = settings.ST_API_ID_TYPE
-observationResultFormats = Literal['dataArray']
+observationResultFormats = Literal['dataArray', 'arrow', 'parquet']
+observationDownsampleMethods = Literal['lttb', 'minmax']
 dataArray = List[List[Union[id_type, float, ISOTimeString, ISOIntervalString, dict]]]
 
 
@@ -84,10 +85,18 @@ class ObservationQueryParams(ListQueryParams):
     Attributes
     ----------
     result_format : Optional[observationResultFormats], optional
-        Result format for the query, defaults to None.
+        Result format for the query, defaults to None. The 'arrow' (Arrow IPC stream) and 'parquet' formats return
+        the Observations as columns instead of JSON.
+    downsample : Optional[int], optional
+        Maximum number of observations of the datastream of the request path to return, selected to preserve the
+        shape of the observation series, defaults to None.
+    downsample_method : observationDownsampleMethods, optional
+        Method used to select the downsampled observations, defaults to 'lttb' (Largest-Triangle-Three-Buckets).
     """
 
     result_format: Optional[observationResultFormats] = Field(None, alias='$resultFormat')
+    downsample: Optional[int] = Field(None, alias='$downsample', ge=2)
+    downsample_method: observationDownsampleMethods = Field('lttb', alias='$downsampleMethod')
 
     class Config:
         populate_by_name = True
@@ -7,11 +7,12 @@ from sensorthings.http import SensorThingsHttpRequest
 from sensorthings.schemas import PermissionDenied, EntityNotFound
 from sensorthings.components.datastreams.schemas import Datastream
 from sensorthings.components.observations.views import (get_observation, create_observation, update_observation,
-                                                        delete_observation)
-from sensorthings.components.observations.schemas import Observation
+                                                        delete_observation, aggregate_observations)
+from sensorthings.components.observations.schemas import Observation, ObservationAggregateListResponse
 from sensorthings.extensions.dataarray.schemas import (ObservationDataArrayPostBody, ObservationQueryParams,
                                                        ObservationGetResponse,
                                                        ObservationListResponse)
+from sensorthings.extensions.dataarray.columnar import check_result_format, build_columnar_response
 
 
 router = SensorThingsRouter(tags=['Observations'])
@@ -37,10 +38,24 @@ def list_observations(
       Observation Relations</a>
     """
 
-    response = request.engine.list_entities(
-        component=Observation,
-        query_params=params.dict()
-    )
+    if params.result_format in ('arrow', 'parquet'):
+        check_result_format(params.result_format)
+        return build_columnar_response(
+            column_batches=request.engine.get_observation_column_batches(  # noqa
+                query_params=params.dict()
+            ),
+            result_format=params.result_format
+        )
+
+    if params.downsample is not None:
+        response = request.engine.downsample_observations(  # noqa
+            query_params=params.dict()
+        )
+    else:
+        response = request.engine.list_entities(
+            component=Observation,
+            query_params=params.dict()
+        )
 
     if params.result_format == 'dataArray':
         response = request.engine.convert_to_data_array( # noqa
@@ -64,6 +79,20 @@ router.add_api_operation(
     exclude_unset=True,
 )
 
+router.add_api_operation(
+    f'/Datastreams({id_qualifier}{{datastream_id}}{id_qualifier})/Observations/$aggregate',
+    methods=['GET'],
+    response={
+        200: Union[(ObservationAggregateListResponse, str,)],
+        403: PermissionDenied,
+        404: EntityNotFound
+    },
+    view_func=aggregate_observations,
+    url_name='aggregate_observation',
+    by_alias=True,
+    exclude_unset=True,
+)
+
 router.add_api_operation(
     f'/Observations',
     methods=['POST'],
@@ -1,8 +1,9 @@
 from django.http import HttpRequest
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Type, Optional
 from sensorthings.engine import SensorThingsBaseEngine
 from sensorthings.types import AnyHttpUrlString
 from sensorthings.schemas import BaseComponent
+from sensorthings.profiling import RequestProfile
 from sensorthings.settings import ST_API_ID_TYPE
 
 
@@ -27,6 +28,12 @@ class SensorThingsHttpRequest(HttpRequest):
         Indicates whether the response is a reference.
     value_response : bool
         Indicates whether the response is a value.
+    trusted_engine_output : bool
+        Indicates whether the response is serialized from the engine output without validation.
+    entity_link_prefixes : Dict[Type[BaseComponent], str]
+        The prefix of the entity links of each component, ending before the entity ID.
+    profile : Optional[RequestProfile]
+        The timings and counters of the request, or None if the request is not profiled.
     """
 
     sensorthings_url: AnyHttpUrlString
@@ -35,3 +42,6 @@ class SensorThingsHttpRequest(HttpRequest):
     nested_path: List[Tuple[BaseComponent, Optional[ST_API_ID_TYPE]]]
     ref_response: bool
     value_response: bool
+    trusted_engine_output: bool
+    entity_link_prefixes: Dict[Type[BaseComponent], str]
+    profile: Optional[RequestProfile]
@@ -1,11 +1,15 @@
 import functools
+from collections.abc import Mapping
 from ninja import NinjaAPI
+from django.conf import settings as django_settings
 from copy import deepcopy
 from django.urls import re_path
+from django.utils.cache import patch_vary_headers
 from pydantic import BaseModel
 from typing import Union, Type, NewType, List, Sequence, Optional, Callable
 from sensorthings.engine import SensorThingsBaseEngine
 from sensorthings.renderer import SensorThingsRenderer
+from sensorthings.parser import SensorThingsParser
 from sensorthings.router import SensorThingsRouter
 from sensorthings.components.root.views import router as root_router
 from sensorthings.components.root.views import handle_advanced_path
@@ -18,6 +22,9 @@ from sensorthings.components.observedproperties.views import router as observedp
 from sensorthings.components.sensors.views import router as sensors_router
 from sensorthings.components.things.views import router as things_router
 from sensorthings.components import get_response_schemas
+from sensorthings.serializers import serialize_engine_output
+from sensorthings.profiling import profile_span
+from sensorthings import settings
 from sensorthings.extensions.dataarray.engine import DataArrayBaseEngine
 from sensorthings.extensions.dataarray.views import router as data_array_router
 
@@ -34,6 +41,7 @@ class SensorThingsAPI(NinjaAPI):
             self,
             engine: Union[Type[NewType('SensorThingsEngine', SensorThingsBaseEngine)], None] = None,
             endpoints: Union[List['SensorThingsEndpoint'], None] = None,
+            trusted_engine_output: bool = False,
             **kwargs
     ):
         """
@@ -45,6 +53,10 @@ class SensorThingsAPI(NinjaAPI):
             The engine class for SensorThings. Default is None.
         endpoints : List[SensorThingsEndpoint], optional
             A list of endpoints for the API. Default is None.
+        trusted_engine_output : bool, optional
+            Whether GET responses are serialized directly from the engine output instead of being validated against
+            the response schemas. Responses are still validated when DEBUG or ST_VALIDATE_TRUSTED_ENGINE_OUTPUT is
+            enabled. Can be overridden per endpoint. Default is False.
 
         Raises
         ------
@@ -65,11 +77,13 @@ class SensorThingsAPI(NinjaAPI):
 
         super().__init__(
             renderer=SensorThingsRenderer(),
+            parser=SensorThingsParser(),
             **kwargs
         )
 
         self.endpoints = endpoints if endpoints is not None else []
         self.engine = engine
+        self.trusted_engine_output = trusted_engine_output
 
         self.add_router('', deepcopy(root_router))
         self.add_router('', self._build_sensorthings_router('thing', things_router))
@@ -96,7 +110,32 @@ class SensorThingsAPI(NinjaAPI):
             if get_response_schema_name.endswith('GetResponse')
         }
 
-        handle_advanced_path.__api__ = self
+    def warm_entity_caches(self):
+        """
+        Fill the entity caches of the API's engine, outside of any request.
+
+        Call this once per process at startup, for example from the ready method of a Django app config, to serve
+        the first requests from warm caches. Only engines with an entity cache scope outside a request are warmed.
+        """
+
+        self.engine(request=None, get_response_schemas=self.get_response_schemas).warm_entity_caches()
+
+    def create_response(self, request, data, *, status=None, temporal_response=None):
+        """
+        Create a rendered response, with the media type of the binary format it is rendered in, if any, and a
+        'Vary: Accept' header if its format was negotiated from the Accept header.
+        """
+
+        response = super().create_response(request, data, status=status, temporal_response=temporal_response)
+
+        if getattr(request, 'response_media_type', None) is not None:
+            response['Content-Type'] = request.response_media_type
+
+        # Responses rendered in a format negotiated from the Accept header must be cached per Accept header.
+        if getattr(request, 'response_negotiated', False):
+            patch_vary_headers(response, ('Accept',))
+
+        return response
 
     def _get_urls(self):
         """
@@ -109,7 +148,14 @@ class SensorThingsAPI(NinjaAPI):
         """
 
         urls = super()._get_urls()
-        urls.append(re_path(r'^.*', handle_advanced_path, name='advanced_path_handler'))
+
+        # Each API gets its own handler, which the middleware reads the API (and engine) of the request from.
+        @functools.wraps(handle_advanced_path)
+        def api_handle_advanced_path(request):
+            return handle_advanced_path(request)
+
+        api_handle_advanced_path.__api__ = self
+        urls.append(re_path(r'^.*', api_handle_advanced_path, name='advanced_path_handler'))
 
         return urls
 
@@ -139,6 +185,58 @@ class SensorThingsAPI(NinjaAPI):
             return view_func(*args, **kwargs)
         return auth_wrapper
 
+    @staticmethod
+    def _apply_profiling(view_func):
+        """
+        Time the view function as the 'handler' stage of profiled requests.
+
+        Parameters
+        ----------
+        view_func : Callable
+            The view function to wrap.
+
+        Returns
+        -------
+        Callable
+            The wrapped view function.
+        """
+
+        @functools.wraps(view_func)
+        def profiling_wrapper(request, *args, **kwargs):
+            with profile_span(request, 'handler'):
+                return view_func(request, *args, **kwargs)
+        return profiling_wrapper
+
+    def _apply_trusted_output(self, view_func, response_schema):
+        """
+        Serialize the output of a GET view function without validating it against its response schema.
+
+        Parameters
+        ----------
+        view_func : Callable
+            The view function to wrap.
+        response_schema : Type
+            The response schema used to map response fields to their aliases.
+
+        Returns
+        -------
+        Callable
+            The wrapped view function returning a rendered response.
+        """
+
+        @functools.wraps(view_func)
+        def trusted_output_wrapper(request, *args, **kwargs):
+            if django_settings.DEBUG or settings.ST_VALIDATE_TRUSTED_ENGINE_OUTPUT:
+                return view_func(request, *args, **kwargs)
+            request.trusted_engine_output = True
+            response = view_func(request, *args, **kwargs)
+            if not isinstance(response, Mapping):
+                return response
+            return self.create_response(
+                request, serialize_engine_output(response_schema, response), status=200
+            )
+        return trusted_output_wrapper
+
     def _build_sensorthings_router(self, component, router):
         """
         Build a SensorThings router for a specific component.
@@ -184,6 +282,16 @@ class SensorThingsAPI(NinjaAPI):
                 else:
                     authorization_callbacks = []
 
+                view_func = self._apply_profiling(view_func)
+
+                trusted_engine_output = getattr(endpoint_settings.get(operation_method), 'trusted_engine_output', None)
+
+                if trusted_engine_output is None:
+                    trusted_engine_output = self.trusted_engine_output
+
+                if trusted_engine_output is True and operation.methods[0] == 'GET' and response_schema is not None:
+                    view_func = self._apply_trusted_output(view_func, response_schema)
+
                 (getattr(st_router, f'st_{operation.methods[0].lower()}')(
                     path,
                     response_schema=response_schema,
@@ -215,6 +323,8 @@ class SensorThingsEndpoint(BaseModel):
         The schema for the request body. Default is None.
     response_schema : Union[List[Type], Type, None], optional
         The schema for the response. Default is None.
+    trusted_engine_output : Optional[bool], optional
+        Whether responses of the endpoint are serialized without validation. Defaults to the setting of the API.
     """
 
     name: str
@@ -223,3 +333,4 @@ class SensorThingsEndpoint(BaseModel):
     authorization: Optional[Union[Sequence[Callable], Callable]] = None
     body_schema: Optional[Type] = None
     response_schema: Union[List[Type], Type, None] = None
+    trusted_engine_output: Optional[bool] = None
@@ -6,6 +6,9 @@ from django.http import HttpRequest
 from django.urls import resolve
 from django.urls.exceptions import Http404
 from sensorthings.components import field_schemas
+from sensorthings.types.url_string import is_valid_http_url
+from sensorthings.profiling import RequestProfile, get_profiling_sinks, profile_span
+from sensorthings.compression import compress_response
 from sensorthings import settings
 
 
@@ -48,19 +51,26 @@ class SensorThingsMiddleware(MiddlewareMixin):
         )) or request.resolver_match.url_name in ['openapi-view', 'openapi-json']:
             return None
 
+        # Profile the request if the Server-Timing header or a profiling sink is enabled.
+        profiling_sinks = get_profiling_sinks() if settings.ST_PROFILING_SINKS else []
+        request.profile = RequestProfile() if settings.ST_SERVER_TIMING or profiling_sinks else None
+
         # Attach the SensorThings engine to the request.
         sensorthings_api = getattr(view_func, '__api__', None) or view_func.__self__.api
         request.engine = sensorthings_api.engine(
             request=request,
             get_response_schemas=sensorthings_api.get_response_schemas,
         )
+
         request.nested_path = []
         request.ref_response = False
         request.value_response = False
+        request.trusted_engine_output = False
 
         # Attempt to resolve advanced SensorThings paths (e.g. nested resource paths, addresses to values, etc.)
         if request.resolver_match.url_name == 'advanced_path_handler':
-            view_func = self.handle_advanced_path(request=request)
+            with profile_span(request, 'resolve'):
+                view_func = self.handle_advanced_path(request=request)
 
         # Attach the base SensorThings URL and sub-path to the request object
         base_url = (
@@ -73,8 +83,32 @@ class SensorThingsMiddleware(MiddlewareMixin):
             request.path_info.split('/')[len(request.resolver_match.route.split('/')):]
         )
 
+        # Build the entity link prefix of each component once, so entity links only need the entity ID appended.
+        request.entity_link_prefixes = {
+            component: f"{request.sensorthings_url}/{component.model_config['json_schema_extra']['name_ref'][0]}("
+                       f"{id_qualifier}"
+            for component in (getattr(field_schemas, component_name) for component_name in field_schemas.__all__)
+        } if is_valid_http_url(request.sensorthings_url) else {}
+
         # Call the updated view function.
-        return view_func(request, *view_args, **request.resolver_match.kwargs)
+        with profile_span(request, 'view'):
+            response = view_func(request, *view_args, **request.resolver_match.kwargs)
+
+        # Expose the estimated and actual cost of read queries for tuning the query cost limits.
+        if request.method == 'GET' and getattr(request.engine, 'estimated_query_cost', None) is not None:
+            response['SensorThings-Query-Cost'] = (
+                f'estimated={request.engine.estimated_query_cost}, actual={request.engine.actual_query_cost}'
+            )
+
+        response = compress_response(request, response)
+
+        if request.profile is not None:
+            if settings.ST_SERVER_TIMING:
+                response['Server-Timing'] = request.profile.get_server_timing()
+            for profiling_sink in profiling_sinks:
+                profiling_sink(request, request.profile)
+
+        return response
 
     def handle_advanced_path(self, request: HttpRequest):
         """
@@ -0,0 +1,35 @@
+from ninja.parser import Parser
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+class SensorThingsParser(Parser):
+    """
+    A request body parser for the SensorThings API.
+
+    Bodies are parsed as MessagePack or CBOR if their Content-Type is application/msgpack or application/cbor, so that
+    ingest clients can upload binary data arrays to CreateObservations, and as JSON otherwise.
+    """
+
+    def parse_body(self, request):
+        content_type = request.content_type.lower()
+
+        if content_type in ('application/msgpack', 'application/x-msgpack'):
+            if msgpack is None:
+                raise ValueError('MessagePack request bodies require the msgpack package.')
+            return msgpack.unpackb(request.body)
+
+        if content_type == 'application/cbor':
+            if cbor2 is None:
+                raise ValueError('CBOR request bodies require the cbor2 package.')
+            return cbor2.loads(request.body)
+
+        return super().parse_body(request)
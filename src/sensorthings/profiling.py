@@ -0,0 +1,149 @@
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+from sensorthings import settings
+
+
+class RequestProfile:
+    """
+    Timings and counters recorded while handling a SensorThings request.
+
+    Attributes
+    ----------
+    timings : Dict[str, float]
+        The total duration of each stage of the request in seconds. Nested spans of a stage that is already being
+        timed (e.g. fetching the entities of an expanded component) are included in the outermost span only.
+    counters : Dict[str, int]
+        Counters recorded during the request (e.g. backend calls and rows fetched).
+    spans : List[Tuple[str, float, float]]
+        The name, start time and duration of every recorded span, with start times from time.perf_counter().
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.spans: List[Tuple[str, float, float]] = []
+        self.active_spans = set()
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Time a stage of the request.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        """
+
+        if name in self.active_spans:
+            yield
+            return
+
+        self.active_spans.add(name)
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            duration = perf_counter() - start
+            self.active_spans.discard(name)
+            self.timings[name] = self.timings.get(name, 0.0) + duration
+            self.spans.append((name, start, duration))
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        Increment a counter of the request.
+
+        Parameters
+        ----------
+        name : str
+            The name of the counter.
+        value : int, optional
+            The value to add to the counter. Default is 1.
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def get_server_timing(self) -> str:
+        """
+        Format the timings of the request as a Server-Timing header value.
+
+        The time spent in response validation and request parsing by Django Ninja is reported as 'validation', the
+        time of the view that is not spent in the handler or renderer.
+
+        Returns
+        -------
+        str
+            The Server-Timing header value, with durations in milliseconds.
+        """
+
+        timings = dict(self.timings)
+
+        if 'view' in timings and 'handler' in timings:
+            timings['validation'] = max(timings['view'] - timings['handler'] - timings.get('render', 0.0), 0.0)
+
+        return ', '.join(f'{name};dur={duration * 1000:.3f}' for name, duration in timings.items())
+
+
+def get_profiling_sinks() -> List[Callable[[HttpRequest, RequestProfile], None]]:
+    """
+    Get the profiling sinks configured with the ST_PROFILING_SINKS setting.
+
+    Sinks are callables, or dotted paths to callables, that are called with the request and its profile after each
+    profiled request, e.g. to send the timings to statsd or to record them as OpenTelemetry spans.
+
+    Returns
+    -------
+    List[Callable[[HttpRequest, RequestProfile], None]]
+        The profiling sinks.
+    """
+
+    return [
+        import_string(sink) if isinstance(sink, str) else sink
+        for sink in settings.ST_PROFILING_SINKS
+    ]
+
+
+def profile_span(request: HttpRequest, name: str):
+    """
+    Time a stage of a request if the request is being profiled.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The current HTTP request.
+    name : str
+        The name of the stage.
+
+    Returns
+    -------
+    ContextManager
+        A context manager timing the stage, or doing nothing if the request is not profiled.
+    """
+
+    profile = getattr(request, 'profile', None)
+
+    return profile.span(name) if profile is not None else nullcontext()
+
+
+def profile_count(request: HttpRequest, name: str, value: int = 1) -> None:
+    """
+    Increment a counter of a request if the request is being profiled.
+
+    Parameters
+    ----------
+    request : HttpRequest
+        The current HTTP request.
+    name : str
+        The name of the counter.
+    value : int, optional
+        The value to add to the counter. Default is 1.
+    """
+
+    profile = getattr(request, 'profile', None)
+
+    if profile is not None:
+        profile.increment(name, value)
@@ -0,0 +1,530 @@
+from dataclasses import dataclass, fields, is_dataclass, replace
+from functools import cached_property, lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+import re
+from pydantic import ValidationError
+from ninja.errors import HttpError
+from odata_query.grammar import ODataParser, ODataLexer
+from odata_query.exceptions import ODataException
+from sensorthings.schemas import ListQueryParams
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Immutable, hashable representation of the query options of a request or of an expanded component.
+
+    A query plan keeps the query options as they were requested, so that it can be compared, hashed and serialized
+    back to a query string, and parses each option once on first access. Plans built from the same query parameters
+    are shared, so the options of a repeated query are only parsed once per process.
+
+    Attributes
+    ----------
+    filters : Optional[str]
+        The filter option.
+    select : Optional[str]
+        The select option.
+    expand : Optional[str]
+        The expand option.
+    order_by : Optional[str]
+        The order by option.
+    skip : Optional[int]
+        The number of entities to skip.
+    top : Optional[int]
+        The maximum number of entities to return.
+    count : Optional[bool]
+        Whether the total number of entities is requested.
+    options : Tuple[Tuple[str, Hashable], ...]
+        Any other query parameters of the request, sorted by name.
+    """
+
+    filters: Optional[str] = None
+    select: Optional[str] = None
+    expand: Optional[str] = None
+    order_by: Optional[str] = None
+    skip: Optional[int] = 0
+    top: Optional[int] = None
+    count: Optional[bool] = None
+    options: Tuple[Tuple[str, Hashable], ...] = ()
+
+    @classmethod
+    def from_query_params(cls, query_params: Optional[dict] = None) -> 'QueryPlan':
+        """
+        Build a query plan from a dictionary of query parameters.
+
+        Parameters
+        ----------
+        query_params : dict, optional
+            The query parameters keyed by field name (e.g. the output of ListQueryParams.dict()).
+
+        Returns
+        -------
+        QueryPlan
+            The query plan.
+        """
+
+        query_params = query_params or {}
+        plan_fields = {field.name for field in fields(cls)}
+
+        key = (
+            tuple((name, query_params.get(name)) for name in query_plan_fields if name in query_params),
+            tuple(sorted(
+                (name, value) for name, value in query_params.items() if name not in plan_fields
+            ))
+        )
+
+        try:
+            return build_query_plan(key)
+        except TypeError:
+            return cls(**dict(key[0]), options=key[1])
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Get a query option by field name, like reading a query parameter dictionary.
+
+        Parameters
+        ----------
+        name : str
+            The field name of the query option.
+        default : Any, optional
+            The value returned if the option is not set. Default is None.
+
+        Returns
+        -------
+        Any
+            The value of the query option.
+        """
+
+        if name in query_plan_fields:
+            value = getattr(self, name)
+        else:
+            value = dict(self.options).get(name)
+
+        return default if value is None else value
+
+    def replace(self, **changes) -> 'QueryPlan':
+        """
+        Return a copy of the query plan with the given query options replaced.
+
+        Parameters
+        ----------
+        **changes
+            The query options to replace, keyed by field name.
+
+        Returns
+        -------
+        QueryPlan
+            The new query plan.
+        """
+
+        return replace(self, **changes)
+
+    @cached_property
+    def filter_ast(self) -> Any:
+        """
+        The parsed filter AST, or None if no filter is requested.
+        """
+
+        if not self.filters:
+            return None
+
+        try:
+            return ODataParser().parse(ODataLexer().tokenize(self.filters))
+        except ODataException:
+            raise HttpError(422, 'Failed to parse filter parameter.')
+
+    @cached_property
+    def filter_node_count(self) -> int:
+        """
+        The number of nodes of the parsed filter AST, used to estimate the complexity of the filter.
+        """
+
+        return count_filter_nodes(self.filter_ast)
+
+    @property
+    def pagination(self) -> dict:
+        """
+        The pagination options passed to the engine.
+        """
+
+        return {
+            'skip': self.skip or 0,
+            'top': self.top or 100,
+            'count': self.count or False
+        }
+
+    @cached_property
+    def order_by_fields(self) -> Tuple[Tuple[str, str], ...]:
+        """
+        The fields and directions the entities are ordered by.
+        """
+
+        if not self.order_by:
+            return ()
+
+        return tuple(
+            (
+                order_field.strip().split(' ')[0],
+                'desc' if order_field.strip().endswith('desc') else 'asc'
+            ) for order_field in self.order_by.split(',')
+        )
+
+    @property
+    def ordering(self) -> List[dict]:
+        """
+        The ordering options passed to the engine.
+        """
+
+        return [{'field': field, 'direction': direction} for field, direction in self.order_by_fields]
+
+    @cached_property
+    def select_fields(self) -> Optional[Tuple[str, ...]]:
+        """
+        The selected field aliases, or None if all fields are selected.
+        """
+
+        if not self.select:
+            return None
+
+        return tuple(self.select.split(','))
+
+    @cached_property
+    def expand_tree(self) -> Dict[str, 'QueryPlan']:
+        """
+        The query plans of the expanded components, keyed by the snake case name of the relationship.
+        """
+
+        return parse_expand_tree(self.expand or '')
+
+    @cached_property
+    def expand_depth(self) -> int:
+        """
+        The number of levels of nested expanded components.
+        """
+
+        return max((expand_query_plan.expand_depth + 1 for expand_query_plan in self.expand_tree.values()), default=0)
+
+    def get_query_string(self, **changes) -> str:
+        """
+        Generate the query string of the query plan.
+
+        Parameters
+        ----------
+        **changes
+            Query options to replace in the query string, keyed by field name.
+
+        Returns
+        -------
+        str
+            The generated query string.
+        """
+
+        return ListQueryParams(**{
+            **{name: getattr(self, name) for name in query_plan_fields},
+            **changes
+        }).get_query_string()
+
+
+query_plan_fields = ('filters', 'select', 'expand', 'order_by', 'skip', 'top', 'count')
+
+
+@lru_cache(maxsize=1024)
+def build_query_plan(key: Tuple[tuple, tuple]) -> QueryPlan:
+    """
+    Build a query plan from hashable query parameters, sharing plans between identical queries.
+
+    Parameters
+    ----------
+    key : Tuple[tuple, tuple]
+        The query options and other query parameters as tuples of name and value pairs.
+
+    Returns
+    -------
+    QueryPlan
+        The query plan.
+    """
+
+    return QueryPlan(**dict(key[0]), options=key[1])
+
+
+def get_query_plan(query_params: Union[QueryPlan, dict, None]) -> QueryPlan:
+    """
+    Get the query plan of query parameters given as a query plan or as a dictionary.
+
+    Parameters
+    ----------
+    query_params : Union[QueryPlan, dict, None]
+        The query parameters.
+
+    Returns
+    -------
+    QueryPlan
+        The query plan.
+    """
+
+    if isinstance(query_params, QueryPlan):
+        return query_params
+
+    return QueryPlan.from_query_params(query_params)
+
+
+def count_filter_nodes(node: Any) -> int:
+    """
+    Count the nodes of a parsed filter AST.
+
+    Parameters
+    ----------
+    node : Any
+        The filter AST node, or a list of nodes (e.g. the arguments of a function call).
+
+    Returns
+    -------
+    int
+        The number of AST nodes.
+    """
+
+    if isinstance(node, (list, tuple)):
+        return sum(count_filter_nodes(child) for child in node)
+
+    if not is_dataclass(node):
+        return 0
+
+    return 1 + sum(count_filter_nodes(getattr(node, field.name)) for field in fields(node))
+
+
+class ExpandNode:
+    """
+    An expanded component of a parsed $expand query option.
+
+    Attributes
+    ----------
+    options : dict
+        The query options of the expanded component keyed by alias, excluding $expand.
+    expand_parts : List[str]
+        The $expand items of the expanded component, as written in the query.
+    children : Dict[str, ExpandNode]
+        The expanded components of the expanded component, keyed by the snake case name of the relationship.
+    """
+
+    __slots__ = ('options', 'expand_parts', 'children')
+
+    def __init__(self):
+        self.options = None
+        self.expand_parts = []
+        self.children = {}
+
+    def get_query_plan(self) -> QueryPlan:
+        """
+        Build the query plan of the expanded component and of its own expanded components.
+
+        Returns
+        -------
+        QueryPlan
+            The query plan, with its expand tree already populated.
+        """
+
+        options = dict(self.options or {})
+
+        if self.expand_parts:
+            options['$expand'] = ','.join(self.expand_parts)
+
+        try:
+            query_plan = QueryPlan.from_query_params(ListQueryParams(**options).dict())
+        except ValidationError:
+            raise HttpError(422, 'Failed to parse expand parameter.')
+
+        query_plan.__dict__.setdefault('expand_tree', {
+            component_name: child.get_query_plan() for component_name, child in self.children.items()
+        })
+
+        return query_plan
+
+
+class ExpandParser:
+    """
+    Single-pass parser for the $expand query option.
+
+    The parser reads expand items separated by commas. Each item is a path of navigation properties separated by
+    slashes, and each navigation property can be followed by query options in parentheses, separated by semicolons or
+    ampersands. Nested $expand options are parsed recursively in the same pass, and other option values are read up
+    to the next separator outside of quotes and parentheses, so filters can contain both.
+
+    Parameters
+    ----------
+    text : str
+        The $expand query option.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.position = 0
+
+    def parse(self) -> Dict[str, ExpandNode]:
+        """
+        Parse the $expand query option.
+
+        Returns
+        -------
+        Dict[str, ExpandNode]
+            The expanded components keyed by the snake case name of the relationship.
+        """
+
+        nodes = {}
+        self.parse_items(nodes)
+
+        if self.position < len(self.text):
+            self.fail()
+
+        return nodes
+
+    def parse_items(self, nodes: Dict[str, ExpandNode]) -> None:
+        """
+        Parse comma separated expand items into the given nodes, up to the end of the text or of an option value.
+        """
+
+        while self.position < len(self.text):
+            if self.text[self.position] == ',':
+                self.position += 1
+                continue
+            if self.text[self.position] in ');&':
+                return
+            self.parse_item(nodes)
+
+    def parse_item(self, nodes: Dict[str, ExpandNode]) -> None:
+        """
+        Parse a single expand item, its query options and the rest of its path.
+        """
+
+        name_start = self.position
+        while self.position < len(self.text) and self.text[self.position] not in '(/,);&':
+            self.position += 1
+        name = self.text[name_start:self.position].strip()
+
+        if not name:
+            self.fail()
+
+        node = nodes.setdefault(get_relationship_name(name), ExpandNode())
+        options = {}
+
+        if self.position < len(self.text) and self.text[self.position] == '(':
+            self.position += 1
+            self.parse_options(node, options)
+
+        if node.options is None:
+            node.options = options
+
+        if self.position < len(self.text) and self.text[self.position] == '/':
+            self.position += 1
+            path_start = self.position
+            self.parse_item(node.children)
+            node.expand_parts.append(self.text[path_start:self.position])
+
+    def parse_options(self, node: ExpandNode, options: dict) -> None:
+        """
+        Parse the query options of an expand item, up to and including the closing parenthesis.
+        """
+
+        while True:
+            name_start = self.position
+            while self.position < len(self.text) and self.text[self.position] not in '=;&()':
+                self.position += 1
+
+            if self.position >= len(self.text):
+                self.fail()
+
+            if self.text[self.position] == ')' and self.position == name_start:
+                self.position += 1
+                return
+
+            if self.text[self.position] != '=':
+                self.fail()
+
+            name = self.text[name_start:self.position].strip()
+            self.position += 1
+            value_start = self.position
+
+            if name == '$expand':
+                self.parse_items(node.children)
+                node.expand_parts.append(self.text[value_start:self.position])
+            else:
+                self.skip_value()
+                options[name] = self.text[value_start:self.position]
+
+            if self.position >= len(self.text):
+                self.fail()
+
+            separator = self.text[self.position]
+            self.position += 1
+
+            if separator == ')':
+                return
+
+    def skip_value(self) -> None:
+        """
+        Move past an option value, stopping at the next separator outside of quotes and parentheses.
+        """
+
+        depth = 0
+        in_quotes = False
+
+        while self.position < len(self.text):
+            character = self.text[self.position]
+            if in_quotes:
+                if character == "'":
+                    in_quotes = False
+            elif character == "'":
+                in_quotes = True
+            elif character == '(':
+                depth += 1
+            elif character == ')':
+                if depth == 0:
+                    return
+                depth -= 1
+            elif character in ';&' and depth == 0:
+                return
+            self.position += 1
+
+    def fail(self):
+        raise HttpError(422, 'Failed to parse expand parameter.')
+
+
+@lru_cache(maxsize=None)
+def get_relationship_name(navigation_property: str) -> str:
+    """
+    Convert the name of a navigation property to the snake case name of the relationship (e.g. 'ObservedProperty' to
+    'observed_property').
+
+    Parameters
+    ----------
+    navigation_property : str
+        The name of the navigation property.
+
+    Returns
+    -------
+    str
+        The name of the relationship.
+    """
+
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', navigation_property).lower()
+
+
+@lru_cache(maxsize=1024)
+def parse_expand_tree(expand: str) -> Dict[str, QueryPlan]:
+    """
+    Parse an $expand query option into the query plans of the expanded components.
+
+    Parameters
+    ----------
+    expand : str
+        The $expand query option.
+
+    Returns
+    -------
+    Dict[str, QueryPlan]
+        The query plans of the expanded components, keyed by the snake case name of the relationship. The returned
+        dictionary is shared between identical queries and must not be modified.
+    """
+
+    return {
+        component_name: node.get_query_plan() for component_name, node in ExpandParser(expand).parse().items()
+    }
@@ -1,4 +1,91 @@
-from ninja.renderers import JSONRenderer
+from datetime import timezone
+from typing import Dict, Optional
+from ninja.renderers import BaseRenderer, JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+from sensorthings.profiling import profile_span
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders response data as MessagePack.
+
+    Values without a MessagePack type (e.g. datetimes and UUIDs) are converted as they are by the JSON renderer.
+    """
+
+    media_type = 'application/msgpack'
+
+    def render(self, request, data, *, response_status):
+        return msgpack.packb(data, default=NinjaJSONEncoder().default)
+
+
+class CBORRenderer(BaseRenderer):
+    """
+    Renders response data as CBOR.
+
+    Datetimes are encoded as CBOR date/time strings, assuming UTC if they have no time zone, and other values without
+    a CBOR type are converted as they are by the JSON renderer.
+    """
+
+    media_type = 'application/cbor'
+
+    def render(self, request, data, *, response_status):
+        json_encoder = NinjaJSONEncoder()
+        return cbor2.dumps(
+            data, default=lambda encoder, value: encoder.encode(json_encoder.default(value)), timezone=timezone.utc
+        )
+
+
+binary_renderers: Dict[str, BaseRenderer] = {
+    **({'application/msgpack': MessagePackRenderer()} if msgpack is not None else {}),
+    **({'application/x-msgpack': MessagePackRenderer()} if msgpack is not None else {}),
+    **({'application/cbor': CBORRenderer()} if cbor2 is not None else {}),
+}
+
+
+def negotiate_renderer(accept: str) -> Optional[BaseRenderer]:
+    """
+    Choose a binary renderer for a response from the Accept header of its request.
+
+    Parameters
+    ----------
+    accept : str
+        The Accept header of the request (e.g. 'application/msgpack, application/json;q=0.5').
+
+    Returns
+    -------
+    Optional[BaseRenderer]
+        The renderer of the installed binary format the client prefers to JSON, or None to render JSON.
+    """
+
+    chosen_renderer, chosen_quality = None, 0.0
+
+    for media_range in accept.split(','):
+        media_type, _, parameters = media_range.partition(';')
+        media_type = media_type.strip().lower()
+        quality = 1.0
+        for parameter in parameters.split(';'):
+            key, _, value = parameter.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in ('application/json', 'application/*', '*/*') and quality > chosen_quality:
+            chosen_renderer, chosen_quality = None, quality
+        elif media_type in binary_renderers and quality > chosen_quality:
+            chosen_renderer, chosen_quality = binary_renderers[media_type], quality
+
+    return chosen_renderer
 
 
 class SensorThingsRenderer(JSONRenderer):
@@ -7,6 +94,11 @@ class SensorThingsRenderer(JSONRenderer):
 
     This renderer checks if the request object has a pre-defined 'response_string' attribute.
     If so, it uses this string as the response. Otherwise, it defaults to the standard JSON rendering.
+
+    Responses are rendered as MessagePack or CBOR instead if the client prefers them in its Accept header and msgpack
+    or cbor2 is installed, in which case the media type of the rendered response is set as the request's
+    'response_media_type' attribute. The request's 'response_negotiated' attribute is set if the format of the
+    response depends on the Accept header.
     """
 
     def render(self, request, data, *, response_status):
@@ -24,12 +116,19 @@ class SensorThingsRenderer(JSONRenderer):
 
         Returns
         -------
-        str
-            The rendered response string, either from 'response_string' attribute or standard JSON rendering.
+        Union[str, bytes]
+            The rendered response string, either from 'response_string' attribute or standard JSON rendering, or
+            the rendered binary response.
         """
 
-        return getattr(
-            request,
-            'response_string',
-            JSONRenderer.render(self, request, data, response_status=response_status)
-        )
+        if hasattr(request, 'response_string'):
+            return request.response_string
+
+        binary_renderer = negotiate_renderer(request.META.get('HTTP_ACCEPT', '')) if binary_renderers else None
+        request.response_negotiated = bool(binary_renderers)
+
+        with profile_span(request, 'render'):
+            if binary_renderer is not None:
+                request.response_media_type = binary_renderer.media_type
+                return binary_renderer.render(request, data, response_status=response_status)
+            return JSONRenderer.render(self, request, data, response_status=response_status)
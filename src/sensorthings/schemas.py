@@ -1,4 +1,6 @@
 import urllib.parse
+from functools import lru_cache
+from collections.abc import Mapping
 from pydantic import Field, Extra, field_validator, model_validator
 from typing import Union, Optional, Any
 from ninja import Schema
@@ -67,7 +69,7 @@ class BaseGetResponse(EntityId, Schema, metaclass=PartialSchema):
     @classmethod
     def check_response_is_dict(cls, data: Any) -> Any:
         """
-        Check that the response is a dictionary.
+        Check that the response is a dictionary or another mapping of entity fields.
 
         Parameters
         ----------
@@ -80,7 +82,7 @@ class BaseGetResponse(EntityId, Schema, metaclass=PartialSchema):
             The validated data.
         """
 
-        assert isinstance(data._obj, dict)  # noqa
+        assert isinstance(data._obj, Mapping)  # noqa
         return data
 
     class Config:
@@ -130,6 +132,8 @@ class BaseComponent(Schema):
     -------
     get_related_components():
         Returns related components based on the 'relationship' field.
+    get_navigation_link_suffixes():
+        Returns the navigation link field and path suffix of each related component.
     """
 
     @classmethod
@@ -148,6 +152,25 @@ class BaseComponent(Schema):
             if field.json_schema_extra and field.json_schema_extra.get('relationship') is not None
         }
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_navigation_link_suffixes(cls):
+        """
+        Get the navigation link field and path suffix of each related component.
+
+        The table is computed once per component, and a navigation link is built by appending the suffix to the
+        self-link of an entity.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping related component names to their navigation link field names and path suffixes.
+        """
+
+        return {
+            name: (f'{name}_link', f'/{field.alias}') for name, field in cls.get_related_components().items()
+        }
+
 
 class BaseListResponse(Schema):
     """
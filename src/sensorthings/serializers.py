@@ -0,0 +1,137 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel
+
+
+@lru_cache(maxsize=None)
+def get_field_aliases(schema: Type[BaseModel]) -> Tuple[tuple, ...]:
+    """
+    Get the serialization plan of a response schema.
+
+    The plan is computed once per schema and lists, in schema field order, the name and alias of every field, whether
+    the field holds a list, and the nested schemas its values can be serialized with.
+
+    Parameters
+    ----------
+    schema : Type[BaseModel]
+        The response schema.
+
+    Returns
+    -------
+    Tuple[tuple, ...]
+        One (field name, alias, is list, nested schemas) tuple per field of the schema.
+    """
+
+    field_aliases = []
+
+    for field_name, field in schema.model_fields.items():
+        is_list, nested_schemas = get_nested_schemas(field.annotation)
+        field_aliases.append((field_name, field.alias or field_name, is_list, nested_schemas))
+
+    return tuple(field_aliases)
+
+
+def get_nested_schemas(annotation: Any) -> Tuple[bool, Tuple[Type[BaseModel], ...]]:
+    """
+    Get the schemas that values of a field annotation can be serialized with.
+
+    Parameters
+    ----------
+    annotation : Any
+        The field annotation.
+
+    Returns
+    -------
+    Tuple[bool, Tuple[Type[BaseModel], ...]]
+        Whether the field holds a list, and the candidate schemas of its values or list items.
+    """
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return False, (annotation,)
+
+    origin = get_origin(annotation)
+
+    if origin in (list, tuple):
+        item_annotation = next(iter(get_args(annotation)), None)
+        return True, get_nested_schemas(item_annotation)[1]
+
+    if origin is Union:
+        member_schemas = [get_nested_schemas(member) for member in get_args(annotation)]
+        is_list = any(is_member_list for is_member_list, schemas in member_schemas if schemas)
+        return is_list, tuple(schema for _, schemas in member_schemas for schema in schemas)
+
+    return False, ()
+
+
+def select_schema(schemas: Tuple[Type[BaseModel], ...], data: Mapping) -> Type[BaseModel]:
+    """
+    Select the candidate schema whose fields best match the keys of the data.
+
+    Parameters
+    ----------
+    schemas : Tuple[Type[BaseModel], ...]
+        The candidate schemas.
+    data : Mapping
+        The data to serialize.
+
+    Returns
+    -------
+    Type[BaseModel]
+        The selected schema.
+    """
+
+    if len(schemas) == 1:
+        return schemas[0]
+
+    return max(schemas, key=lambda schema: sum(1 for key in data if key in schema.model_fields))
+
+
+def serialize_engine_output(schema: Type[BaseModel], data: Any) -> Any:
+    """
+    Serialize trusted engine output using the field aliases of a response schema without validating it.
+
+    Fields are written by alias in schema field order, and keys that are not fields of the schema are dropped, which
+    matches the output of validating the data and dumping it by alias with unset fields excluded. Values are not
+    validated or normalized, so engines using this mode must return values in their serialized form (e.g. ISO times
+    in UTC 'Z' notation).
+
+    Parameters
+    ----------
+    schema : Type[BaseModel]
+        The response schema, or a Union of response schemas.
+    data : Any
+        The engine output to serialize.
+
+    Returns
+    -------
+    Any
+        The serialized response.
+    """
+
+    if not isinstance(data, Mapping):
+        return data
+
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        schemas = get_nested_schemas(schema)[1]
+        if not schemas:
+            return data
+        schema = select_schema(schemas, data)
+
+    serialized_data = {}
+
+    for field_name, alias, is_list, nested_schemas in get_field_aliases(schema):
+        if field_name in data:
+            value = data[field_name]
+        elif alias in data:
+            value = data[alias]
+        else:
+            continue
+        if nested_schemas and is_list and isinstance(value, list) and value and isinstance(value[0], Mapping):
+            nested_schema = select_schema(nested_schemas, value[0])
+            value = [serialize_engine_output(nested_schema, item) for item in value]
+        elif nested_schemas and isinstance(value, Mapping):
+            value = serialize_engine_output(select_schema(nested_schemas, value), value)
+        serialized_data[alias] = value
+
+    return serialized_data
@@ -63,3 +63,28 @@ ST_CAPABILITIES = getattr(settings, 'ST_CAPABILITIES', [
 ])
 
 PROXY_BASE_URL = getattr(settings, 'PROXY_BASE_URL', None)
+
+ST_LATEST_OBSERVATION_CACHE_TTL = getattr(settings, 'ST_LATEST_OBSERVATION_CACHE_TTL', None)
+ST_LATEST_OBSERVATION_CACHE_SIZE = getattr(settings, 'ST_LATEST_OBSERVATION_CACHE_SIZE', 10000)
+
+ST_ENTITY_CACHE_TTL = getattr(settings, 'ST_ENTITY_CACHE_TTL', None)
+ST_ENTITY_CACHE_SIZE = getattr(settings, 'ST_ENTITY_CACHE_SIZE', 10000)
+ST_ENTITY_CACHE_COMPONENTS = getattr(settings, 'ST_ENTITY_CACHE_COMPONENTS', [
+    'Thing', 'Location', 'Sensor', 'ObservedProperty'
+])
+
+ST_ID_BATCH_SIZE = getattr(settings, 'ST_ID_BATCH_SIZE', None)
+ST_ID_BATCH_WORKERS = getattr(settings, 'ST_ID_BATCH_WORKERS', 1)
+
+ST_VALIDATE_TRUSTED_ENGINE_OUTPUT = getattr(settings, 'ST_VALIDATE_TRUSTED_ENGINE_OUTPUT', False)
+
+ST_MAX_QUERY_COST = getattr(settings, 'ST_MAX_QUERY_COST', None)
+ST_MAX_EXPAND_DEPTH = getattr(settings, 'ST_MAX_EXPAND_DEPTH', None)
+ST_MAX_TOP = getattr(settings, 'ST_MAX_TOP', None)
+ST_MAX_FILTER_NODES = getattr(settings, 'ST_MAX_FILTER_NODES', None)
+
+ST_COMPRESSION_ENCODINGS = getattr(settings, 'ST_COMPRESSION_ENCODINGS', [])
+ST_COMPRESSION_MIN_SIZE = getattr(settings, 'ST_COMPRESSION_MIN_SIZE', 1024)
+
+ST_SERVER_TIMING = getattr(settings, 'ST_SERVER_TIMING', False)
+ST_PROFILING_SINKS = getattr(settings, 'ST_PROFILING_SINKS', [])
@@ -1,2 +1,2 @@
 from .iso_string import ISOTimeString, ISOIntervalString
-from .url_string import AnyHttpUrlString
+from .url_string import AnyHttpUrlString, ValidatedUrlString
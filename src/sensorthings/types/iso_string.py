@@ -1,9 +1,48 @@
 import pytz
 from typing import Annotated
+from datetime import datetime
 from dateutil.parser import isoparse
 from pydantic import AfterValidator, WithJsonSchema
 
 
+def is_canonical_iso_time(value: str) -> bool:
+    """
+    Check whether a string is a valid ISO time in the canonical 'YYYY-MM-DDTHH:MM:SSZ' format.
+
+    The layout of the string is checked by position, so validating a canonical time does not require a full
+    ISO 8601 parse.
+
+    Parameters
+    ----------
+    value : str
+        The string to check.
+
+    Returns
+    -------
+    bool
+        Whether the string is a valid canonical ISO time.
+    """
+
+    if len(value) != 20 or value[19] != 'Z' or value[10] != 'T' \
+            or value[4] != '-' or value[7] != '-' or value[13] != ':' or value[16] != ':':
+        return False
+
+    digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+
+    if not digits.isdigit() or not digits.isascii():
+        return False
+
+    try:
+        datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19])
+        )
+    except ValueError:
+        return False
+
+    return True
+
+
 def validate_iso_time(value: str) -> str:
     """
     Validate and format a string as an ISO time.
@@ -28,8 +67,15 @@ def validate_iso_time(value: str) -> str:
 
     if not isinstance(value, str):
         raise TypeError('string required')
+
+    if is_canonical_iso_time(value):
+        return value
+
     try:
-        parsed_value = isoparse(value)
+        try:
+            parsed_value = datetime.fromisoformat(value)
+        except ValueError:
+            parsed_value = isoparse(value)
         if parsed_value.tzinfo is None:
             parsed_value = parsed_value.replace(tzinfo=pytz.UTC)
         else:
@@ -76,10 +122,8 @@ def validate_iso_interval(value: str) -> str:
         validate_iso_time(dt_value) for dt_value in value.split('/')
     ]
 
-    try:
-        if len(split_value) != 2 or isoparse(split_value[0]) >= isoparse(split_value[1]):
-            raise TypeError
-    except TypeError:
+    # Validated times share the canonical format, so their order can be compared without parsing them again.
+    if len(split_value) != 2 or split_value[0] >= split_value[1]:
         raise ValueError('invalid ISO interval format')
 
     return '/'.join(split_value)
@@ -1,10 +1,71 @@
+from functools import lru_cache
 from typing_extensions import Annotated
-from pydantic import AnyHttpUrl, AfterValidator, WithJsonSchema, PlainSerializer
+from pydantic import AnyHttpUrl, TypeAdapter, ValidationError, WrapValidator, WithJsonSchema, PlainSerializer
+
+
+class ValidatedUrlString(str):
+    """
+    Marker type for URL strings that are known to be valid.
+
+    Links built by the SensorThings engine from an already validated base URL are returned as ValidatedUrlString,
+    so response validation can accept them without parsing them again.
+    """
+
+    __slots__ = ()
+
+
+def validate_url(value, handler) -> str:
+    """
+    Validate a string as an HTTP URL, skipping strings marked as already validated.
+
+    Parameters
+    ----------
+    value : Any
+        The value to validate.
+    handler : Callable
+        The AnyHttpUrl validator.
+
+    Returns
+    -------
+    str
+        The validated URL string.
+    """
+
+    if type(value) is ValidatedUrlString:
+        return value
+
+    return str(handler(value))
+
+
+@lru_cache(maxsize=64)
+def is_valid_http_url(value: str) -> bool:
+    """
+    Check whether a string is a valid HTTP URL.
+
+    Results are cached, so checking the base URL of every request costs a single dictionary lookup.
+
+    Parameters
+    ----------
+    value : str
+        The string to check.
+
+    Returns
+    -------
+    bool
+        Whether the string is a valid HTTP URL.
+    """
+
+    try:
+        TypeAdapter(AnyHttpUrl).validate_python(value)
+    except ValidationError:
+        return False
+
+    return True
 
 
 AnyHttpUrlString = Annotated[
     AnyHttpUrl,
-    AfterValidator(lambda v: str(v)),
+    WrapValidator(validate_url),
     PlainSerializer(lambda v: str(v)),
     WithJsonSchema({'type': 'string'}, mode='serialization')
 ]
@@ -12,8 +12,9 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT_DIR))  # Root directory of the project
 sys.path.insert(0, str(ROOT_DIR / 'example'))  # Django project directory
 
-# Set the default Django settings module for the 'example' project
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'example.settings')
+# Always use the test settings, even if the environment points to the settings of the 'example' project, so that
+# tests never write to its on-disk database
+os.environ['DJANGO_SETTINGS_MODULE'] = 'tests.settings'
 
 
 @pytest.fixture(scope='session', autouse=True)
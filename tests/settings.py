@@ -0,0 +1,10 @@
+from example.settings import *  # noqa: F401,F403
+
+
+# Run tests against an in-memory database, so that they never touch the example project's database file.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
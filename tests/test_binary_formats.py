@@ -0,0 +1,78 @@
+import json
+import pytest
+from django.test import Client
+from sensorthings import renderer
+from sensorthings.renderer import CBORRenderer, MessagePackRenderer
+
+
+@pytest.mark.parametrize('accept, expected_media_type', [
+    ('application/msgpack', 'application/msgpack'),
+    ('application/cbor, application/json;q=0.5', 'application/cbor'),
+    ('application/json, application/msgpack', None),
+    ('application/msgpack;q=0.5, */*', None),
+    ('*/*', None),
+    ('', None),
+])
+def test_negotiate_renderer(monkeypatch, accept, expected_media_type):
+    monkeypatch.setattr(renderer, 'binary_renderers', {
+        'application/msgpack': MessagePackRenderer(), 'application/cbor': CBORRenderer()
+    })
+
+    chosen_renderer = renderer.negotiate_renderer(accept)
+
+    assert (chosen_renderer.media_type if chosen_renderer is not None else None) == expected_media_type
+
+
+@pytest.mark.parametrize('binary_renderers, expected_vary', [
+    ({'application/msgpack': MessagePackRenderer()}, True),
+    ({}, False),
+])
+@pytest.mark.django_db()
+def test_sensorthings_negotiated_responses_vary_on_accept(monkeypatch, binary_renderers, expected_vary):
+    monkeypatch.setattr(renderer, 'binary_renderers', binary_renderers)
+    client = Client()
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/memory/v1.1/Things', HTTP_ACCEPT='application/json')
+
+    assert response.status_code == 200
+    assert ('Accept' in [header.strip() for header in response.get('Vary', '').split(',')]) is expected_vary
+
+
+@pytest.mark.parametrize('media_type, module_name', [
+    ('application/msgpack', 'msgpack'),
+    ('application/cbor', 'cbor2'),
+])
+@pytest.mark.django_db()
+def test_sensorthings_binary_responses(media_type, module_name):
+    module = pytest.importorskip(module_name)
+    client = Client()
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations')
+    binary_response = client.get('http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations', HTTP_ACCEPT=media_type)
+
+    assert binary_response['Content-Type'] == media_type
+    assert (module.unpackb if module_name == 'msgpack' else module.loads)(binary_response.content) == json.loads(
+        response.content
+    )
+
+
+@pytest.mark.parametrize('media_type, module_name', [
+    ('application/msgpack', 'msgpack'),
+    ('application/cbor', 'cbor2'),
+])
+@pytest.mark.django_db()
+def test_sensorthings_binary_create_observations(media_type, module_name):
+    module = pytest.importorskip(module_name)
+    client = Client()
+
+    response = client.post(
+        'http://127.0.0.1:8000/sensorthings/data-array/v1.1/CreateObservations',
+        (module.packb if module_name == 'msgpack' else module.dumps)([{
+            'Datastream': {'@iot.id': 1},
+            'components': ['phenomenonTime', 'result'],
+            'dataArray': [['2024-01-01T00:00:00Z', 10.0], ['2024-01-02T00:00:00Z', 15.0]]
+        }]),
+        content_type=media_type
+    )
+
+    assert response.status_code == 201
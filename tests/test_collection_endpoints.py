@@ -1,5 +1,8 @@
 import pytest
 from django.test import Client
+from sensorthings import engine
+from sensorthings.cache import TTLCache
+from sta.engine import TestSensorThingsEngine
 
 
 @pytest.mark.parametrize('endpoint, query_params, expected_response', [
@@ -258,6 +261,16 @@ from django.test import Client
         {'$expand': 'Observations'},
         '{"value": [{"@iot.id": 1, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Datastreams(1)", "name": "DATASTREAM_1", "description": "Datastream 1", "unitOfMeasurement": {"name": "Unit 1", "symbol": "U", "definition": "https://www.example.com/units/1"}, "observationType": "http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_Measurement", "phenomenonTime": "2024-01-01T00:00:00Z/2024-01-02T00:00:00Z", "resultTime": "2024-01-01T00:00:00Z/2024-01-02T00:00:00Z", "properties": {}, "Thing@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(1)/Thing", "Sensor@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(1)/Sensor", "ObservedProperty@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(1)/ObservedProperty", "Observations": [{"@iot.id": 1, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(1)", "phenomenonTime": "2024-01-01T00:00:00Z", "result": 10.0, "resultTime": "2024-01-01T00:00:00Z"}, {"@iot.id": 2, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(2)", "phenomenonTime": "2024-01-02T00:00:00Z", "result": 15.0, "resultTime": "2024-01-02T00:00:00Z"}]}, {"@iot.id": 2, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Datastreams(2)", "name": "DATASTREAM_2", "description": "Datastream 2", "unitOfMeasurement": {"name": "Unit 2", "symbol": "U", "definition": "https://www.example.com/units/2"}, "observationType": "http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_Measurement", "phenomenonTime": "2024-01-01T00:00:00Z/2024-01-02T00:00:00Z", "resultTime": "2024-01-01T00:00:00Z/2024-01-02T00:00:00Z", "properties": {"code": "DATASTREAM"}, "Thing@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(2)/Thing", "Sensor@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(2)/Sensor", "ObservedProperty@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(2)/ObservedProperty", "Observations": [{"@iot.id": 3, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(3)", "phenomenonTime": "2024-01-01T00:00:00Z", "result": 20.0, "resultTime": "2024-01-01T00:00:00Z"}, {"@iot.id": 4, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(4)", "phenomenonTime": "2024-01-02T00:00:00Z", "result": 25.0, "resultTime": "2024-01-02T00:00:00Z"}]}]}'
     ),
+    (  # Test Datastreams endpoint with the latest Observation of each Datastream expanded.
+        'Datastreams',
+        {'$select': 'id,Observations', '$expand': 'Observations($top=1;$orderby=phenomenonTime desc)'},
+        '{"value": [{"@iot.id": 1, "Observations": [{"@iot.id": 2, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(2)", "phenomenonTime": "2024-01-02T00:00:00Z", "result": 15.0, "resultTime": "2024-01-02T00:00:00Z"}]}, {"@iot.id": 2, "Observations": [{"@iot.id": 4, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(4)", "phenomenonTime": "2024-01-02T00:00:00Z", "result": 25.0, "resultTime": "2024-01-02T00:00:00Z"}]}]}'
+    ),
+    (  # Test Datastreams endpoint with Observations expanded and paginated per Datastream.
+        'Datastreams',
+        {'$select': 'id,Observations', '$expand': 'Observations($top=1)'},
+        '{"value": [{"@iot.id": 1, "Observations": [{"@iot.id": 1, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(1)", "phenomenonTime": "2024-01-01T00:00:00Z", "result": 10.0, "resultTime": "2024-01-01T00:00:00Z"}]}, {"@iot.id": 2, "Observations": [{"@iot.id": 3, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(3)", "phenomenonTime": "2024-01-01T00:00:00Z", "result": 20.0, "resultTime": "2024-01-01T00:00:00Z"}]}]}'
+    ),
     (  # Test Datastreams with $ref.
         'Datastreams/$ref',
         {},
@@ -352,3 +365,113 @@ def test_sensorthings_list_endpoints(endpoint, query_params, expected_response):
 
     assert response.status_code == 200
     assert response.content.decode('utf-8') == expected_response
+
+
+@pytest.mark.parametrize('cache_scope, expected_cache_size', [
+    (lambda self: None, 0),
+    (lambda self: self.request.GET.get('tenant'), 4),
+])
+@pytest.mark.django_db()
+def test_sensorthings_latest_observation_cache(cache_scope, expected_cache_size, monkeypatch):
+    cache = TTLCache(max_size=10, ttl=60)
+    monkeypatch.setattr(engine, 'latest_observation_cache', cache)
+    monkeypatch.setattr(TestSensorThingsEngine, 'get_entity_cache_scope', cache_scope)
+    client = Client()
+
+    responses = [
+        client.get(
+            'http://127.0.0.1:8000/sensorthings/core/v1.1/Datastreams',
+            {'$select': 'id,Observations', '$expand': 'Observations($top=1;$orderby=phenomenonTime desc)',
+             'tenant': tenant}
+        ) for tenant in ('A', 'B', 'A')
+    ]
+
+    assert len(cache) == expected_cache_size
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].content == responses[1].content == responses[2].content
+
+
+@pytest.mark.parametrize('supports_partitioned_pagination', [True, False])
+@pytest.mark.parametrize('endpoint, query_params, expected_response', [
+    (  # Test Things endpoint with Locations expanded and skipped per Thing.
+        'Things',
+        {'$select': 'id,Locations', '$expand': 'Locations($skip=1)'},
+        '{"value": [{"@iot.id": 1, "Locations": []}, {"@iot.id": 2, "Locations": [{"@iot.id": 3, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Locations(3)", "name": "LOCATION_3", "description": "Location 3", "encodingType": "application/geo+json", "location": {"type": "Feature", "geometry": {"type": "Point", "coordinates": [41.742053, -111.809579]}, "properties": {}}, "properties": {}}]}]}'
+    ),
+    (  # Test Datastreams endpoint with the first Observation of each Datastream expanded.
+        'Datastreams',
+        {'$select': 'id,Observations', '$expand': 'Observations($top=1)'},
+        '{"value": [{"@iot.id": 1, "Observations": [{"@iot.id": 1, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(1)", "phenomenonTime": "2024-01-01T00:00:00Z", "result": 10.0, "resultTime": "2024-01-01T00:00:00Z"}]}, {"@iot.id": 2, "Observations": [{"@iot.id": 3, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(3)", "phenomenonTime": "2024-01-01T00:00:00Z", "result": 20.0, "resultTime": "2024-01-01T00:00:00Z"}]}]}'
+    ),
+    (  # Test Datastreams endpoint with Observations expanded and paginated per Datastream.
+        'Datastreams',
+        {'$select': 'id,Observations', '$expand': 'Observations($skip=1;$top=1)'},
+        '{"value": [{"@iot.id": 1, "Observations": [{"@iot.id": 2, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(2)", "phenomenonTime": "2024-01-02T00:00:00Z", "result": 15.0, "resultTime": "2024-01-02T00:00:00Z"}]}, {"@iot.id": 2, "Observations": [{"@iot.id": 4, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Observations(4)", "phenomenonTime": "2024-01-02T00:00:00Z", "result": 25.0, "resultTime": "2024-01-02T00:00:00Z"}]}]}'
+    ),
+])
+@pytest.mark.django_db()
+def test_sensorthings_partitioned_expand(
+        monkeypatch, supports_partitioned_pagination, endpoint, query_params, expected_response
+):
+    monkeypatch.setattr(TestSensorThingsEngine, 'supports_partitioned_pagination', supports_partitioned_pagination)
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/core/v1.1/{endpoint}',
+        query_params
+    )
+
+    assert response.status_code == 200
+    assert response.content.decode('utf-8') == expected_response
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_status_code, expected_response', [
+    (  # Test Datastream Observations aggregated by day.
+        'Datastreams(1)/Observations/$aggregate',
+        {'interval': '1d', 'fn': 'mean,min,max,count'},
+        200,
+        '{"value": [{"Datastream@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(1)", "components": ["phenomenonTime", "mean", "min", "max", "count"], "dataArray": [["2024-01-01T00:00:00Z/2024-01-02T00:00:00Z", 10.0, 10.0, 10.0, 1], ["2024-01-02T00:00:00Z/2024-01-03T00:00:00Z", 15.0, 15.0, 15.0, 1]]}]}'
+    ),
+    (  # Test Datastream Observations aggregated by week.
+        'Datastreams(2)/Observations/$aggregate',
+        {'interval': '1w', 'fn': 'sum,count'},
+        200,
+        '{"value": [{"Datastream@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(2)", "components": ["phenomenonTime", "sum", "count"], "dataArray": [["2023-12-28T00:00:00Z/2024-01-04T00:00:00Z", 45.0, 2]]}]}'
+    ),
+    (  # Test Datastream Observations aggregation with an invalid interval.
+        'Datastreams(1)/Observations/$aggregate',
+        {'interval': '1y'},
+        422,
+        '{"detail": "Failed to parse interval parameter."}'
+    ),
+    (  # Test Datastream Observations aggregation with an interval too long to represent.
+        'Datastreams(1)/Observations/$aggregate',
+        {'interval': '99999999999999d'},
+        422,
+        '{"detail": "Failed to parse interval parameter."}'
+    ),
+    (  # Test Datastream Observations aggregation with an interval longer than 100 years.
+        'Datastreams(1)/Observations/$aggregate',
+        {'interval': '999999999999w'},
+        422,
+        '{"detail": "The interval parameter must not be longer than 100 years."}'
+    ),
+    (  # Test Datastream Observations aggregation with an invalid function.
+        'Datastreams(1)/Observations/$aggregate',
+        {'interval': '1h', 'fn': 'median'},
+        422,
+        '{"detail": "Failed to parse fn parameter."}'
+    ),
+])
+@pytest.mark.django_db()
+def test_sensorthings_aggregate_endpoints(endpoint, query_params, expected_status_code, expected_response):
+    pytest.importorskip('numpy')
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/core/v1.1/{endpoint}',
+        query_params
+    )
+
+    assert response.status_code == expected_status_code
+    assert response.content.decode('utf-8') == expected_response
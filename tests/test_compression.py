@@ -0,0 +1,86 @@
+import gzip
+import pytest
+from django.http import StreamingHttpResponse
+from django.test import Client, RequestFactory
+from sensorthings import compression
+
+
+@pytest.fixture(autouse=True)
+def compression_encodings(monkeypatch):
+    monkeypatch.setattr('sensorthings.settings.ST_COMPRESSION_ENCODINGS', ['zstd', 'br', 'gzip'])
+
+
+@pytest.mark.parametrize('accept_encoding, expected_coding', [
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('*', 'br'),
+    ('br;q=0, *;q=0.1', 'gzip'),
+    ('deflate, identity', None),
+    ('', None),
+])
+def test_negotiate_content_encoding(monkeypatch, accept_encoding, expected_coding):
+    monkeypatch.setattr(compression, 'compressors', {
+        'gzip': compression.gzip_compressor, 'br': compression.gzip_compressor
+    })
+
+    assert compression.negotiate_content_encoding(accept_encoding) == expected_coding
+
+
+@pytest.mark.parametrize('endpoint, accept_encoding, expected_encoding', [
+    ('Observations', 'gzip', 'gzip'),
+    ('Observations', '', None),
+    ('Things(1)/name/$value', 'gzip', None),
+])
+@pytest.mark.django_db()
+def test_sensorthings_compressed_responses(endpoint, accept_encoding, expected_encoding):
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}')
+    compressed_response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}', HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+
+    assert compressed_response.status_code == 200
+    assert compressed_response.get('Content-Encoding') == expected_encoding
+
+    if expected_encoding is not None:
+        assert 'Accept-Encoding' in compressed_response['Vary']
+        assert gzip.decompress(compressed_response.content) == response.content
+    else:
+        assert compressed_response.content == response.content
+
+
+def test_compress_streaming_response():
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+    chunks = [b'{"value": [', *[b'{"result": 1.0}, ' for _ in range(100)], b'{}]}']
+
+    response = compression.compress_response(request, StreamingHttpResponse(iter(chunks)))
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(b''.join(response.streaming_content)) == b''.join(chunks)
+
+
+@pytest.mark.parametrize('etag, expected_etag', [
+    ('"abc"', 'W/"abc"'),
+    ('W/"abc"', 'W/"abc"'),
+])
+def test_compress_response_weakens_etag(etag, expected_etag):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+    response = StreamingHttpResponse(iter([b'{"result": 1.0}']))
+    response['ETag'] = etag
+
+    response = compression.compress_response(request, response)
+
+    assert response['ETag'] == expected_etag
+
+
+@pytest.mark.django_db()
+def test_sensorthings_compression_disabled(monkeypatch):
+    monkeypatch.setattr('sensorthings.settings.ST_COMPRESSION_ENCODINGS', [])
+    client = Client()
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations', HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response.status_code == 200
+    assert not response.has_header('Content-Encoding')
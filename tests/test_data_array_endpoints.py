@@ -1,6 +1,7 @@
 import pytest
 import json
 from django.test import Client
+from sensorthings import settings
 
 
 @pytest.mark.parametrize('endpoint, query_params, expected_response', [
@@ -43,6 +44,205 @@ def test_sensorthings_data_array_get_endpoints(endpoint, query_params, expected_
     assert response.content.decode('utf-8') == expected_response
 
 
+@pytest.mark.parametrize('endpoint, query_params, expected_response', [
+    (  # Test Datastream's Observations downsampled collection endpoint with min-max method and select parameter.
+        'Datastreams(1)/Observations',
+        {'$downsample': 2, '$downsampleMethod': 'minmax', '$select': 'id,result'},
+        '{"value": [{"@iot.id": 1, "result": 10.0}]}'
+    ),
+    (  # Test Datastream's Observations downsampled data array collection endpoint.
+        'Datastreams(1)/Observations',
+        {'$resultFormat': 'dataArray', '$downsample': 100},
+        '{"value": [{"Datastream@iot.navigationLink": "http://testserver/sensorthings/v1.1/Datastreams(1)", "components": ["phenomenonTime", "result"], "dataArray": [["2024-01-01T00:00:00Z", 10.0]]}]}'
+    ),
+])
+@pytest.mark.django_db()
+def test_sensorthings_data_array_downsample_endpoints(endpoint, query_params, expected_response):
+    pytest.importorskip('numpy')
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/data-array/v1.1/{endpoint}',
+        query_params
+    )
+
+    assert response.status_code == 200
+    assert response.content.decode('utf-8') == expected_response
+
+
+@pytest.mark.parametrize('endpoint', ['Observations', 'FeaturesOfInterest(1)/Observations'])
+@pytest.mark.django_db()
+def test_sensorthings_data_array_downsample_unscoped(endpoint):
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/data-array/v1.1/{endpoint}',
+        {'$downsample': 2}
+    )
+
+    assert response.status_code == 400
+    assert json.loads(response.content) == {
+        'detail': '$downsample is only supported for the Observations of a Datastream, e.g. '
+                  'Datastreams(1)/Observations.'
+    }
+
+
+@pytest.mark.django_db()
+def test_sensorthings_data_array_downsample_query_cost(monkeypatch):
+    monkeypatch.setattr(settings, 'ST_MAX_QUERY_COST', 50)
+    client = Client()
+
+    response = client.get(
+        'http://127.0.0.1:8000/sensorthings/data-array/v1.1/Datastreams(1)/Observations',
+        {'$downsample': 100}
+    )
+
+    assert response.status_code == 400
+    assert json.loads(response.content) == {
+        'detail': 'Query estimated cost of 100 exceeds the maximum of 50. Reduce $top or $expand.'
+    }
+
+
+@pytest.mark.parametrize('method, values, threshold, expected_indices', [
+    ('lttb', [0.0, 1.0, 5.0, 1.0, 0.0], 3, [0, 2, 4]),
+    ('lttb', [0.0, 1.0, 5.0, 1.0, 0.0], 2, [0, 4]),
+    ('lttb', [0.0, 1.0, 5.0], 10, [0, 1, 2]),
+    ('minmax', [3.0, 0.0, 4.0, 9.0, 1.0, 2.0], 4, [1, 2, 3, 4]),
+    ('minmax', [3.0, 0.0, 4.0, 9.0, 1.0, 2.0], 2, [1, 3]),
+])
+def test_sensorthings_data_array_downsample_methods(method, values, threshold, expected_indices):
+    np = pytest.importorskip('numpy')
+    from sensorthings.extensions.dataarray.downsampling import downsample_methods
+
+    indices = downsample_methods[method](np.arange(len(values)), np.array(values), threshold)
+
+    assert indices.tolist() == expected_indices
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_columns', [
+    (  # Test Observations columnar collection endpoint.
+        'Observations',
+        {'$resultFormat': 'arrow'},
+        {'Datastream/id': [1, 1, 2, 2], 'phenomenonTime': ['2024-01-01T00:00:00Z', '2024-01-02T00:00:00Z', '2024-01-01T00:00:00Z', '2024-01-02T00:00:00Z'], 'result': [10.0, 15.0, 20.0, 25.0]}
+    ),
+    (  # Test Observations columnar collection endpoint with pagination and select parameter.
+        'Observations',
+        {'$resultFormat': 'parquet', '$skip': 1, '$top': 2, '$select': 'id,result'},
+        {'@iot.id': [2, 3], 'result': [15.0, 20.0]}
+    ),
+    (  # Test Datastream's Observations columnar collection endpoint.
+        'Datastreams(1)/Observations',
+        {'$resultFormat': 'arrow'},
+        {'Datastream/id': [1], 'phenomenonTime': ['2024-01-01T00:00:00Z'], 'result': [10.0]}
+    ),
+])
+@pytest.mark.django_db()
+def test_sensorthings_data_array_columnar_endpoints(monkeypatch, endpoint, query_params, expected_columns):
+    from sensorthings.extensions.dataarray import columnar
+
+    monkeypatch.setattr(columnar, 'result_formats', {
+        result_format: (media_type, lambda column_batches: (
+            json.dumps(columns).encode() for columns in column_batches
+        )) for result_format, (media_type, _) in columnar.result_formats.items()
+    })
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/data-array/v1.1/{endpoint}',
+        query_params
+    )
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == columnar.result_formats[query_params['$resultFormat']][0]
+    assert json.loads(b''.join(response.streaming_content)) == expected_columns
+
+
+@pytest.mark.parametrize('setting, value, expected_status', [
+    ('ST_MAX_QUERY_COST', 1, 400),
+    ('ST_MAX_TOP', 1, 400),
+])
+@pytest.mark.django_db()
+def test_sensorthings_data_array_columnar_limits(monkeypatch, setting, value, expected_status):
+    from sensorthings.extensions.dataarray import columnar
+
+    monkeypatch.setattr(f'sensorthings.settings.{setting}', value)
+    monkeypatch.setattr(columnar, 'result_formats', {
+        result_format: (media_type, lambda column_batches: (b'' for _ in column_batches))
+        for result_format, (media_type, _) in columnar.result_formats.items()
+    })
+    client = Client()
+
+    response = client.get(
+        'http://127.0.0.1:8000/sensorthings/data-array/v1.1/Observations',
+        {'$resultFormat': 'arrow', '$top': 2}
+    )
+
+    assert response.status_code == expected_status
+    assert 'exceeds the maximum' in response.json()['detail']
+
+
+@pytest.mark.django_db()
+def test_sensorthings_data_array_columnar_requires_writer(monkeypatch):
+    from sensorthings.extensions.dataarray import columnar
+
+    monkeypatch.setattr(columnar, 'result_formats', {
+        result_format: (media_type, None) for result_format, (media_type, _) in columnar.result_formats.items()
+    })
+    monkeypatch.setattr(
+        'sensorthings.extensions.dataarray.engine.DataArrayBaseEngine.get_observation_column_batches',
+        lambda self, query_params: pytest.fail('Observations were fetched without a result format writer.')
+    )
+    client = Client()
+
+    response = client.get(
+        'http://127.0.0.1:8000/sensorthings/data-array/v1.1/Observations',
+        {'$resultFormat': 'parquet'}
+    )
+
+    assert response.status_code == 501
+
+
+@pytest.mark.parametrize('result_format', ['arrow', 'parquet'])
+@pytest.mark.django_db()
+def test_sensorthings_data_array_columnar_formats(result_format):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    client = Client()
+
+    response = client.get(
+        'http://127.0.0.1:8000/sensorthings/data-array/v1.1/Observations',
+        {'$resultFormat': result_format}
+    )
+
+    assert response.status_code == 200
+
+    content = b''.join(response.streaming_content)
+
+    if result_format == 'arrow':
+        table = pa.ipc.open_stream(content).read_all()
+    else:
+        assert response['Content-Disposition'] == 'attachment; filename="Observations.parquet"'
+        table = pq.read_table(pa.BufferReader(content))
+
+    assert table.column_names == ['Datastream/id', 'phenomenonTime', 'result']
+    assert table.schema.field('phenomenonTime').type == pa.timestamp('us', tz='UTC')
+    assert table.column('result').to_pylist() == [10.0, 15.0, 20.0, 25.0]
+
+
+def test_sensorthings_data_array_columnar_result_types():
+    pa = pytest.importorskip('pyarrow')
+    from sensorthings.extensions.dataarray.columnar import build_record_batch
+
+    numeric_batch = build_record_batch({'result': [1, 2.5, None]})
+    mixed_batch = build_record_batch({'result': [1.0, 'HIGH', {'value': 2}]})
+
+    assert numeric_batch.schema.field('result').type == pa.float64()
+    assert mixed_batch.schema.field('result').type == pa.string()
+    assert mixed_batch.column(0).to_pylist() == ['1.0', '"HIGH"', '{"value": 2}']
+    assert build_record_batch({'result': [3.0]}, mixed_batch.schema).column(0).to_pylist() == ['3.0']
+
+
 @pytest.mark.parametrize('endpoint, post_body', [
     ('CreateObservations', [  # Test CreateObservations endpoint.
         {
@@ -0,0 +1,72 @@
+import pytest
+from sensorthings.entities import EntityRow, EntityTable
+
+
+@pytest.fixture
+def entity_table():
+    return EntityTable(
+        columns=('id', 'name', 'result'),
+        rows=[(1, 'A', 10.0), (2, 'B', 15.0), (3, 'C', 20.0)]
+    )
+
+
+def test_entity_table_construction(entity_table):
+    assert entity_table.columns == ('id', 'name', 'result')
+    assert len(entity_table) == 3
+    assert list(entity_table) == [1, 2, 3]
+    assert EntityTable(columns=('name', 'key'), rows=[('A', 'a')], id_column='key').columns == ('name', 'key')
+
+
+def test_entity_table_from_entities_uses_union_of_fields():
+    entity_table = EntityTable.from_entities({
+        1: {'id': 1, 'name': 'A'},
+        2: {'id': 2, 'name': 'B', 'properties': {'code': 'B'}},
+    })
+
+    assert entity_table.columns == ('id', 'name', 'properties')
+    assert dict(entity_table[1]) == {'id': 1, 'name': 'A', 'properties': None}
+    assert dict(entity_table[2]) == {'id': 2, 'name': 'B', 'properties': {'code': 'B'}}
+    assert EntityTable.from_entities({}).columns == ('id',)
+
+
+def test_entity_table_rows(entity_table):
+    row = entity_table[2]
+
+    assert isinstance(row, EntityRow)
+    assert row['name'] == 'B'
+    assert row.result == 15.0
+    assert dict(row) == {'id': 2, 'name': 'B', 'result': 15.0}
+    assert [dict(row) for row in entity_table.values()][0] == {'id': 1, 'name': 'A', 'result': 10.0}
+
+    with pytest.raises(AttributeError):
+        row.missing
+    with pytest.raises(KeyError):
+        entity_table[4]
+
+
+def test_entity_table_column_access(entity_table):
+    assert entity_table.column('name') == ['A', 'B', 'C']
+    assert entity_table.take([3, 1]).column('id') == [3, 1]
+    assert entity_table.without_columns(['result', 'missing']).columns == ('id', 'name')
+
+
+def test_entity_table_with_columns(entity_table):
+    updated_table = entity_table.with_columns({
+        'result': [1.0, 2.0, 3.0],
+        'self_link': ['Things(1)', 'Things(2)', 'Things(3)']
+    })
+
+    assert updated_table.columns == ('id', 'name', 'result', 'self_link')
+    assert updated_table.column('result') == [1.0, 2.0, 3.0]
+    assert dict(updated_table[3]) == {'id': 3, 'name': 'C', 'result': 3.0, 'self_link': 'Things(3)'}
+    assert entity_table.column('result') == [10.0, 15.0, 20.0]
+    assert entity_table.with_column('name', ['X', 'Y', 'Z']).column('name') == ['X', 'Y', 'Z']
+
+
+def test_entity_table_concat(entity_table):
+    other_table = EntityTable(columns=('id', 'name', 'result'), rows=[(3, 'D', 25.0), (4, 'E', 30.0)])
+
+    concatenated_table = EntityTable.concat([entity_table, other_table])
+
+    assert list(concatenated_table) == [1, 2, 3, 4]
+    assert concatenated_table[3].name == 'D'
@@ -1,5 +1,13 @@
+import json
 import pytest
+from django.conf import settings
 from django.test import Client
+from sensorthings import engine, main
+from sensorthings.cache import TTLCache
+from sensorthings.engine import SensorThingsBaseEngine
+from sensorthings.entities import EntityTable
+from sensorthings.serializers import serialize_engine_output
+from sta.urls import ExampleInMemorySensorThingsEngine, sta_memory, sta_trusted
 
 
 @pytest.mark.parametrize('endpoint, query_params, expected_response', [
@@ -46,7 +54,7 @@ from django.test import Client
     (  # Test Things value only
         'Things(1)/name/$value',
         {},
-        '"THING_1"'
+        'THING_1'
     ),
     (  # Test Locations endpoint with no query parameters.
         'Locations(1)',
@@ -86,7 +94,7 @@ from django.test import Client
     (  # Test Locations value only
         'Locations(1)/name/$value',
         {},
-        '"LOCATION_1"'
+        'LOCATION_1'
     ),
     (  # Test HistoricalLocations endpoint with no query parameters.
         'HistoricalLocations(1)',
@@ -126,12 +134,12 @@ from django.test import Client
     (  # Test HistoricalLocations value only
         'HistoricalLocations(1)/time/$value',
         {},
-        '"2024-01-01T00:00:00Z"'
+        '2024-01-01T00:00:00Z'
     ),
     (  # Test HistoricalLocation's Thing endpoint.
         'HistoricalLocations(1)/Thing',
         {},
-        '{"@iot.id": 1, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Things(1)", "name": "THING_1", "description": "Thing 1", "properties": {}, "Locations@iot.navigationLink": "http://testserver/sensorthings/v1.1/Things(1)/Locations", "HistoricalLocations@iot.navigationLink": "http://testserver/sensorthings/v1.1/Things(1)/HistoricalLocations", "Datastreams@iot.navigationLink": "http://testserver/sensorthings/v1.1/Things(1)/Datastreams"}'
+        '{"@iot.id": 2, "@iot.selfLink": "http://testserver/sensorthings/v1.1/Things(2)", "name": "THING_2", "description": "Thing 2", "properties": {"code": "THING"}, "Locations@iot.navigationLink": "http://testserver/sensorthings/v1.1/Things(2)/Locations", "HistoricalLocations@iot.navigationLink": "http://testserver/sensorthings/v1.1/Things(2)/HistoricalLocations", "Datastreams@iot.navigationLink": "http://testserver/sensorthings/v1.1/Things(2)/Datastreams"}'
     ),
     (  # Test Sensors endpoint with no query parameters.
         'Sensors(1)',
@@ -161,7 +169,7 @@ from django.test import Client
     (  # Test Sensors value only
         'Sensors(1)/name/$value',
         {},
-        '"SENSOR_1"'
+        'SENSOR_1'
     ),
     (  # Test ObservedProperties endpoint with no query parameters.
         'ObservedProperties(1)',
@@ -191,7 +199,7 @@ from django.test import Client
     (  # Test ObservedProperties value only
         'ObservedProperties(1)/name/$value',
         {},
-        '"OBSERVED_PROPERTY_1"'
+        'OBSERVED_PROPERTY_1'
     ),
     (  # Test Datastreams endpoint with no query parameters.
         'Datastreams(1)',
@@ -231,7 +239,7 @@ from django.test import Client
     (  # Test Datastreams value only
         'Datastreams(1)/name/$value',
         {},
-        '"DATASTREAM_1"'
+        'DATASTREAM_1'
     ),
     (  # Test Datastream's Thing endpoint.
         'Datastreams(1)/Thing',
@@ -281,7 +289,7 @@ from django.test import Client
     (  # Test Observations value only
         'Observations(1)/result/$value',
         {},
-        '"10"'
+        '10'
     ),
     (  # Test Observation's Datastream endpoint.
         'Observations(1)/Datastream',
@@ -321,7 +329,7 @@ from django.test import Client
     (  # Test FeaturesOfInterest value only
         'FeaturesOfInterest(1)/name/$value',
         {},
-        '"FEATURE_OF_INTEREST_1"'
+        'FEATURE_OF_INTEREST_1'
     ),
 ])
 @pytest.mark.django_db()
@@ -361,3 +369,263 @@ def test_sensorthings_get_endpoints_404(endpoint):
     print(response.content)
 
     assert response.status_code == 404
+
+
+@pytest.mark.parametrize('endpoint', [
+    'Things',
+    'Things(1)',
+    'Things?$expand=Locations,Datastreams/Sensor&$count=true',
+    'Things(1)/Locations/$ref',
+    'Things(1)/name/$value',
+    'Datastreams?$top=1&$select=id,name,Thing&$expand=Thing',
+    'Locations(1)/Things',
+    'Observations?$resultFormat=dataArray',
+])
+@pytest.mark.django_db()
+def test_sensorthings_trusted_engine_output(endpoint, monkeypatch):
+    monkeypatch.setattr(settings, 'DEBUG', False)
+    client = Client()
+
+    validated_response = client.get(f'http://127.0.0.1:8000/sensorthings/data-array/v1.1/{endpoint}')
+    trusted_response = client.get(f'http://127.0.0.1:8000/sensorthings/trusted/v1.1/{endpoint}')
+
+    assert trusted_response.status_code == validated_response.status_code == 200
+    assert trusted_response.content == validated_response.content
+
+
+class TableInMemorySensorThingsEngine(ExampleInMemorySensorThingsEngine):
+    def query_entities(self, *args, **kwargs):
+        entities, count = super().query_entities(*args, **kwargs)
+        return EntityTable.from_entities(entities), count
+
+    def get_entity(self, *args, **kwargs):
+        entity = super().get_entity(*args, **kwargs)
+        return next(iter(EntityTable.from_entities({entity['id']: entity}).values()))
+
+
+@pytest.mark.parametrize('endpoint', [
+    'Things',
+    'Things(1)',
+    'Things(1)?$expand=Locations',
+    'Sensors(1)',
+])
+@pytest.mark.django_db()
+def test_sensorthings_trusted_engine_output_table(endpoint, monkeypatch):
+    monkeypatch.setattr(settings, 'DEBUG', False)
+    monkeypatch.setattr(sta_trusted, 'engine', TableInMemorySensorThingsEngine)
+    serialized_outputs = []
+    monkeypatch.setattr(
+        main, 'serialize_engine_output',
+        lambda schema, data: serialized_outputs.append(data) or serialize_engine_output(schema, data)
+    )
+    client = Client()
+
+    validated_response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}')
+    trusted_response = client.get(f'http://127.0.0.1:8000/sensorthings/trusted/v1.1/{endpoint}')
+
+    assert trusted_response.status_code == validated_response.status_code == 200
+    assert trusted_response.content == validated_response.content
+    assert len(serialized_outputs) == 1
+
+
+@pytest.mark.django_db()
+def test_sensorthings_query_cost_header():
+    client = Client()
+
+    response = client.get(
+        'http://127.0.0.1:8000/sensorthings/core/v1.1/Things',
+        {'$top': 2, '$expand': 'Datastreams($top=3)/Sensor'}
+    )
+
+    assert response.status_code == 200
+    assert response['SensorThings-Query-Cost'] == 'estimated=14, actual=6'
+
+
+@pytest.mark.parametrize('setting, value, query_params', [
+    ('ST_MAX_EXPAND_DEPTH', 1, {'$expand': 'Datastreams/Observations'}),
+    ('ST_MAX_TOP', 10, {'$expand': 'Datastreams($top=20)'}),
+    ('ST_MAX_FILTER_NODES', 4, {'$filter': "name eq 'THING_1' or name eq 'THING_2'"}),
+    ('ST_MAX_QUERY_COST', 1000, {'$top': 100, '$expand': 'Datastreams($top=100)'}),
+])
+@pytest.mark.django_db()
+def test_sensorthings_query_cost_limits(setting, value, query_params, monkeypatch):
+    monkeypatch.setattr(f'sensorthings.settings.{setting}', value)
+    client = Client()
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/core/v1.1/Things', query_params)
+
+    assert response.status_code == 400
+    assert 'exceeds the maximum' in response.json()['detail']
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_status', [
+    ('Things', {}, 200),
+    ('Things(1)', {}, 200),
+    ('Things(1)/name/$value', {}, 200),
+    ('Things', {'$top': 60}, 400),
+])
+@pytest.mark.django_db()
+def test_sensorthings_max_top_checks_explicit_top(endpoint, query_params, expected_status, monkeypatch):
+    monkeypatch.setattr('sensorthings.settings.ST_MAX_TOP', 50)
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/core/v1.1/{endpoint}', query_params)
+
+    assert response.status_code == expected_status
+
+
+@pytest.mark.django_db()
+def test_sensorthings_aggregate_query_cost(monkeypatch):
+    monkeypatch.setattr('sensorthings.settings.ST_MAX_QUERY_COST', 10)
+    client = Client()
+
+    response = client.get(
+        'http://127.0.0.1:8000/sensorthings/core/v1.1/Datastreams(1)/Observations/$aggregate', {'interval': '1s'}
+    )
+
+    assert response.status_code == 400
+    assert 'exceeds the maximum' in response.json()['detail']
+
+
+@pytest.mark.django_db()
+def test_sensorthings_server_timing(monkeypatch):
+    profiles = []
+    monkeypatch.setattr('sensorthings.settings.ST_SERVER_TIMING', True)
+    monkeypatch.setattr('sensorthings.settings.ST_PROFILING_SINKS', [lambda request, profile: profiles.append(profile)])
+    client = Client()
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/core/v1.1/Things(1)/Datastreams', {'$expand': 'Sensor'})
+
+    assert response.status_code == 200
+    assert [timing.split(';')[0] for timing in response['Server-Timing'].split(', ')] == [
+        'resolve', 'backend', 'expand', 'handler', 'render', 'view', 'validation'
+    ]
+    assert profiles[0].counters['backend_calls'] == 3
+    assert profiles[0].counters['rows'] > 0
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_backend_calls', [
+    ('Things(1)/Datastreams', {'$expand': 'Thing'}, 2),
+    ('Datastreams(1)/Thing', {'$expand': 'Datastreams/Thing'}, 3),
+    ('Observations', {'$expand': 'Datastream/Thing,FeatureOfInterest'}, 4),
+])
+@pytest.mark.django_db()
+def test_sensorthings_identity_map(endpoint, query_params, expected_backend_calls, monkeypatch):
+    profiles = []
+    monkeypatch.setattr('sensorthings.settings.ST_PROFILING_SINKS', [lambda request, profile: profiles.append(profile)])
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}', query_params)
+
+    assert response.status_code == 200
+    assert profiles[0].counters['backend_calls'] == expected_backend_calls
+
+
+@pytest.mark.parametrize('api, endpoint', [
+    ('core', 'Things?$expand=Locations($top=1),Datastreams/Observations($top=1)'),
+    ('core', 'Observations?$expand=Datastream/Thing,FeatureOfInterest'),
+    ('core', 'Datastreams?$expand=Observations($top=1;$orderby=phenomenonTime desc)'),
+    ('memory', 'Things?$expand=Locations($orderby=name desc;$top=1),HistoricalLocations/Locations'),
+    ('memory', 'Datastreams?$expand=Observations($top=1;$orderby=phenomenonTime desc),Thing'),
+])
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.django_db()
+def test_sensorthings_id_batches(api, endpoint, workers, monkeypatch):
+    client = Client()
+
+    unbatched_response = client.get(f'http://127.0.0.1:8000/sensorthings/{api}/v1.1/{endpoint}')
+
+    monkeypatch.setattr('sensorthings.settings.ST_ID_BATCH_SIZE', 1)
+    monkeypatch.setattr('sensorthings.settings.ST_ID_BATCH_WORKERS', workers)
+
+    batched_response = client.get(f'http://127.0.0.1:8000/sensorthings/{api}/v1.1/{endpoint}')
+
+    assert batched_response.status_code == unbatched_response.status_code == 200
+    assert batched_response.content == unbatched_response.content
+
+
+@pytest.mark.parametrize('endpoint, expected_calls', [
+    ('Things(1)', [('get_things', {'thing_ids': [1]})]),
+    ('Things(1)/name/$value', [('get_things', {'thing_ids': [1]})]),
+    ('Datastreams(1)/Thing', [('get_datastreams', {'datastream_ids': [1]}), ('get_things', {'thing_ids': [1]})]),
+])
+@pytest.mark.django_db()
+def test_sensorthings_get_entity_by_id(endpoint, expected_calls, monkeypatch):
+    calls = []
+    for get_method in ['get_things', 'get_datastreams']:
+        original_method = getattr(ExampleInMemorySensorThingsEngine, get_method)
+        monkeypatch.setattr(
+            ExampleInMemorySensorThingsEngine, get_method,
+            lambda self, _name=get_method, _method=original_method, **kwargs: calls.append(
+                (_name, kwargs)
+            ) or _method(self, **kwargs)
+        )
+    monkeypatch.setattr(
+        ExampleInMemorySensorThingsEngine, 'get_entity_value', SensorThingsBaseEngine.get_entity_value
+    )
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}')
+
+    assert response.status_code == 200
+    assert calls == expected_calls
+
+
+@pytest.mark.django_db()
+def test_sensorthings_entity_cache(monkeypatch):
+    monkeypatch.setattr(engine, 'entity_caches', {'Sensor': TTLCache(max_size=10, ttl=60)})
+    calls = []
+    original_method = ExampleInMemorySensorThingsEngine.get_sensors
+    monkeypatch.setattr(
+        ExampleInMemorySensorThingsEngine, 'get_sensors',
+        lambda self, **kwargs: calls.append(kwargs) or original_method(self, **kwargs)
+    )
+    client = Client()
+
+    def get_sensor_names():
+        response = client.get(
+            'http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations', {'$expand': 'Datastream/Sensor'}
+        )
+        assert response.status_code == 200
+        return {observation['Datastream']['Sensor']['name'] for observation in json.loads(response.content)['value']}
+
+    sta_memory.warm_entity_caches()
+
+    assert get_sensor_names() == {'SENSOR_1', 'SENSOR_2'}
+    assert get_sensor_names() == {'SENSOR_1', 'SENSOR_2'}
+    assert calls == [{'pagination': {'skip': 0, 'top': 10}}]
+
+    response = client.patch(
+        'http://127.0.0.1:8000/sensorthings/memory/v1.1/Sensors(1)', json.dumps({'description': 'Sensor 1'}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 204
+    assert get_sensor_names() == {'SENSOR_1', 'SENSOR_2'}
+    assert calls[1:] == [{'sensor_ids': [1, 2]}]
+
+
+@pytest.mark.parametrize('cache_scope, expected_calls', [
+    (lambda self: None, [{'sensor_ids': [1, 2]}, {'sensor_ids': [1, 2]}, {'sensor_ids': [1, 2]}]),
+    (lambda self: self.request.GET.get('tenant'), [{'sensor_ids': [1, 2]}, {'sensor_ids': [1, 2]}]),
+])
+@pytest.mark.django_db()
+def test_sensorthings_entity_cache_scope(cache_scope, expected_calls, monkeypatch):
+    monkeypatch.setattr(engine, 'entity_caches', {'Sensor': TTLCache(max_size=10, ttl=60)})
+    monkeypatch.setattr(ExampleInMemorySensorThingsEngine, 'get_entity_cache_scope', cache_scope)
+    calls = []
+    original_method = ExampleInMemorySensorThingsEngine.get_sensors
+    monkeypatch.setattr(
+        ExampleInMemorySensorThingsEngine, 'get_sensors',
+        lambda self, **kwargs: calls.append(kwargs) or original_method(self, **kwargs)
+    )
+    client = Client()
+
+    for tenant in ('A', 'B', 'A'):
+        response = client.get(
+            'http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations',
+            {'$expand': 'Datastream/Sensor', 'tenant': tenant}
+        )
+        assert response.status_code == 200
+
+    assert calls == expected_calls
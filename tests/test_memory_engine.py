@@ -0,0 +1,318 @@
+import json
+from datetime import datetime, timezone
+import pytest
+from django.test import Client
+from odata_query.grammar import ODataLexer, ODataParser
+from ninja.errors import HttpError
+from sensorthings.components.field_schemas import Datastream, Location, Observation, Thing
+from sensorthings.engines import InMemoryStore
+from sensorthings.engines.predicates import compile_filter, parse_datetime
+from sta.urls import ExampleInMemorySensorThingsEngine
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_ids', [
+    ('Things', {}, [1, 2]),
+    ('Things', {'$filter': "name eq 'THING_2'"}, [2]),
+    ('Things', {'$filter': "startswith(name, 'THING') and properties/code eq 'THING'"}, [2]),
+    ('Things', {'$filter': "not (name eq 'THING_1')"}, [2]),
+    ('Things', {'$filter': "Locations/name eq 'LOCATION_3'"}, [2]),
+    ('Things', {'$orderby': 'name desc'}, [2, 1]),
+    ('Things(2)/Locations', {}, [2, 3]),
+    ('Locations(2)/Things', {}, [2]),
+    ('HistoricalLocations(2)/Locations', {}, [2, 3]),
+    ('Things(1)/Datastreams(1)/Observations', {}, [1, 2]),
+    ('Datastreams', {'$filter': "Thing/name eq 'THING_2'"}, [2]),
+    ('Observations', {'$filter': 'result gt 12', '$orderby': 'result desc'}, [4, 3, 2]),
+    ('Observations', {'$orderby': 'result desc', '$skip': 1, '$top': 2}, [3, 2]),
+    ('Observations', {'$filter': 'year(phenomenonTime) eq 2024 and result add 5 ge 25'}, [3, 4]),
+    ('Observations', {'$filter': "Datastream/id in ('1', '2') and phenomenonTime lt 2024-01-02T00:00:00Z"}, [1, 3]),
+    ('Observations', {'$filter': 'Datastream/Thing/id eq 2', '$orderby': 'phenomenonTime desc'}, [4, 3]),
+    ('Datastreams(1)/Observations', {'$top': 1, '$orderby': 'phenomenonTime desc'}, [2]),
+    ('FeaturesOfInterest', {'$filter': 'Observations/result eq 20'}, [2]),
+])
+def test_memory_engine_get_endpoints(endpoint, query_params, expected_ids):
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}', query_params)
+
+    assert response.status_code == 200
+    assert [entity['@iot.id'] for entity in json.loads(response.content)['value']] == expected_ids
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_status', [
+    ('Things', {'$filter': 'bogus eq 1'}, 400),
+    ('Things', {'$filter': "geo.intersects(location, geography'POINT(1 1)')"}, 400),
+    ('Observations', {'$filter': "substringof('a', name)"}, 422),
+    ('Things', {'$filter': "matchesPattern(name, '(')"}, 400),
+    ('Things', {'$filter': f"matchesPattern(name, '{'a' * 1001}')"}, 400),
+])
+def test_memory_engine_invalid_filters(endpoint, query_params, expected_status):
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}', query_params)
+
+    assert response.status_code == expected_status
+
+
+def test_memory_engine_mixed_id_arguments():
+    engine = ExampleInMemorySensorThingsEngine(request=None, get_response_schemas={})
+
+    observations, _ = engine.get_observations(
+        datastream_ids=[1],
+        filters=ODataParser().parse(ODataLexer().tokenize("Datastream/id eq '1'")),
+        ordering=[{'field': 'phenomenonTime', 'direction': 'asc'}]
+    )
+
+    assert list(observations) == [1, 2]
+
+
+def test_memory_engine_partitioned_expand():
+    client = Client()
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/memory/v1.1/Datastreams', {
+        '$expand': 'Observations($top=1;$orderby=phenomenonTime desc;$filter=result lt 25)'
+    })
+
+    assert response.status_code == 200
+    assert [
+        [observation['@iot.id'] for observation in datastream['Observations']]
+        for datastream in json.loads(response.content)['value']
+    ] == [[2], [3]]
+
+
+@pytest.mark.parametrize('endpoint, query_params, expected_response', [
+    ('Things/$ref', {'$orderby': 'name desc'}, {'value': [
+        {'@iot.selfLink': 'http://testserver/sensorthings/v1.1/Things(2)'},
+        {'@iot.selfLink': 'http://testserver/sensorthings/v1.1/Things(1)'}
+    ]}),
+    ('Things(2)/Locations/$ref', {'$count': True, '$top': 1}, {
+        '@iot.count': 2,
+        '@iot.nextLink': 'http://testserver/sensorthings/v1.1/Things(2)/Locations/$ref'
+                         '?$filter=Thing%2Fid%20eq%20%272%27&$count=True&$skip=1&$top=1',
+        'value': [{'@iot.selfLink': 'http://testserver/sensorthings/v1.1/Locations(2)'}]
+    }),
+])
+def test_memory_engine_ref_endpoints(endpoint, query_params, expected_response):
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}', query_params)
+
+    assert response.status_code == 200
+    assert json.loads(response.content) == expected_response
+
+
+@pytest.mark.parametrize('endpoint, expected_content_type, expected_content', [
+    ('Things(2)/name/$value', 'text/plain; charset=utf-8', b'THING_2'),
+    ('Things(2)/properties/$value', 'application/json', b'{"code": "THING"}'),
+    ('Observations(3)/result/$value', 'text/plain; charset=utf-8', b'20'),
+    ('Datastreams(1)/Thing/name/$value', 'text/plain; charset=utf-8', b'THING_1'),
+])
+def test_memory_engine_value_endpoints(endpoint, expected_content_type, expected_content):
+    client = Client()
+
+    response = client.get(f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}')
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == expected_content_type
+    assert response.content == expected_content
+
+
+def build_datastream_body(name, **related_entities):
+    return {
+        'name': name, 'description': name, 'observationType': 'http://www.opengis.net/def/observationType/OGC-OM/2.0/'
+        'OM_Measurement', 'unitOfMeasurement': {'name': 'Unit', 'symbol': 'U', 'definition': 'https://example.com'},
+        **related_entities
+    }
+
+
+def test_memory_engine_deep_insert(monkeypatch):
+    monkeypatch.setattr(ExampleInMemorySensorThingsEngine, 'store', InMemoryStore())
+    client = Client()
+    sensor = {'name': 'SENSOR', 'description': 'SENSOR', 'encodingType': 'text/html', 'metadata': 'https://example.com'}
+    observed_property = {'name': 'PROPERTY', 'description': 'PROPERTY', 'definition': 'https://example.com'}
+
+    response = client.post('http://127.0.0.1:8000/sensorthings/memory/v1.1/Things', json.dumps({
+        'name': 'THING', 'description': 'THING',
+        'Locations': [{
+            'name': 'LOCATION', 'description': 'LOCATION', 'encodingType': 'application/geo+json',
+            'location': {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Point', 'coordinates': [0.0, 0.0]}}
+        }],
+        'Datastreams': [
+            build_datastream_body('DATASTREAM_1', Sensor=sensor, ObservedProperty=observed_property),
+            build_datastream_body('DATASTREAM_2', Sensor=sensor, ObservedProperty=observed_property)
+        ]
+    }), content_type='application/json')
+
+    assert response.status_code == 201
+    assert response['Location'] == 'http://testserver/sensorthings/v1.1/Things(1)'
+    assert 'SensorThings-Query-Cost' not in response
+
+    response = client.get('http://127.0.0.1:8000/sensorthings/memory/v1.1/Things(1)', {
+        '$expand': 'Locations($select=name),Datastreams($expand=Sensor)'
+    })
+    thing = json.loads(response.content)
+
+    assert [location['name'] for location in thing['Locations']] == ['LOCATION']
+    assert [(datastream['name'], datastream['Sensor']['@iot.id']) for datastream in thing['Datastreams']] == [
+        ('DATASTREAM_1', 1), ('DATASTREAM_2', 2)
+    ]
+
+    response = client.post('http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations', json.dumps({
+        'phenomenonTime': '2024-01-01T00:00:00Z', 'result': 1,
+        'Datastream': build_datastream_body(
+            'DATASTREAM_3', Thing={'@iot.id': 1}, Sensor={'@iot.id': 1}, ObservedProperty=observed_property
+        )
+    }), content_type='application/json')
+
+    assert response.status_code == 201
+    assert response['Location'] == 'http://testserver/sensorthings/v1.1/Observations(1)'
+
+    response = client.post('http://127.0.0.1:8000/sensorthings/memory/v1.1/FeaturesOfInterest', json.dumps({
+        'name': 'FEATURE', 'description': 'FEATURE', 'encodingType': 'application/geo+json',
+        'feature': {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Point', 'coordinates': [0.0, 0.0]}},
+        'Observations': [{'phenomenonTime': '2024-01-02T00:00:00Z', 'result': 2, 'Datastream': {'@iot.id': 3}}]
+    }), content_type='application/json')
+
+    assert response.status_code == 201
+    assert json.loads(client.get(
+        'http://127.0.0.1:8000/sensorthings/memory/v1.1/Observations(2)/FeatureOfInterest'
+    ).content)['name'] == 'FEATURE'
+    assert json.loads(client.get(
+        'http://127.0.0.1:8000/sensorthings/memory/v1.1/Datastreams(3)'
+    ).content)['phenomenonTime'] == '2024-01-01T00:00:00Z/2024-01-02T00:00:00Z'
+
+
+@pytest.mark.parametrize('endpoint, post_body', [
+    ('Things', {'name': 'THING', 'description': 'THING', 'Datastreams': [build_datastream_body('DATASTREAM')]}),
+    ('Sensors', {
+        'name': 'SENSOR', 'description': 'SENSOR', 'encodingType': 'text/html', 'metadata': 'https://example.com',
+        'Datastreams': [build_datastream_body('DATASTREAM', Thing={'@iot.id': 1}, Sensor={'@iot.id': 1})]
+    }),
+])
+def test_memory_engine_deep_insert_missing_relationships(monkeypatch, endpoint, post_body):
+    monkeypatch.setattr(ExampleInMemorySensorThingsEngine, 'store', InMemoryStore())
+    client = Client()
+
+    response = client.post(
+        f'http://127.0.0.1:8000/sensorthings/memory/v1.1/{endpoint}', json.dumps(post_body),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 422
+
+
+def test_memory_store_relationships():
+    store = InMemoryStore()
+
+    thing_id = store.insert(Thing, {'name': 'THING'})
+    location_ids = [store.insert(Location, {'name': f'LOCATION_{i}'}, {'things': [thing_id]}) for i in range(2)]
+    datastream_id = store.insert(Datastream, {'name': 'DATASTREAM'}, {'thing': thing_id})
+    observation_ids = [
+        store.insert(Observation, {'phenomenon_time': f'2024-01-0{i}T00:00:00Z'}, {'datastream': datastream_id})
+        for i in (3, 1, 2)
+    ]
+
+    things = store.get_table(Thing)
+    observations = store.get_table(Observation)
+
+    assert things.entities[thing_id]['location_ids'] == location_ids
+    assert list(observations.iterate_partition(datastream_id)) == [observation_ids[1], observation_ids[2],
+                                                                  observation_ids[0]]
+
+    store.update(Thing, thing_id, {}, {'locations': [location_ids[1]]})
+
+    assert store.get_table(Location).entities[location_ids[0]]['thing_ids'] == []
+    assert store.get_table(Location).entities[location_ids[1]]['thing_ids'] == [thing_id]
+
+    store.delete(Thing, thing_id)
+
+    assert len(observations) == 0
+    assert len(store.get_table(Datastream)) == 0
+    assert store.get_table(Location).entities[location_ids[1]]['thing_ids'] == []
+
+    with pytest.raises(HttpError):
+        store.insert(Datastream, {'name': 'DATASTREAM'}, {'thing': thing_id})
+
+
+@pytest.mark.parametrize('endpoint, query_params', [
+    ('Observations/$aggregate', {'interval': '1d'}),
+    ('Observations', {'$downsample': 2}),
+])
+def test_memory_engine_non_numeric_results(monkeypatch, endpoint, query_params):
+    pytest.importorskip('numpy')
+    store = InMemoryStore()
+    thing_id = store.insert(Thing, {'name': 'THING'})
+    datastream_id = store.insert(Datastream, {'name': 'DATASTREAM'}, {'thing': thing_id})
+    store.insert(
+        Observation, {'phenomenon_time': '2024-01-01T00:00:00Z', 'result': 'HIGH'}, {'datastream': datastream_id}
+    )
+    monkeypatch.setattr(ExampleInMemorySensorThingsEngine, 'store', store)
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/memory/v1.1/Datastreams({datastream_id})/{endpoint}', query_params
+    )
+
+    assert response.status_code == 422
+
+
+def test_memory_engine_downsample_filter(monkeypatch):
+    pytest.importorskip('numpy')
+    store = InMemoryStore()
+    thing_id = store.insert(Thing, {'name': 'THING'})
+    datastream_ids = [store.insert(Datastream, {'name': 'DATASTREAM'}, {'thing': thing_id}) for _ in range(2)]
+    observation_ids = [
+        store.insert(
+            Observation, {'phenomenon_time': f'2024-01-0{i + 1}T00:00:00Z', 'result': i}, {'datastream': datastream_id}
+        ) for datastream_id in datastream_ids for i in range(5)
+    ]
+    monkeypatch.setattr(ExampleInMemorySensorThingsEngine, 'store', store)
+    client = Client()
+
+    response = client.get(
+        f'http://127.0.0.1:8000/sensorthings/memory/v1.1/Datastreams({datastream_ids[1]})/Observations',
+        {'$downsample': 2, '$downsampleMethod': 'minmax', '$filter': 'result ge 2', '$select': 'id'}
+    )
+
+    assert response.status_code == 200
+    assert [observation['@iot.id'] for observation in json.loads(response.content)['value']] == [
+        observation_ids[7], observation_ids[9]
+    ]
+
+
+@pytest.mark.parametrize('filters, expected_result', [
+    ("name eq 'A'", True),
+    ("name ne 'A'", False),
+    ('value gt 1 and value le 2', True),
+    ('value eq null', False),
+    ('missing eq null', True),
+    ('missing lt 1', False),
+    ("time ge 2024-01-01T00:00:00Z and time lt 2024-01-02T00:00:00Z", True),
+    ("tolower(concat(name, 'B')) eq 'ab'", True),
+    ("contains(name, 'A') or value div 0 eq 1", True),
+    ('value mul 2 sub 1 eq 3', True),
+    ('round(3.6) eq 4 and floor(3.6) eq 3 and ceiling(3.2) eq 4', True),
+    ('month(time) eq 1 and hour(time) eq 12', True),
+    ("value in (1, 2, 3)", True),
+    ("name in ('B', 'C')", False),
+    ("matchesPattern(name, '^[A-Z]$')", True),
+])
+def test_compile_filter(filters, expected_result):
+    entity = {'name': 'A', 'value': 2, 'missing': None, 'time': '2024-01-01T12:00:00Z'}
+
+    predicate = compile_filter(
+        ODataParser().parse(ODataLexer().tokenize(filters)),
+        lambda segments: lambda item: item.get(segments[0])
+    )
+
+    assert predicate(entity) is expected_result
+
+
+@pytest.mark.parametrize('value, expected_value', [
+    ('2024-01-01T12:00:00Z', datetime(2024, 1, 1, 12, tzinfo=timezone.utc)),
+    ('2024-01-01T12:00:00', datetime(2024, 1, 1, 12, tzinfo=timezone.utc)),
+    ('2024-01', datetime(2024, 1, 1, tzinfo=timezone.utc)),
+    ('THING_1', None),
+])
+def test_parse_datetime(value, expected_value):
+    assert parse_datetime(value) == expected_value
@@ -0,0 +1,326 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from django.db import connections, models
+from django.test.utils import CaptureQueriesContext, isolate_apps
+from ninja.errors import HttpError
+from odata_query.grammar import ODataLexer, ODataParser
+from sensorthings import settings
+from sensorthings.components.datastreams.schemas import DatastreamPatchBody
+from sensorthings.components.field_schemas import Location, Observation, Thing
+from sensorthings.components.things.schemas import ThingPostBody
+from sensorthings.deep_insert import DeepInsertPlan
+from sensorthings.engines.orm import DjangoORMEngine
+
+
+@pytest.fixture(scope='module')
+def orm_engine():
+    """
+    Create Django models of the SensorThings components in an isolated app registry, with their tables in the
+    in-memory SQLite database of the test settings, and a DjangoORMEngine serving them.
+    """
+
+    isolated_apps = isolate_apps('sta')
+    isolated_apps.enable()
+
+    class Thing(models.Model):
+        name = models.CharField(max_length=255)
+        description = models.TextField(default='')
+        properties = models.JSONField(default=dict)
+
+        class Meta:
+            app_label = 'sta'
+
+    class Location(models.Model):
+        name = models.CharField(max_length=255)
+        description = models.TextField(default='')
+        encoding_type = models.CharField(max_length=255, default='application/geo+json')
+        location = models.JSONField(default=dict)
+        properties = models.JSONField(default=dict)
+        things = models.ManyToManyField(Thing, related_name='locations')
+
+        class Meta:
+            app_label = 'sta'
+
+    class HistoricalLocation(models.Model):
+        time = models.DateTimeField()
+        thing = models.ForeignKey(Thing, on_delete=models.CASCADE, related_name='historical_locations')
+        locations = models.ManyToManyField(Location, related_name='historical_locations')
+
+        class Meta:
+            app_label = 'sta'
+
+    class Sensor(models.Model):
+        name = models.CharField(max_length=255)
+        description = models.TextField(default='')
+        encoding_type = models.CharField(max_length=255, default='text/html')
+        metadata = models.TextField(default='')
+        properties = models.JSONField(default=dict)
+
+        class Meta:
+            app_label = 'sta'
+
+    class ObservedProperty(models.Model):
+        name = models.CharField(max_length=255)
+        definition = models.TextField(default='')
+        description = models.TextField(default='')
+        properties = models.JSONField(default=dict)
+
+        class Meta:
+            app_label = 'sta'
+
+    class FeatureOfInterest(models.Model):
+        name = models.CharField(max_length=255)
+        description = models.TextField(default='')
+        encoding_type = models.CharField(max_length=255, default='application/geo+json')
+        feature = models.JSONField(default=dict)
+        properties = models.JSONField(default=dict)
+
+        class Meta:
+            app_label = 'sta'
+
+    class Datastream(models.Model):
+        name = models.CharField(max_length=255)
+        description = models.TextField(default='')
+        unit_of_measurement = models.JSONField(default=dict)
+        observation_type = models.TextField(default='')
+        observed_area = models.JSONField(null=True)
+        phenomenon_time = models.TextField(null=True)
+        result_time = models.TextField(null=True)
+        properties = models.JSONField(default=dict)
+        thing = models.ForeignKey(Thing, on_delete=models.CASCADE, related_name='datastreams')
+        sensor = models.ForeignKey(Sensor, on_delete=models.CASCADE, related_name='datastreams')
+        observed_property = models.ForeignKey(ObservedProperty, on_delete=models.CASCADE, related_name='datastreams')
+
+        class Meta:
+            app_label = 'sta'
+
+    class Observation(models.Model):
+        phenomenon_time = models.DateTimeField()
+        result_time = models.DateTimeField(null=True)
+        result = models.FloatField()
+        result_quality = models.JSONField(null=True)
+        valid_time = models.TextField(null=True)
+        parameters = models.JSONField(null=True)
+        datastream = models.ForeignKey(Datastream, on_delete=models.CASCADE, related_name='observations')
+        feature_of_interest = models.ForeignKey(
+            FeatureOfInterest, on_delete=models.CASCADE, null=True, related_name='observations'
+        )
+
+        class Meta:
+            app_label = 'sta'
+
+    component_models = [Thing, Location, HistoricalLocation, Sensor, ObservedProperty, FeatureOfInterest, Datastream,
+                        Observation]
+
+    connection = connections['default']
+
+    with connection.schema_editor() as schema_editor:
+        for model in component_models:
+            schema_editor.create_model(model)
+
+    things = [Thing.objects.create(name='THING_1'), Thing.objects.create(name='THING_2', properties={'code': 'A'})]
+    for i, thing_ids in enumerate([[1], [2], [2]]):
+        Location.objects.create(name=f'LOCATION_{i + 1}').things.set(thing_ids)
+    sensor = Sensor.objects.create(name='SENSOR_1')
+    observed_property = ObservedProperty.objects.create(name='OBSERVED_PROPERTY_1')
+    for thing in things:
+        datastream = Datastream.objects.create(
+            name=f'DATASTREAM_{thing.pk}', thing=thing, sensor=sensor, observed_property=observed_property
+        )
+        for i in range(5):
+            Observation.objects.create(
+                datastream=datastream, result=i * 10 + thing.pk,
+                phenomenon_time=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=i)
+            )
+
+    class TestDjangoORMEngine(DjangoORMEngine):
+        models = {model.__name__: model for model in component_models}
+
+    yield TestDjangoORMEngine(request=None, get_response_schemas={})
+
+    with connection.schema_editor() as schema_editor:
+        for model in reversed(component_models):
+            schema_editor.delete_model(model)
+
+    connection.close()
+    isolated_apps.disable()
+
+
+def parse_filter(filters):
+    return ODataParser().parse(ODataLexer().tokenize(filters))
+
+
+@pytest.mark.parametrize('get_method, arguments, expected_ids', [
+    ('get_things', {}, [1, 2]),
+    ('get_things', {'filters': "Locations/name eq 'LOCATION_3'"}, [2]),
+    ('get_things', {'filters': "properties/code eq 'A'"}, [2]),
+    ('get_things', {'filters': "not (name eq 'THING_1')"}, [2]),
+    ('get_locations', {'thing_ids': [2]}, [2, 3]),
+    ('get_datastreams', {'filters': 'Observations/result gt 40', 'get_count': True}, [1, 2]),
+    ('get_observations', {
+        'filters': "Datastream/Thing/name eq 'THING_2' and result gt 20",
+        'ordering': [{'field': 'result', 'direction': 'desc'}],
+        'pagination': {'skip': 0, 'top': 2}
+    }, [10, 9]),
+    ('get_observations', {
+        'filters': "year(phenomenonTime) eq 2024 and day(phenomenonTime) ge 4 and tolower(Datastream/name) eq "
+                   "'datastream_1'"
+    }, [4, 5]),
+    ('get_observations', {'filters': "result add 5 gt 40 or contains(Datastream/name, '1') and not (result lt 3)"},
+     [2, 3, 4, 5, 10]),
+    ('get_observations', {'filters': "Datastream/id eq '1' and phenomenonTime ge 2024-01-03T00:00:00Z"}, [3, 4, 5]),
+    ('get_observations', {'filters': 'result in (1, 12)'}, [1, 7]),
+    ('get_observations', {
+        'datastream_ids': [1, 2],
+        'ordering': [{'field': 'phenomenonTime', 'direction': 'desc'}],
+        'pagination': {'skip': 1, 'top': 2, 'partition_by': 'datastream_id'}
+    }, [4, 9, 3, 8]),
+    ('get_locations', {
+        'thing_ids': [2],
+        'ordering': [{'field': 'name', 'direction': 'desc'}],
+        'pagination': {'skip': 0, 'top': 1, 'partition_by': 'thing_ids'}
+    }, [3]),
+])
+def test_orm_engine_queries(orm_engine, get_method, arguments, expected_ids):
+    if 'filters' in arguments:
+        arguments = {**arguments, 'filters': parse_filter(arguments['filters'])}
+
+    entities, count = getattr(orm_engine, get_method)(**arguments)
+
+    assert list(entities) == expected_ids
+    assert count == (len(expected_ids) if arguments.get('get_count') else None)
+
+
+@pytest.mark.parametrize('component, arguments, expected_ids, expected_count', [
+    (Thing, {'ordering': [{'field': 'name', 'direction': 'desc'}]}, [2, 1], None),
+    (Location, {'filters': "Things/id eq '2'", 'get_count': True, 'pagination': {'skip': 1, 'top': 1}}, [3], 2),
+    (Observation, {'datastream_ids': [2], 'filters': 'result lt 30'}, [6, 7, 8], None),
+])
+def test_orm_engine_entity_ids(orm_engine, component, arguments, expected_ids, expected_count):
+    if 'filters' in arguments:
+        arguments = {**arguments, 'filters': parse_filter(arguments['filters'])}
+
+    entity_ids, count = orm_engine.get_entity_ids(component, **arguments)
+
+    assert entity_ids == expected_ids
+    assert count == expected_count
+
+
+def test_orm_engine_entity_value(orm_engine):
+    assert orm_engine.get_entity_value(Thing, 2, 'properties') == {'code': 'A'}
+    assert orm_engine.get_entity_value(Observation, 6, 'result') == 2
+
+    with pytest.raises(HttpError) as exception:
+        orm_engine.get_entity_value(Thing, 10, 'name')
+
+    assert exception.value.status_code == 404
+
+
+def test_orm_engine_related_ids(orm_engine):
+    things, _ = orm_engine.get_things()
+    datastreams, _ = orm_engine.get_datastreams(thing_ids=[2])
+
+    assert things[2]['location_ids'] == [2, 3]
+    assert datastreams[2]['thing_id'] == 2
+
+
+@pytest.mark.parametrize('filters', [
+    'bogus eq 1',
+    "geo.intersects(location, geography'POINT(1 1)')",
+    "Locations eq 'LOCATION_1'",
+])
+def test_orm_engine_invalid_filters(orm_engine, filters):
+    with pytest.raises(HttpError) as exception:
+        orm_engine.get_things(filters=parse_filter(filters))
+
+    assert exception.value.status_code == 400
+
+
+def test_orm_engine_latest_observations(orm_engine):
+    with CaptureQueriesContext(connections['default']) as queries:
+        observations = orm_engine.get_latest_observations(datastream_ids=[1, 2], top=2)
+
+    assert list(observations) == [5, 10, 4, 9]
+    assert len(queries.captured_queries) == 1
+
+
+def test_orm_engine_observation_aggregates(orm_engine):
+    aggregates = orm_engine.get_observation_aggregates(
+        datastream_id=1, interval=timedelta(days=2), functions=['mean', 'count']
+    )
+
+    assert aggregates == [
+        [datetime(2023, 12, 31, tzinfo=timezone.utc), 1.0, 1],
+        [datetime(2024, 1, 2, tzinfo=timezone.utc), 16.0, 2],
+        [datetime(2024, 1, 4, tzinfo=timezone.utc), 36.0, 2]
+    ]
+
+
+def test_orm_engine_observation_aggregates_cost(orm_engine, monkeypatch):
+    monkeypatch.setattr(settings, 'ST_MAX_QUERY_COST', 4)
+
+    with pytest.raises(HttpError) as exception:
+        orm_engine.get_observation_aggregates(datastream_id=1, interval=timedelta(days=1), functions=['mean'])
+
+    assert exception.value.status_code == 400
+
+
+def test_orm_engine_downsampled_observations(orm_engine):
+    observations = orm_engine.get_downsampled_observations(threshold=2, method='minmax', datastream_ids=[1, 2])
+
+    assert list(observations) == [1, 5, 6, 10]
+
+
+def test_orm_engine_writes(orm_engine):
+    thing_id = orm_engine.create_thing(ThingPostBody(
+        name='THING_3', description='Thing 3', Locations=[{'@iot.id': 1}]
+    ))
+    orm_engine.update_datastream(1, DatastreamPatchBody(Thing={'@iot.id': thing_id}))
+
+    things, _ = orm_engine.get_things(thing_ids=[thing_id])
+    datastreams, _ = orm_engine.get_datastreams(thing_ids=[thing_id])
+
+    assert things[thing_id]['location_ids'] == [1]
+    assert list(datastreams) == [1]
+
+    orm_engine.update_datastream(1, DatastreamPatchBody(Thing={'@iot.id': 1}))
+    orm_engine.delete_thing(thing_id)
+
+    with pytest.raises(HttpError):
+        orm_engine.delete_thing(thing_id)
+
+
+@pytest.mark.parametrize('can_return_rows_from_bulk_insert, insert_count', [(True, 4), (False, 23)])
+def test_orm_engine_deep_insert(orm_engine, monkeypatch, can_return_rows_from_bulk_insert, insert_count):
+    monkeypatch.setattr(
+        type(connections['default'].features), 'can_return_rows_from_bulk_insert', can_return_rows_from_bulk_insert
+    )
+    thing_body = ThingPostBody(
+        name='THING_3', description='Thing 3',
+        Locations=[{
+            'name': 'LOCATION_4', 'description': 'Location 4', 'encodingType': 'application/geo+json',
+            'location': {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Point', 'coordinates': [0, 0]}}
+        }],
+        Datastreams=[{
+            'name': f'DATASTREAM_{i}', 'description': f'Datastream {i}',
+            'observationType': 'http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_Measurement',
+            'unitOfMeasurement': {'name': 'Unit', 'symbol': 'U', 'definition': 'https://example.com'},
+            'Sensor': {'@iot.id': 1}, 'ObservedProperty': {'@iot.id': 1}
+        } for i in range(20)]
+    )
+    plan = DeepInsertPlan(orm_engine, Thing, thing_body)
+
+    with CaptureQueriesContext(connections['default']) as queries, orm_engine.atomic():
+        thing_id = plan.execute()
+
+    things, _ = orm_engine.get_things(thing_ids=[thing_id])
+    datastreams, _ = orm_engine.get_datastreams(thing_ids=[thing_id])
+
+    assert [entity.component.__name__ for entity in plan.entities] == ['Thing', 'Location'] + [
+        'Datastream'] * 20
+    assert len(things[thing_id]['location_ids']) == 1
+    assert len(datastreams) == 20
+    assert len([query for query in queries.captured_queries if query['sql'].startswith('INSERT')]) == insert_count
+
+    orm_engine.delete_location(things[thing_id]['location_ids'][0])
+    orm_engine.delete_thing(thing_id)
@@ -0,0 +1,70 @@
+import pytest
+from ninja.errors import HttpError
+from sensorthings.query import QueryPlan, get_query_plan
+from sensorthings.schemas import ListQueryParams
+
+
+def test_query_plan_is_shared_and_hashable():
+    query_params = ListQueryParams(filters="name eq 'A'", order_by='name desc', top=10).dict()
+
+    query_plan = get_query_plan(query_params)
+
+    assert query_plan is get_query_plan(dict(query_params))
+    assert query_plan == QueryPlan(filters="name eq 'A'", order_by='name desc', top=10, skip=0)
+    assert {query_plan: True}[QueryPlan.from_query_params(query_params)] is True
+    assert query_plan.filter_ast is query_plan.filter_ast
+    assert query_plan.ordering == [{'field': 'name', 'direction': 'desc'}]
+    assert query_plan.pagination == {'skip': 0, 'top': 10, 'count': False}
+
+
+def test_query_plan_options():
+    query_plan = get_query_plan({'select': 'id,name', 'result_format': 'dataArray'})
+
+    assert query_plan.select_fields == ('id', 'name')
+    assert query_plan.get('result_format') == 'dataArray'
+    assert query_plan.get('count', False) is False
+    assert query_plan.replace(top=5).top == 5
+    assert query_plan.get_query_string(skip=5, top=5) == '?$select=id%2Cname&$skip=5&$top=5'
+
+
+def test_query_plan_expand_tree():
+    query_plan = QueryPlan(expand='Datastreams($top=1;$select=id)/Observations,Locations')
+
+    expand_tree = query_plan.expand_tree
+
+    assert list(expand_tree) == ['datastreams', 'locations']
+    assert expand_tree['datastreams'].top == 1
+    assert expand_tree['datastreams'].select == 'id'
+    assert expand_tree['datastreams'].expand == 'Observations'
+    assert expand_tree['locations'] == QueryPlan()
+
+
+def test_query_plan_nested_expand_tree():
+    query_plan = QueryPlan(
+        expand="Datastreams($filter=(name eq 'a;b)' or id eq 1);"
+               "$expand=Observations($top=2;$orderby=phenomenonTime desc),Sensor),"
+               "Datastreams/ObservedProperty($select=id)"
+    )
+
+    datastreams = query_plan.expand_tree['datastreams']
+
+    assert datastreams.filters == "(name eq 'a;b)' or id eq 1)"
+    assert datastreams.expand == 'Observations($top=2;$orderby=phenomenonTime desc),Sensor,ObservedProperty($select=id)'
+    assert list(datastreams.expand_tree) == ['observations', 'sensor', 'observed_property']
+    assert datastreams.expand_tree['observations'].top == 2
+    assert datastreams.expand_tree['observations'].ordering == [{'field': 'phenomenonTime', 'direction': 'desc'}]
+    assert datastreams.expand_tree['observed_property'].select == 'id'
+    assert datastreams.expand_tree == QueryPlan(expand=datastreams.expand).expand_tree
+
+
+@pytest.mark.parametrize('expand', [
+    'Datastreams($top=1', 'Datastreams($top)', 'Datastreams($top=a)', 'Datastreams/', 'Datastreams($top=1))'
+])
+def test_query_plan_invalid_expand(expand):
+    with pytest.raises(HttpError):
+        _ = QueryPlan(expand=expand).expand_tree
+
+
+def test_query_plan_invalid_filter():
+    with pytest.raises(HttpError):
+        _ = QueryPlan(filters='name eq').filter_ast
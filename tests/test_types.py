@@ -0,0 +1,71 @@
+import pytest
+from types import SimpleNamespace
+from pydantic import TypeAdapter, ValidationError
+from sensorthings.types import AnyHttpUrlString, ValidatedUrlString
+from sensorthings.types.iso_string import validate_iso_time, validate_iso_interval
+from sensorthings.engine import quote_entity_id
+from sensorthings.components.field_schemas import Thing
+from sensorthings import settings
+from sta.urls import ExampleInMemorySensorThingsEngine
+
+
+@pytest.mark.parametrize('value, expected_value', [
+    ('2024-01-01T00:00:00Z', '2024-01-01T00:00:00Z'),
+    ('2024-01-01T00:00:00+05:00', '2023-12-31T19:00:00Z'),
+    ('2024-01-01T00:00:00.123Z', '2024-01-01T00:00:00Z'),
+    ('2024-01-01T24:00:00Z', '2024-01-02T00:00:00Z'),
+    ('2024-01-01', '2024-01-01T00:00:00Z'),
+    ('20240101T000000Z', '2024-01-01T00:00:00Z'),
+    ('2024-02-30T00:00:00Z', ValueError),
+    ('2024-01-01T00:00:60Z', ValueError),
+    ('2024-01-01T00:00:00ZZ', ValueError),
+])
+def test_validate_iso_time(value, expected_value):
+    if expected_value is ValueError:
+        with pytest.raises(ValueError):
+            validate_iso_time(value)
+    else:
+        assert validate_iso_time(value) == expected_value
+
+
+@pytest.mark.parametrize('value, expected_value', [
+    ('2024-01-01T00:00:00Z/2024-01-02T00:00:00Z', '2024-01-01T00:00:00Z/2024-01-02T00:00:00Z'),
+    ('2024-01-01/2024-01-01T05:00:00+02:00', '2024-01-01T00:00:00Z/2024-01-01T03:00:00Z'),
+    ('2024-01-02T00:00:00Z/2024-01-01T00:00:00Z', ValueError),
+    ('2024-01-01T00:00:00Z/2024-01-01T00:00:00Z', ValueError),
+    ('2024-01-01T00:00:00Z', ValueError),
+])
+def test_validate_iso_interval(value, expected_value):
+    if expected_value is ValueError:
+        with pytest.raises(ValueError):
+            validate_iso_interval(value)
+    else:
+        assert validate_iso_interval(value) == expected_value
+
+
+@pytest.mark.parametrize('entity_id', [1, 'abc', 'a b', "a'b", 'a<b>', 'é', 'a|b'])
+def test_quote_entity_id(entity_id):
+    link = f"http://testserver/sensorthings/v1.1/Things('{quote_entity_id(entity_id)}')"
+
+    assert TypeAdapter(AnyHttpUrlString).validate_python(link) == link
+
+
+@pytest.mark.parametrize('entity_id', [1, 'a b'])
+def test_build_ref_link_with_and_without_link_prefixes(entity_id):
+    request = SimpleNamespace(sensorthings_url='http://testserver/sensorthings/v1.1')
+    engine = ExampleInMemorySensorThingsEngine(request=request, get_response_schemas={})
+
+    fallback_link = engine.build_ref_link(Thing, entity_id)
+    request.entity_link_prefixes = {Thing: f'{request.sensorthings_url}/Things({settings.ST_API_ID_QUALIFIER}'}
+
+    assert engine.build_ref_link(Thing, entity_id) == fallback_link
+
+
+def test_validated_url_string():
+    url_adapter = TypeAdapter(AnyHttpUrlString)
+
+    assert url_adapter.validate_python(ValidatedUrlString('http://testserver/Things(1)')) == 'http://testserver/Things(1)'
+    assert url_adapter.validate_python('http://testserver/Things(1)') == 'http://testserver/Things(1)'
+
+    with pytest.raises(ValidationError):
+        url_adapter.validate_python('testserver/Things(1)')